@@ -0,0 +1,91 @@
+# Copyright 2006-2026 Mark Diekhans
+"""
+Bulk conversion of SAM, BAM or CRAM alignments to PSL.  The CIGAR of each
+alignment is converted directly to PSL blocks, with the blocks kept as the
+PSL columns, so no CigarRun or PslBlock objects are created.  Conversion of
+an indexed file can be split by reference sequence across worker processes.
+"""
+import shutil
+import pysam
+from concurrent.futures import ProcessPoolExecutor
+from pycbio import PycbioException
+from pycbio.sys import fileOps
+from pycbio.hgdata.cigar import cigarBlocksFromPysam
+from pycbio.hgdata.psl import pslFromCigarBlocks
+
+
+def _alignmentsPsls(samfh, alns, lazyBlocks):
+    "generator of PSLs for mapped alignments"
+    tSizes = dict(zip(samfh.references, samfh.lengths))
+    for aln in alns:
+        if not aln.is_unmapped:
+            tName = aln.reference_name
+            yield pslFromCigarBlocks(aln.query_name, "-" if aln.is_reverse else "+",
+                                     tName, tSizes[tName],
+                                     cigarBlocksFromPysam(aln.cigartuples, aln.reference_start),
+                                     lazyBlocks=lazyBlocks)
+
+def bamPslReader(bamFile, *, reference=None, lazyBlocks=True):
+    """Generator of PSLs for the mapped alignments in a SAM, BAM or CRAM
+    file, in file order.  If reference is specified, only alignments to
+    that reference sequence are returned, which requires an indexed file.
+    Blocks are lazy by default, as the PSLs are usually only written."""
+    with pysam.AlignmentFile(bamFile) as samfh:
+        if reference is None:
+            alns = samfh.fetch(until_eof=True)
+        else:
+            alns = samfh.fetch(reference)
+        yield from _alignmentsPsls(samfh, alns, lazyBlocks)
+
+def _writePsls(psls, fh):
+    count = 0
+    for psl in psls:
+        psl.write(fh)
+        count += 1
+    return count
+
+def _referenceToPsl(bamFile, reference, pslFile):
+    "worker to convert the alignments to one reference, returning the count"
+    with open(pslFile, 'w') as fh:
+        return _writePsls(bamPslReader(bamFile, reference=reference), fh)
+
+def _mappedReferences(bamFile):
+    "get the references with mapped reads, in file order"
+    with pysam.AlignmentFile(bamFile) as samfh:
+        if not samfh.has_index():
+            raise PycbioException(f"BAM file must be indexed to convert with multiple workers: {bamFile}")
+        return [stat.contig for stat in samfh.get_index_statistics() if stat.mapped > 0]
+
+def _parallelBamToPsl(bamFile, fh, workers, tmpDir):
+    "convert with each reference in a worker, concatenating the results in order"
+    count = 0
+    runDir = fileOps.tmpDirGet(prefix="bamToPsl.", tmpDir=tmpDir)
+    try:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            pending = []
+            for iRef, reference in enumerate(_mappedReferences(bamFile)):
+                refPsl = f"{runDir}/ref{iRef}.psl"
+                pending.append((executor.submit(_referenceToPsl, bamFile, reference, refPsl), refPsl))
+            for future, refPsl in pending:
+                count += future.result()
+                with open(refPsl) as refFh:
+                    shutil.copyfileobj(refFh, fh)
+                fileOps.unlinkIfExists(refPsl)
+    finally:
+        fileOps.rmTree(runDir)
+    return count
+
+def bamToPsl(bamFile, pslFile, *, workers=None, tmpDir=None):
+    """Convert the mapped alignments in a SAM, BAM or CRAM file to a PSL
+    file, which maybe compressed.  If workers is greater than one, the file
+    must be indexed and each reference sequence is converted in a pool of
+    that many processes, with the results written in the order of the
+    references in the file header, using temporary files in tmpDir.  This
+    gives the same PSLs in the same order as a single process for a
+    coordinate sorted file.  Returns the number of PSLs written."""
+    with fileOps.AtomicFileCreate(pslFile) as pslTmpFile:
+        with fileOps.opengz(pslTmpFile, 'w') as fh:
+            if (workers is not None) and (workers > 1):
+                return _parallelBamToPsl(bamFile, fh, workers, tmpDir)
+            else:
+                return _writePsls(bamPslReader(bamFile), fh)
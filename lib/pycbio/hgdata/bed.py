@@ -1,9 +1,12 @@
 # Copyright 2006-2026 Mark Diekhans
 import copy
+import functools
+from array import array
 from collections import defaultdict, namedtuple
 from pycbio import PycbioException
+from pycbio.sys import fileOps
 from pycbio.sys.color import Color
-from pycbio.tsv.tabFile import TabFile, TabFileReader
+from pycbio.tsv.tabFile import TabFile, TabFileReader, TabFileParallelReader
 from pycbio.hgdata.autoSql import intArraySplit, intArrayJoin, strArrayJoin
 
 # FIXME: not complete, needs tests
@@ -293,16 +296,55 @@ class Bed:
     def genome_sort_key(bed):
         return bed.chrom, bed.chromStart
 
-def BedReader(fspec, numStdCols=None, bedClass=Bed, *, fixScores=False):
+def BedReader(fspec, numStdCols=None, bedClass=Bed, *, fixScores=False, workers=None):
     """Generator to read BED objects loaded from a tab-file or file-like
-    object.  See Bed.parse()."""
-    for bed in TabFileReader(fspec, rowClass=lambda r: bedClass.parse(r, numStdCols=numStdCols, fixScores=fixScores),
-                             hashAreComments=True, skipBlankLines=True):
+    object.  See Bed.parse().  If workers is greater than one, parsing is
+    done in that many processes, see TabFileParallelReader."""
+    rowClass = functools.partial(bedClass.parse, numStdCols=numStdCols, fixScores=fixScores)
+    if (workers is not None) and (workers > 1):
+        reader = TabFileParallelReader(fspec, rowClass=rowClass, hashAreComments=True, skipBlankLines=True,
+                                       workers=workers)
+    else:
+        reader = TabFileReader(fspec, rowClass=rowClass, hashAreComments=True, skipBlankLines=True)
+    for bed in reader:
         yield bed
 
 
+_cacheBedCols = ("chrom", "name", "score", "strand", "thickStart", "thickEnd", "itemRgb",
+                 "extraCols", "numStdCols")
+
+def _bedsEncode(beds):
+    "encode BEDs as columns for ParseCache"
+    cols = {col: [getattr(bed, col) for bed in beds] for col in _cacheBedCols}
+    cols["chromStart"] = array('q', [bed.chromStart for bed in beds])
+    cols["chromEnd"] = array('q', [bed.chromEnd for bed in beds])
+    cols["blockCount"] = array('l', [(-1 if bed.blocks is None else len(bed.blocks)) for bed in beds])
+    cols["blockStarts"] = array('q', [blk.start for bed in beds if bed.blocks is not None for blk in bed.blocks])
+    cols["blockEnds"] = array('q', [blk.end for bed in beds if bed.blocks is not None for blk in bed.blocks])
+    return cols
+
+def _bedsDecode(cols):
+    "decode BEDs from columns saved in ParseCache"
+    beds = []
+    blockStarts, blockEnds = cols["blockStarts"], cols["blockEnds"]
+    iStart = 0
+    for (chrom, name, score, strand, thickStart, thickEnd, itemRgb, extraCols, numStdCols,
+         chromStart, chromEnd, blockCount) in zip(*(cols[col] for col in _cacheBedCols + ("chromStart", "chromEnd", "blockCount"))):
+        blocks = None
+        if blockCount >= 0:
+            iEnd = iStart + blockCount
+            blocks = [BedBlock(start, end) for start, end in zip(blockStarts[iStart:iEnd], blockEnds[iStart:iEnd])]
+            iStart = iEnd
+        beds.append(Bed(chrom, chromStart, chromEnd, name, score=score, strand=strand,
+                        thickStart=thickStart, thickEnd=thickEnd, itemRgb=itemRgb, blocks=blocks,
+                        extraCols=extraCols, numStdCols=numStdCols))
+    return beds
+
+
 class BedTable(TabFile):
-    """Table of BED objects loaded from a tab-file
+    """Table of BED objects loaded from a tab-file.  If cache is a
+    pycbio.sys.parseCache.ParseCache object, the parsed file is saved in
+    and reloaded from the cache.
     """
 
     def _mkNameIdx(self):
@@ -310,9 +352,13 @@ class BedTable(TabFile):
         for bed in self:
             self.nameMap[bed.name].append(bed)
 
-    def __init__(self, fileName, nameIdx=False, numStdCols=None):
-        super(BedTable, self).__init__(fileName, rowClass=lambda r: Bed.parse(r, numStdCols=numStdCols),
-                                       hashAreComments=True, skipBlankLines=True)
+    def __init__(self, fileName, nameIdx=False, numStdCols=None, *, cache=None):
+        rows = None
+        if (cache is not None) and fileOps.isFilePath(fileName):
+            rows = cache.load(fileName, lambda f: list(BedReader(f, numStdCols)), kind=f"bed{numStdCols}",
+                              encode=_bedsEncode, decode=_bedsDecode)
+        super(BedTable, self).__init__(fileName, rowClass=functools.partial(Bed.parse, numStdCols=numStdCols),
+                                       hashAreComments=True, skipBlankLines=True, rows=rows)
         self.nameMap = None
         if nameIdx:
             self._mkNameIdx()
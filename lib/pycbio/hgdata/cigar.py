@@ -2,6 +2,7 @@
 Cigar parsers and operations.
 """
 import re
+from array import array
 from collections import namedtuple
 
 # See
@@ -32,6 +33,21 @@ consumeQueryHardOps = frozenset(consumeQueryOps | frozenset(['H']))
 consumeTargetOps = frozenset(['M', 'D', 'N', '=', 'X'])
 validOps = frozenset(CIGAR_OPS)
 
+# CIGAR operations, as a (count, op) tuple, where count maybe empty
+_CIGAR_OP_RE = re.compile("([0-9]*)([A-Za-z=])")
+_VALID_CIGAR_RE = re.compile("(?:[0-9]*[MIDNSHP=X])*", re.IGNORECASE)
+
+# operation classes used by CigarBlocks, indexed by pysam operation
+_OP_ALIGNED = 0
+_OP_QINSERT = 1
+_OP_TINSERT = 2
+_OP_QCONSUME = 3  # soft and hard clipping
+_OP_NONE = 4
+_OP_CLASSES = (_OP_ALIGNED, _OP_QINSERT, _OP_TINSERT, _OP_TINSERT, _OP_QCONSUME,
+               _OP_QCONSUME, _OP_NONE, _OP_ALIGNED, _OP_ALIGNED)
+_OP_CHAR_CLASSES = {op: cls for op, cls in zip(CIGAR_OPS, _OP_CLASSES)}
+_OP_CHAR_CLASSES.update({op.lower(): cls for op, cls in zip(CIGAR_OPS, _OP_CLASSES)})
+
 class CigarRun(namedtuple("CigarRun", ("code", "count"))):
     "CIGAR run-length encoding"
     __slots__ = ()
@@ -136,17 +152,91 @@ class Cigar(tuple):
             opStrs.append(str(op.code))
         return "".join(opStrs)
 
+def _cigarStringOps(cigarStr):
+    """split a cigar string into a list of (count, op) strings, where count
+    maybe empty.  White space is ignored."""
+    cigarStr = "".join(cigarStr.split())
+    if _VALID_CIGAR_RE.fullmatch(cigarStr) is None:
+        tuple(_parseCigar(cigarStr))  # raises the error
+        raise TypeError("Invalid cigar string, doesn't parse into a valid cigar: {}".format(cigarStr))
+    return _CIGAR_OP_RE.findall(cigarStr)
+
 def cigarStringParse(cigarStr):
     "parse a cigar string into a Cigar object"
-    # remove white space first, then convert to (count, op).  Re split will
-    # result in triples of ("", count, op), where count might be empty.
-    # Also as a trailing space.
-    parts = re.split("([0-9]*)([A-Za-z=])", re.sub("\\s+", "", cigarStr))
-    if ((len(parts) - 1) % 3) != 0:
-        raise TypeError("Invalid cigar string, doesn't parse into a valid cigar: {}".format(cigarStr))
-    return Cigar(_parseOp(cigarStr, parts[i:i + 3])
-                 for i in range(0, len(parts) - 1, 3))
+    return Cigar(CigarRun(op.upper(), int(cnt) if cnt != "" else 1)
+                 for cnt, op in _cigarStringOps(cigarStr))
 
 def cigarFromPysam(cigartuples):
     "convert the value of pysam.AlignedSegment.cigartuples to a Cigar object"
     return Cigar((CigarRun(CIGAR_OPS[ct[0]], ct[1]) for ct in cigartuples))
+
+
+class CigarBlocks:
+    """Aligned blocks and PSL counts from a CIGAR, as computed by
+    cigarBlocksFromString or cigarBlocksFromPysam without creating
+    CigarRun objects.  The qStarts, tStarts and sizes of the aligned
+    blocks are arrays.  The qStarts are in the direction of the CIGAR,
+    qSize is the length of the query, including soft and hard clipping.
+    The match, qNumInsert, qBaseInsert, tNumInsert and tBaseInsert counts
+    are as in PSL, with all aligned bases counted as matches and
+    deletions and skipped regions counted as target inserts."""
+    __slots__ = ("qStarts", "tStarts", "sizes", "qSize", "tEnd", "match",
+                 "qNumInsert", "qBaseInsert", "tNumInsert", "tBaseInsert")
+
+    def __init__(self):
+        self.qStarts = array('l')
+        self.tStarts = array('l')
+        self.sizes = array('l')
+        self.qSize = self.tEnd = 0
+        self.match = self.qNumInsert = self.qBaseInsert = self.tNumInsert = self.tBaseInsert = 0
+
+    @property
+    def blockCount(self):
+        return len(self.sizes)
+
+    def _scan(self, ops, tStart):
+        "scan (op class, count) pairs"
+        qStarts, tStarts, sizes = self.qStarts, self.tStarts, self.sizes
+        qNext, tNext = 0, tStart
+        match = qNumInsert = qBaseInsert = tNumInsert = tBaseInsert = 0
+        for opClass, cnt in ops:
+            if opClass == _OP_ALIGNED:
+                qStarts.append(qNext)
+                tStarts.append(tNext)
+                sizes.append(cnt)
+                match += cnt
+                qNext += cnt
+                tNext += cnt
+            elif opClass == _OP_QINSERT:
+                qNumInsert += 1
+                qBaseInsert += cnt
+                qNext += cnt
+            elif opClass == _OP_TINSERT:
+                tNumInsert += 1
+                tBaseInsert += cnt
+                tNext += cnt
+            elif opClass == _OP_QCONSUME:  # supplemental are hard-clipped
+                qNext += cnt
+        self.qSize, self.tEnd = qNext, tNext
+        self.match, self.qNumInsert, self.qBaseInsert = match, qNumInsert, qBaseInsert
+        self.tNumInsert, self.tBaseInsert = tNumInsert, tBaseInsert
+
+
+def cigarBlocksFromString(cigarStr, tStart=0):
+    """convert a cigar string to a CigarBlocks object, with target
+    coordinates starting at tStart"""
+    blks = CigarBlocks()
+    blks._scan(((_OP_CHAR_CLASSES[op], int(cnt) if cnt != "" else 1)
+                for cnt, op in _cigarStringOps(cigarStr)), tStart)
+    return blks
+
+def cigarBlocksFromPysam(cigartuples, tStart=0):
+    """convert the value of pysam.AlignedSegment.cigartuples to a CigarBlocks
+    object, with target coordinates starting at tStart"""
+    try:
+        ops = [(_OP_CLASSES[op], cnt) for op, cnt in cigartuples]
+    except IndexError:
+        raise TypeError("Invalid pysam cigar, unknown operation: {}".format(cigartuples))
+    blks = CigarBlocks()
+    blks._scan(ops, tStart)
+    return blks
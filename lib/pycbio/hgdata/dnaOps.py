@@ -1,7 +1,20 @@
 """
-Operations on strings of DNA sequences
+Operations on strings of DNA sequences.
+
+The whole-sequence functions take str or any object supporting the buffer
+protocol with one byte per base, such as bytes, bytearray, memoryview, mmap,
+or a NumPy uint8 array.  They work on all of the sequence at once using
+bytes.translate, bytes.count and regular expressions, rather than base by
+base.  If NumPy is installed, it is used for k-mer counting.
 """
+import re
+from array import array
+from collections import Counter
 from pycbio import PycbioException
+try:
+    import numpy
+except ModuleNotFoundError:
+    numpy = None
 
 
 ##
@@ -53,3 +66,115 @@ def isValidBase(base):
         return ord(base) in _ordValidBases
     else:
         _dnaTypeError(base)
+
+
+##
+# whole-sequence operations
+##
+_ordValidBasesBytes = bytes(sorted(_ordValidBases))
+_invalidBaseRe = re.compile(b"[^" + re.escape(_ordValidBasesBytes) + b"]")
+# translation tables to 1 for a base in a set and 0 for others
+_nTable = bytes((1 if b in b"Nn" else 0) for b in range(256))
+_gcTable = bytes((1 if b in b"GCgc" else 0) for b in range(256))
+_acgtTable = bytes((1 if b in b"ACGTacgt" else 0) for b in range(256))
+# translation table to two-bit base code, and 4 for other bases
+_baseCodeTable = bytes(b"ACGTacgt".find(b) % 4 if b in b"ACGTacgt" else 4 for b in range(256))
+
+def _asBytes(dna):
+    "get DNA as a bytes-like object supporting translate and count"
+    if isinstance(dna, (bytes, bytearray)):
+        return dna
+    elif isinstance(dna, str):
+        return dna.encode("ascii", "replace")
+    else:
+        try:
+            return memoryview(dna).cast('B').tobytes()
+        except TypeError:
+            _dnaTypeError(dna)
+
+def _byteView(buf):
+    "get a one-dimensional, byte memoryview of a buffer"
+    view = memoryview(buf)
+    return view if (view.format == 'B') and (view.ndim == 1) else view.cast('B')
+
+def reverseComplementInto(dna, out):
+    """reverse complement dna into the writable buffer out, which must be the
+    same length and may be dna itself.  Returns out."""
+    outView = _byteView(out)
+    if len(outView) != len(dna):
+        raise ValueError(f"output buffer length {len(outView)} does not match DNA length {len(dna)}")
+    outView[:] = _asBytes(dna).translate(_bytesComplements)[::-1]
+    return out
+
+def isValidSeq(dna):
+    "are all bases in a sequence valid"
+    return len(_asBytes(dna).translate(None, _ordValidBasesBytes)) == 0
+
+def firstInvalidBase(dna):
+    "position of the first invalid base in a sequence, or -1 if all are valid"
+    m = _invalidBaseRe.search(_asBytes(dna))
+    return -1 if m is None else m.start()
+
+def findNRuns(dna, minSize=1):
+    "list of (start, end) of runs of N bases of at least minSize"
+    isN = _asBytes(dna).translate(_nTable)
+    runs = []
+    start = isN.find(1)
+    while start >= 0:
+        end = isN.find(0, start)
+        if end < 0:
+            end = len(isN)
+        if end - start >= minSize:
+            runs.append((start, end))
+        start = isN.find(1, end)
+    return runs
+
+def gcContentWindows(dna, windowSize, step=None):
+    """Compute the GC content of windows of windowSize bases, starting every
+    step bases, which defaults to windowSize.  Windows at the end of the
+    sequence are truncated.  Returns an array of the fraction of the A, C, G,
+    and T bases in each window that are G or C, which is NaN for windows
+    without any of these bases."""
+    if step is None:
+        step = windowSize
+    if (windowSize <= 0) or (step <= 0):
+        raise ValueError("windowSize and step must be positive")
+    dna = _asBytes(dna)
+    gc = dna.translate(_gcTable)
+    acgt = dna.translate(_acgtTable)
+    fracs = array('d')
+    for start in range(0, len(dna), step):
+        end = start + windowSize
+        numAcgt = acgt.count(1, start, end)
+        fracs.append(gc.count(1, start, end) / numAcgt if numAcgt > 0 else float("nan"))
+    return fracs
+
+def _kmerCountsNumpy(codes, k):
+    "count k-mers from 2-bit base codes, with 4 for other bases"
+    codes = numpy.frombuffer(codes, dtype=numpy.uint8)
+    numKmers = len(codes) - k + 1
+    invalid = numpy.concatenate(([0], numpy.cumsum(codes == 4)))
+    valid = (invalid[k:] - invalid[:numKmers]) == 0
+    kmerCodes = numpy.zeros(numKmers, dtype=numpy.int64)
+    for i in range(k):
+        kmerCodes = (kmerCodes << 2) | (codes[i:i + numKmers] & 3)
+    return numpy.bincount(kmerCodes[valid], minlength=4 ** k)
+
+def _kmerFromCode(code, k):
+    return "".join("ACGT"[(code >> (2 * (k - 1 - i))) & 3] for i in range(k))
+
+def kmerCounts(dna, k, *, chunkSize=16 * 1024 * 1024):
+    """Count the k-mers in a sequence, ignoring case.  K-mers containing bases
+    other than A, C, G, or T are not counted.  Returns a Counter of upper-case
+    str k-mers.  With NumPy, chunkSize bases are processed at a time."""
+    if k <= 0:
+        raise ValueError(f"k must be positive, got {k}")
+    codes = _asBytes(dna).translate(_baseCodeTable)
+    if (numpy is not None) and (k <= 12):
+        counts = numpy.zeros(4 ** k, dtype=numpy.int64)
+        for start in range(0, max(len(codes) - k + 1, 0), chunkSize):
+            counts += _kmerCountsNumpy(codes[start:start + chunkSize + k - 1], k)
+        return Counter({_kmerFromCode(int(code), k): int(counts[code]) for code in numpy.flatnonzero(counts)})
+    else:
+        seq = codes.translate(b"ACGT" + bytes(252)).decode("ascii")
+        return Counter(kmer for part in seq.split("\x00") for kmer in (part[i:i + k] for i in range(len(part) - k + 1)))
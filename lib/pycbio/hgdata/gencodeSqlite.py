@@ -370,7 +370,7 @@ class GencodeGene(namedtuple("GencodeGene",
     __slots__ = ()
 
     def __new__(cls, chrom, chromStart, chromEnd, name, score, strand, geneType, geneName):
-        return super(GencodeGene, cls).__new__(cls, chrom, int(chromStart), chromEnd, int(name),
+        return super(GencodeGene, cls).__new__(cls, chrom, int(chromStart), int(chromEnd), name,
                                                int(score), strand, geneType, geneName)
 
 
@@ -385,13 +385,13 @@ class GencodeGeneSqliteTable(HgSqliteTable):
              score INT UNSIGNED NOT NULL DEFAULT 0,
              strand TEXT NOT NULL,
              geneType TEXT NOT NULL,
-             geneName TEXT NOT NULL
+             geneName TEXT NOT NULL)
         """
     insertSql = """INSERT INTO {table} ({columns}) VALUES ({values});"""
     indexSql = [
         """CREATE INDEX {table}_chrom_bin ON {table} (chrom, bin)""",
         """CREATE INDEX {table}_name ON {table} (name)""",
-        """CREATE INDEX {table}_geneType ON {table} (geneId)"""]
+        """CREATE INDEX {table}_geneType ON {table} (geneType)"""]
 
     # doesn't include bin
     columnNames = ("chrom", "chromStart", "chromEnd", "name",
@@ -410,8 +410,16 @@ class GencodeGeneSqliteTable(HgSqliteTable):
         """create index after loading"""
         self._index(self.indexSql)
 
+    def rtreeIndex(self):
+        """create an R*Tree index on the gene range after loading, which is
+        then used by getRangeOverlap instead of the bin index.  The index is
+        dropped if rows are loaded afterwards, as it is not updated; call this
+        again after loading to recreate it."""
+        self._createRTree("chrom", "chromStart", "chromEnd")
+
     def loadsWithBin(self, binnedRows):
-        """load GencodeGene rows which already have bin column"""
+        """load GencodeGene rows which already have bin column, dropping any R*Tree index"""
+        self._dropRTree()
         self._inserts(self.insertSql, self.columnNamesBin, binnedRows)
 
     def loads(self, rows):
@@ -424,7 +432,7 @@ class GencodeGeneSqliteTable(HgSqliteTable):
 
     @staticmethod
     def _getRowFactory(raw):
-        return None if raw else lambda cur, row: GencodeGene(row)
+        return None if raw else lambda cur, row: GencodeGene(*row)
 
     def getAll(self, raw=False):
         """Generator for all GencodeGene in a table. Don't convert to GencodeGene
@@ -453,12 +461,8 @@ class GencodeGeneSqliteTable(HgSqliteTable):
         """Get annotations overlapping range To query the whole sequence, set
         start and end to None.  If raw is specified. Don't convert to GencodeGene
         objects if raw is True."""
-        if start is None:
-            rangeWhere = "(chrom = '{}')".format(chrom)
-        else:
-            rangeWhere = rangeFinder.getOverlappingSqlExpr("bin", "chrom", "txStart", "txEnd", chrom, start, end)
-            sql = "SELECT {{columns}} FROM {{table}} WHERE {}".format(rangeWhere)
-            sqlArgs = []
+        rangeWhere, sqlArgs = self._rangeOverlapWhere("bin", "chrom", "chromStart", "chromEnd", chrom, start, end)
+        sql = "SELECT {{columns}} FROM {{table}} WHERE {}".format(rangeWhere)
         if strand is not None:
             sql += " AND (strand = ?)"
             sqlArgs.append(strand)
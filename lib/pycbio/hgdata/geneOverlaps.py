@@ -0,0 +1,127 @@
+# Copyright 2006-2026 Mark Diekhans
+"""Bulk computation of the exon and CDS overlap of all pairs of overlapping
+genes in two sets of GenePred or PackedGenePred objects.
+
+The exons of both sets are sorted and the overlapping exons found in a
+single sweep, accumulating overlapping bases for each pair of genes.  This
+gives the same results as calling GenePred.overlapAmt, cdsOverlapAmt,
+similarity and cdsSimilarity for each pair of genes found with a
+RangeFinder, without comparing all exons of each candidate pair.  The
+results are stored in a table of arrays.
+"""
+from array import array
+from collections import namedtuple, defaultdict
+from pycbio.hgdata.genePred import PackedGenePred
+
+
+class GeneOverlap(namedtuple("GeneOverlap", ("gene1", "gene2", "exonOverlap", "cdsOverlap",
+                                             "similarity", "cdsSimilarity"))):
+    """overlap of a pair of genes, with the number of overlapping exon and
+    CDS bases and the similarities as computed by GenePred.similarity
+    and GenePred.cdsSimilarity"""
+    __slots__ = ()
+
+
+def _similarity(overlap, len1, len2):
+    return (2 * overlap) / (len1 + len2) if overlap > 0 else 0.0
+
+def _geneLens(lens, genes, iGene):
+    "get (exon length, CDS length) of a gene, saving in lens dict"
+    geneLens = lens.get(iGene)
+    if geneLens is None:
+        geneLens = lens[iGene] = (genes[iGene].getLenExons(), genes[iGene].getLenCds())
+    return geneLens
+
+
+class GeneOverlapTable:
+    """Table of overlapping pairs of genes, sorted by gene indexes.  Columns
+    are stored in arrays: idx1 and idx2 are the indexes of the genes in
+    genes1 and genes2, exonOverlap and cdsOverlap are the number of
+    overlapping bases, and similarity and cdsSimilarity are the
+    similarities.  Indexing or iterating returns GeneOverlap objects."""
+    def __init__(self, genes1, genes2, pairOverlaps):
+        self.genes1 = genes1
+        self.genes2 = genes2
+        self.idx1 = array('l')
+        self.idx2 = array('l')
+        self.exonOverlap = array('q')
+        self.cdsOverlap = array('q')
+        self.similarity = array('d')
+        self.cdsSimilarity = array('d')
+        lens1, lens2 = {}, {}
+        for (i1, i2), (exonOverlap, cdsOverlap) in sorted(pairOverlaps.items()):
+            lenExons1, lenCds1 = _geneLens(lens1, genes1, i1)
+            lenExons2, lenCds2 = _geneLens(lens2, genes2, i2)
+            self.idx1.append(i1)
+            self.idx2.append(i2)
+            self.exonOverlap.append(exonOverlap)
+            self.cdsOverlap.append(cdsOverlap)
+            self.similarity.append(_similarity(exonOverlap, lenExons1, lenExons2))
+            self.cdsSimilarity.append(_similarity(cdsOverlap, lenCds1, lenCds2))
+
+    def __len__(self):
+        return len(self.idx1)
+
+    def __getitem__(self, i):
+        return GeneOverlap(self.genes1[self.idx1[i]], self.genes2[self.idx2[i]],
+                           self.exonOverlap[i], self.cdsOverlap[i],
+                           self.similarity[i], self.cdsSimilarity[i])
+
+    def __iter__(self):
+        for i in range(len(self.idx1)):
+            yield self[i]
+
+
+def _exonRanges(gene):
+    "get (starts, ends) of exons of a GenePred or PackedGenePred"
+    if isinstance(gene, PackedGenePred):
+        return gene.exonStarts, gene.exonEnds
+    else:
+        return [e.start for e in gene.exons], [e.end for e in gene.exons]
+
+def _addExons(groups, genes, side, stranded):
+    """add exons to groups by (chrom, strand) as tuples of (start, end,
+    cdsStart, cdsEnd, side, gene index), where cdsStart and cdsEnd are the
+    CDS in the exon, with cdsStart >= cdsEnd if there is no CDS"""
+    for iGene, gene in enumerate(genes):
+        exons = groups[(gene.chrom, gene.strand if stranded else None)]
+        cdsStart, cdsEnd = gene.cdsStart, gene.cdsEnd
+        for start, end in zip(*_exonRanges(gene)):
+            exons.append((start, end, max(start, cdsStart), min(end, cdsEnd), side, iGene))
+
+def _sweepExons(exons, pairOverlaps):
+    "find overlapping exons of the two sides, adding overlaps to pairOverlaps"
+    exons.sort()
+    active = ([], [])
+    for exon in exons:
+        start, end, cdsStart, cdsEnd, side, iGene = exon
+        if end <= start:
+            continue  # empty exons don't overlap
+        others = active[1 - side]
+        if len(others) > 0:
+            # drop exons ending before this one, later exons will not overlap them
+            others[:] = [other for other in others if other[1] > start]
+            for oStart, oEnd, oCdsStart, oCdsEnd, _, oGene in others:
+                key = (iGene, oGene) if side == 0 else (oGene, iGene)
+                overlaps = pairOverlaps.get(key)
+                if overlaps is None:
+                    overlaps = pairOverlaps[key] = [0, 0]
+                overlaps[0] += min(end, oEnd) - max(start, oStart)
+                cdsOverlap = min(cdsEnd, oCdsEnd) - max(cdsStart, oCdsStart)
+                if cdsOverlap > 0:
+                    overlaps[1] += cdsOverlap
+        active[side].append(exon)
+
+def geneOverlaps(genes1, genes2, *, stranded=True):
+    """Find all pairs of genes from the sequences genes1 and genes2 with
+    overlapping exons, returning a GeneOverlapTable.  Genes are GenePred or
+    PackedGenePred objects and do not need to be sorted.  If stranded is
+    True, genes only overlap if they are on the same strand, as with
+    GenePred.overlapAmt."""
+    groups = defaultdict(list)
+    _addExons(groups, genes1, 0, stranded)
+    _addExons(groups, genes2, 1, stranded)
+    pairOverlaps = {}
+    for exons in groups.values():
+        _sweepExons(exons, pairOverlaps)
+    return GeneOverlapTable(genes1, genes2, pairOverlaps)
@@ -1,10 +1,14 @@
 # Copyright 2006-2026 Mark Diekhans
+import sys
 import copy
+from array import array
+from bisect import bisect_right
 from collections import defaultdict, namedtuple
-from pycbio.tsv.tabFile import TabFileReader
+from pycbio.tsv.tabFile import TabFileReader, TabFileParallelReader
 from pycbio.hgdata.autoSql import intArraySplit, intArrayJoin
 from pycbio.hgdata.frame import Frame
 from pycbio.sys.symEnum import SymEnum, SymEnumValue
+from pycbio.sys import fileOps
 from pycbio import PycbioException
 
 
@@ -76,10 +80,8 @@ class Exon:
         self.iExon = iExon
         self.start = start
         self.end = end
-        if isinstance(frame, int) and (frame == -1):
-            frame = None
-        elif frame is not None:
-            frame = Frame(frame)
+        if (frame is not None) and (type(frame) is not Frame):
+            frame = None if frame == -1 else Frame(frame)
         self.frame = frame
 
     def __str__(self):
@@ -168,42 +170,10 @@ class Exon:
             return Range(chromSize - self.end, chromSize - self.start)
 
 
-class GenePred:
-    """Object wrapper for a genePred"""
-
-    def __init__(self, name=None, chrom=None, strand=None, txStart=None, txEnd=None, cdsStart=None, cdsEnd=None):
-        self.name = name
-        self.chrom = chrom
-        self.strand = strand
-        self.txStart = txStart
-        self.txEnd = txEnd
-        self.cdsStart = cdsStart
-        self.cdsEnd = cdsEnd
-        self.exons = []
-        self.score = None
-        self.name2 = None
-        self.cdsStartStat = None
-        self.cdsEndStat = None
-        self.hasExonFrames = False
-        self.cdsStartIExon = None
-        self.cdsEndIExon = None
-
-    def clone(self):
-        "name a copy"
-        return copy.deepcopy(self)
-
-    def _cloneToOtherStrand(self, chromSize):
-        "swap coordinates to other strand"
-        gp = copy.copy(self)
-        gp.txStart = chromSize - self.txEnd
-        gp.txEnd = chromSize - self.txStart
-        gp.cdsStart = chromSize - self.cdsEnd
-        gp.cdsEnd = chromSize - self.cdsStart
-        gp.cdsStartIExon = gp.cdsEndIExon = None
-        gp.exons = []
-        for exon in reversed(self.exons):
-            gp.addExon(chromSize - exon.end, chromSize - exon.start, exon.frame)
-        return gp
+class _GenePredBase:
+    """Methods shared by GenePred and PackedGenePred that do not depend on
+    how the exons are stored"""
+    __slots__ = ()
 
     def inDirectionOfTranscription(self):
         "are exons in the direction of transcriptions"
@@ -212,37 +182,6 @@ class GenePred:
     def _overlapsCds(self, exonStart, exonEnd):
         return (self.cdsStart is not None) and (self.cdsStart < self.cdsEnd) and (exonStart < self.cdsEnd) and (exonEnd > self.cdsStart)
 
-    def addExon(self, exonStart, exonEnd, frame=None):
-        "add an exon; which must be done in assending order"
-        i = len(self.exons)
-        self.exons.append(Exon(self, i, exonStart, exonEnd, frame))
-        if self._overlapsCds(exonStart, exonEnd):
-            if self.cdsStartIExon is None:
-                self.cdsStartIExon = i
-            self.cdsEndIExon = i
-        return self.exons[-1]
-
-    def assignFrames(self):
-        "set frames on exons, assuming no frame shift"
-        if self.inDirectionOfTranscription():
-            iStart = 0
-            iEnd = len(self.exons)
-            iDir = 1
-        else:
-            iStart = len(self.exons) - 1
-            iEnd = -1
-            iDir = -1
-        cdsOff = 0
-        for i in range(iStart, iEnd, iDir):
-            e = self.exons[i]
-            c = e.getCds()
-            if c is not None:
-                e.frame = cdsOff % 3
-                cdsOff += (c.end - c.start)
-            else:
-                e.frame = -1
-        self.hasExonFrames = True
-
     def overlaps(self, start, end):
         "test if a range overlaps the gene range"
         return (start < self.txEnd) and (end > self.txStart)
@@ -292,22 +231,6 @@ class GenePred:
         else:
             return None
 
-    def getLenExons(self):
-        "get the total length of all exons"
-        bases = 0
-        for e in self.exons:
-            bases += e.size()
-        return bases
-
-    def getLenCds(self):
-        "get the total length of CDS"
-        bases = 0
-        for e in self.exons:
-            cds = e.getCds()
-            if cds is not None:
-                bases += cds.end - cds.start
-        return bases
-
     def getSpan(self):
         "get the genomic span (txStart to txEnd length)"
         return self.txEnd - self.txStart
@@ -319,33 +242,18 @@ class GenePred:
         else:
             return (self.cdsEndIExon - self.cdsStartIExon) + 1
 
-    def getCdsExon(self, iCdsExon):
-        "get a exon containing CDS, by CDS exon index"
-        return self.exons[self.cdsStartIExon + iCdsExon]
-
-    def getSortedExonIndexes(self):
-        "generator for exon indexes sorted in order of transcription"
-        if self.inDirectionOfTranscription():
-            return list(range(0, len(self.exons), 1))
-        else:
-            return list(range(len(self.exons) - 1, -1, -1))
-
     def getSortedExons(self):
         "get list of exons, sorted in order of transcription."
         if self.inDirectionOfTranscription():
             return list(self.exons)
         else:
-            return [self.exons[i] for i in range(len(self.exons) - 1, -1, -1)]
+            return list(reversed(self.exons))
 
     def getRow(self):
         # FIXME standardize on getRow or Psl.toRow
+        starts, ends, frames = self._getExonColumns()
         row = [self.name, self.chrom, self.strand, str(self.txStart), str(self.txEnd), str(self.cdsStart), str(self.cdsEnd)]
-        row.append(str(len(self.exons)))
-        starts = []
-        ends = []
-        for e in self.exons:
-            starts.append(e.start)
-            ends.append(e.end)
+        row.append(str(len(starts)))
         row.append(intArrayJoin(starts))
         row.append(intArrayJoin(ends))
 
@@ -366,12 +274,8 @@ class GenePred:
             row.append(str(CdsStat.unknown))
             row.append(str(CdsStat.unknown))
         if self.hasExonFrames or hasExt:
-            frames = []
-            if self.hasExonFrames:
-                for e in self.exons:
-                    frames.append(-1 if e.frame is None else e.frame)
-            else:
-                frames = len(self.exons) * [-1]
+            if not self.hasExonFrames:
+                frames = len(starts) * [-1]
             row.append(intArrayJoin(frames))
         return row
 
@@ -390,16 +294,6 @@ class GenePred:
                 return exon
         return None
 
-    def overlapAmt(self, gp2):
-        "count exon bases that overlap"
-        if (self.chrom != gp2.chrom) or (self.strand != gp2.strand):
-            return 0
-        cnt = 0
-        for e1 in self.exons:
-            for e2 in gp2.exons:
-                cnt += e1.overlapAmt(e2.start, e2.end)
-        return cnt
-
     def similarity(self, gp2):
         "compute similariy of two genes"
         overCnt = self.overlapAmt(gp2)
@@ -408,20 +302,6 @@ class GenePred:
         else:
             return (2 * overCnt) / (self.getLenExons() + gp2.getLenExons())
 
-    def cdsOverlapAmt(self, gp2):
-        "count cds bases that overlap"
-        if (self.chrom != gp2.chrom) or (self.strand != gp2.strand):
-            return 0
-        feats2 = gp2.getFeatures()
-        cnt = 0
-        for e1 in self.exons:
-            f1 = e1.featureSplit()
-            if f1.cds is not None:
-                for f2 in feats2:
-                    if f2.cds is not None:
-                        cnt += f1.cds.overlapAmt(f2.cds)
-        return cnt
-
     def cdsSimilarity(self, gp2):
         "compute similariy of CDS of two genes"
         overCnt = self.cdsOverlapAmt(gp2)
@@ -445,8 +325,355 @@ class GenePred:
         fh.write(str(self))
         fh.write("\n")
 
+
+class GenePred(_GenePredBase):
+    """Object wrapper for a genePred"""
+
+    def __init__(self, name=None, chrom=None, strand=None, txStart=None, txEnd=None, cdsStart=None, cdsEnd=None):
+        self.name = name
+        self.chrom = chrom
+        self.strand = strand
+        self.txStart = txStart
+        self.txEnd = txEnd
+        self.cdsStart = cdsStart
+        self.cdsEnd = cdsEnd
+        self.exons = []
+        self.score = None
+        self.name2 = None
+        self.cdsStartStat = None
+        self.cdsEndStat = None
+        self.hasExonFrames = False
+        self.cdsStartIExon = None
+        self.cdsEndIExon = None
+
+    def clone(self):
+        "name a copy"
+        return copy.deepcopy(self)
+
+    def _cloneToOtherStrand(self, chromSize):
+        "swap coordinates to other strand"
+        gp = copy.copy(self)
+        gp.txStart = chromSize - self.txEnd
+        gp.txEnd = chromSize - self.txStart
+        gp.cdsStart = chromSize - self.cdsEnd
+        gp.cdsEnd = chromSize - self.cdsStart
+        gp.cdsStartIExon = gp.cdsEndIExon = None
+        gp.exons = []
+        for exon in reversed(self.exons):
+            gp.addExon(chromSize - exon.end, chromSize - exon.start, exon.frame)
+        return gp
+
+    def addExon(self, exonStart, exonEnd, frame=None):
+        "add an exon; which must be done in assending order"
+        i = len(self.exons)
+        self.exons.append(Exon(self, i, exonStart, exonEnd, frame))
+        if self._overlapsCds(exonStart, exonEnd):
+            if self.cdsStartIExon is None:
+                self.cdsStartIExon = i
+            self.cdsEndIExon = i
+        return self.exons[-1]
+
+    def assignFrames(self):
+        "set frames on exons, assuming no frame shift"
+        if self.inDirectionOfTranscription():
+            iStart = 0
+            iEnd = len(self.exons)
+            iDir = 1
+        else:
+            iStart = len(self.exons) - 1
+            iEnd = -1
+            iDir = -1
+        cdsOff = 0
+        for i in range(iStart, iEnd, iDir):
+            e = self.exons[i]
+            c = e.getCds()
+            if c is not None:
+                e.frame = cdsOff % 3
+                cdsOff += (c.end - c.start)
+            else:
+                e.frame = -1
+        self.hasExonFrames = True
+
+    def getLenExons(self):
+        "get the total length of all exons"
+        bases = 0
+        for e in self.exons:
+            bases += e.size()
+        return bases
+
+    def getLenCds(self):
+        "get the total length of CDS"
+        bases = 0
+        for e in self.exons:
+            cds = e.getCds()
+            if cds is not None:
+                bases += cds.end - cds.start
+        return bases
+
+    def getCdsExon(self, iCdsExon):
+        "get a exon containing CDS, by CDS exon index"
+        return self.exons[self.cdsStartIExon + iCdsExon]
+
+    def getSortedExonIndexes(self):
+        "generator for exon indexes sorted in order of transcription"
+        if self.inDirectionOfTranscription():
+            return list(range(0, len(self.exons), 1))
+        else:
+            return list(range(len(self.exons) - 1, -1, -1))
+
+    def _getExonColumns(self):
+        "get lists of exon starts, ends and frames"
+        return ([e.start for e in self.exons], [e.end for e in self.exons],
+                [(-1 if e.frame is None else e.frame) for e in self.exons])
+
+    def overlapAmt(self, gp2):
+        "count exon bases that overlap"
+        if (self.chrom != gp2.chrom) or (self.strand != gp2.strand):
+            return 0
+        cnt = 0
+        for e1 in self.exons:
+            for e2 in gp2.exons:
+                cnt += e1.overlapAmt(e2.start, e2.end)
+        return cnt
+
+    def cdsOverlapAmt(self, gp2):
+        "count cds bases that overlap"
+        if (self.chrom != gp2.chrom) or (self.strand != gp2.strand):
+            return 0
+        feats2 = gp2.getFeatures()
+        cnt = 0
+        for e1 in self.exons:
+            f1 = e1.featureSplit()
+            if f1.cds is not None:
+                for f2 in feats2:
+                    if f2.cds is not None:
+                        cnt += f1.cds.overlapAmt(f2.cds)
+        return cnt
+
+
+# Exon frame, indexed by the stored frame plus one
+_exonFrames = (None, Frame(0), Frame(1), Frame(2))
+
+def _frameCode(frame):
+    "convert an exon frame to the stored value, -1 for no frame"
+    return -1 if frame is None else int(frame)
+
+def _sortedRangesOverlapAmt(ranges1, ranges2):
+    "count overlapping bases of two lists of sorted, non-overlapping (start, end)"
+    cnt = 0
+    i1 = i2 = 0
+    while (i1 < len(ranges1)) and (i2 < len(ranges2)):
+        start1, end1 = ranges1[i1]
+        start2, end2 = ranges2[i2]
+        if (start1 < end2) and (start2 < end1):
+            cnt += min(end1, end2) - max(start1, start2)
+        if end1 <= end2:
+            i1 += 1
+        else:
+            i2 += 1
+    return cnt
+
+
+def _coordProperty(idx, doc):
+    "property for a gene coordinate stored in PackedGenePred._coords"
+    def get(self):
+        return self._coords[idx]
+
+    def set(self, value):
+        self._coords[idx] = value
+    return property(get, set, doc=doc)
+
+
+class PackedGenePred(_GenePredBase):
+    """A compact genePred, with the coordinates stored as an array of
+    unsigned 32-bit integers and the exon frames as an array of bytes, with
+    -1 for no frame.  It has the same interface as GenePred, however the
+    exons field is a list of Exon objects created on each access.  These are
+    views of the arrays and changing them does not change the gene.  Use
+    getExon(i) to get a single exon.  The exonStarts and exonEnds fields are
+    copies of the coordinates.  The exon length, CDS length and overlap
+    methods are computed from the arrays.  This uses about a third of the
+    memory of GenePred."""
+    __slots__ = ("name", "chrom", "strand", "_coords", "exonFrames", "score", "name2",
+                 "cdsStartStat", "cdsEndStat", "hasExonFrames", "cdsStartIExon", "cdsEndIExon")
+
+    # _coords is txStart, txEnd, cdsStart, cdsEnd, followed by the start
+    # and end of each exon
+    _EXONS_OFF = 4
+
+    txStart = _coordProperty(0, "transcript start")
+    txEnd = _coordProperty(1, "transcript end")
+    cdsStart = _coordProperty(2, "CDS start")
+    cdsEnd = _coordProperty(3, "CDS end")
+
+    def __init__(self, name=None, chrom=None, strand=None, txStart=0, txEnd=0, cdsStart=0, cdsEnd=0):
+        self.name = name
+        self.chrom = chrom
+        self.strand = strand
+        self._coords = array('I', (txStart, txEnd, cdsStart, cdsEnd))
+        self.exonFrames = array('b')
+        self.score = None
+        self.name2 = None
+        self.cdsStartStat = None
+        self.cdsEndStat = None
+        self.hasExonFrames = False
+        self.cdsStartIExon = None
+        self.cdsEndIExon = None
+
+    @classmethod
+    def fromGenePred(cls, gp):
+        "create from a GenePred or PackedGenePred object"
+        pgp = cls(gp.name, gp.chrom, gp.strand, gp.txStart, gp.txEnd, gp.cdsStart, gp.cdsEnd)
+        pgp._setExons(*gp._getExonColumns())
+        pgp.score = gp.score
+        pgp.name2 = gp.name2
+        pgp.cdsStartStat = gp.cdsStartStat
+        pgp.cdsEndStat = gp.cdsEndStat
+        pgp.hasExonFrames = gp.hasExonFrames
+        return pgp
+
+    def clone(self):
+        "name a copy"
+        return copy.deepcopy(self)
+
+    def _setExons(self, exonStarts, exonEnds, exonFrames):
+        "set the exons from sequences of starts, ends and frames, exonFrames maybe None"
+        del self._coords[self._EXONS_OFF:]
+        for exonStart, exonEnd in zip(exonStarts, exonEnds):
+            self._coords.append(exonStart)
+            self._coords.append(exonEnd)
+        self.exonFrames = array('b', exonFrames) if exonFrames is not None else array('b', [-1]) * len(exonStarts)
+        self.cdsStartIExon = self.cdsEndIExon = None
+        for i, (exonStart, exonEnd) in enumerate(zip(exonStarts, exonEnds)):
+            if self._overlapsCds(exonStart, exonEnd):
+                if self.cdsStartIExon is None:
+                    self.cdsStartIExon = i
+                self.cdsEndIExon = i
+
+    @property
+    def exonStarts(self):
+        "array of exon starts"
+        return self._coords[self._EXONS_OFF::2]
+
+    @property
+    def exonEnds(self):
+        "array of exon ends"
+        return self._coords[self._EXONS_OFF + 1::2]
+
+    def _exonRanges(self, iStart=0, iEnd=None):
+        "list of (start, end) of a range of exons"
+        coords = self._coords
+        iEnd = len(self.exonFrames) if iEnd is None else iEnd
+        return [(coords[j], coords[j + 1]) for j in range(self._EXONS_OFF + 2 * iStart, self._EXONS_OFF + 2 * iEnd, 2)]
+
+    def getExon(self, iExon):
+        "get an Exon view of an exon"
+        j = self._EXONS_OFF + 2 * iExon
+        return Exon(self, iExon, self._coords[j], self._coords[j + 1], _exonFrames[self.exonFrames[iExon] + 1])
+
+    @property
+    def exons(self):
+        "list of Exon views of the exons"
+        return [Exon(self, i, start, end, _exonFrames[frame + 1])
+                for i, ((start, end), frame) in enumerate(zip(self._exonRanges(), self.exonFrames))]
+
+    def getNumExons(self):
+        "get the number of exons"
+        return len(self.exonFrames)
+
+    def addExon(self, exonStart, exonEnd, frame=None):
+        "add an exon; which must be done in assending order"
+        i = len(self.exonFrames)
+        self._coords.append(exonStart)
+        self._coords.append(exonEnd)
+        self.exonFrames.append(_frameCode(frame))
+        if self._overlapsCds(exonStart, exonEnd):
+            if self.cdsStartIExon is None:
+                self.cdsStartIExon = i
+            self.cdsEndIExon = i
+        return self.getExon(i)
+
+    def assignFrames(self):
+        "set frames on exons, assuming no frame shift"
+        exonRanges = self._exonRanges()
+        cdsOff = 0
+        for i in self.getSortedExonIndexes():
+            cdsStart = max(exonRanges[i][0], self.cdsStart)
+            cdsEnd = min(exonRanges[i][1], self.cdsEnd)
+            if cdsStart < cdsEnd:
+                self.exonFrames[i] = cdsOff % 3
+                cdsOff += cdsEnd - cdsStart
+            else:
+                self.exonFrames[i] = -1
+        self.hasExonFrames = True
+
+    def getLenExons(self):
+        "get the total length of all exons"
+        return sum(self._coords[self._EXONS_OFF + 1::2]) - sum(self._coords[self._EXONS_OFF::2])
+
+    def _getCdsRanges(self):
+        "get list of (start, end) of the CDS in each CDS exon"
+        if self.cdsStartIExon is None:
+            return []
+        cdsStart, cdsEnd = self.cdsStart, self.cdsEnd
+        return [(max(start, cdsStart), min(end, cdsEnd))
+                for start, end in self._exonRanges(self.cdsStartIExon, self.cdsEndIExon + 1)]
+
+    def getLenCds(self):
+        "get the total length of CDS"
+        if self.cdsStartIExon is None:
+            return 0
+        # only the first and last CDS exons are partially CDS
+        coords = self._coords
+        cdsStart, cdsEnd = coords[2], coords[3]
+        jStart = self._EXONS_OFF + 2 * self.cdsStartIExon
+        jEnd = self._EXONS_OFF + 2 * self.cdsEndIExon
+        return ((sum(coords[jStart + 1:jEnd + 2:2]) - sum(coords[jStart:jEnd + 1:2]))
+                - max(cdsStart - coords[jStart], 0) - max(coords[jEnd + 1] - cdsEnd, 0))
+
+    def getCdsExon(self, iCdsExon):
+        "get a exon containing CDS, by CDS exon index"
+        return self.getExon(self.cdsStartIExon + iCdsExon)
+
+    def getSortedExonIndexes(self):
+        "generator for exon indexes sorted in order of transcription"
+        if self.inDirectionOfTranscription():
+            return list(range(0, len(self.exonFrames), 1))
+        else:
+            return list(range(len(self.exonFrames) - 1, -1, -1))
+
+    def _getExonColumns(self):
+        "get arrays of exon starts, ends and frames"
+        return self.exonStarts, self.exonEnds, self.exonFrames
+
+    def findContainingExon(self, pos):
+        "find the exon contain pos, or None"
+        i = bisect_right(self.exonStarts, pos) - 1
+        if (i >= 0) and (pos < self._coords[self._EXONS_OFF + 2 * i + 1]):
+            return self.getExon(i)
+        return None
+
+    def overlapAmt(self, gp2):
+        "count exon bases that overlap, gp2 maybe a GenePred or PackedGenePred"
+        if (self.chrom != gp2.chrom) or (self.strand != gp2.strand):
+            return 0
+        if not isinstance(gp2, PackedGenePred):
+            gp2 = PackedGenePred.fromGenePred(gp2)
+        return _sortedRangesOverlapAmt(self._exonRanges(), gp2._exonRanges())
+
+    def cdsOverlapAmt(self, gp2):
+        "count cds bases that overlap, gp2 maybe a GenePred or PackedGenePred"
+        if (self.chrom != gp2.chrom) or (self.strand != gp2.strand):
+            return 0
+        if not isinstance(gp2, PackedGenePred):
+            gp2 = PackedGenePred.fromGenePred(gp2)
+        return _sortedRangesOverlapAmt(self._getCdsRanges(), gp2._getCdsRanges())
+
 def _buildExons(gp, exonStarts, exonEnds, exonFrames):
     "build array of exon objects"
+    if isinstance(gp, PackedGenePred):
+        gp._setExons(exonStarts, exonEnds, exonFrames)
+        return
     frame = None
     gp.cdsStartIExon = None
     gp.cdsEndIExon = None
@@ -455,9 +682,10 @@ def _buildExons(gp, exonStarts, exonEnds, exonFrames):
             frame = exonFrames[i]
         gp.addExon(exonStarts[i], exonEnds[i], frame)
 
-def genePredFromRow(row):
-    "create a GenePred object from a row in a genePred file"
-    gp = GenePred(row[0], row[1], row[2], int(row[3]), int(row[4]), int(row[5]), int(row[6]))
+def _genePredFromRow(gpClass, row):
+    gp = gpClass(row[0], row[1], row[2], int(row[3]), int(row[4]), int(row[5]), int(row[6]))
+    if gpClass is PackedGenePred:
+        gp.chrom = sys.intern(gp.chrom)
     exonStarts = intArraySplit(row[8])
     exonEnds = intArraySplit(row[9])
     iCol = 10
@@ -485,6 +713,14 @@ def genePredFromRow(row):
     _buildExons(gp, exonStarts, exonEnds, exonFrames)
     return gp
 
+def genePredFromRow(row):
+    "create a GenePred object from a row in a genePred file"
+    return _genePredFromRow(GenePred, row)
+
+def packedGenePredFromRow(row):
+    "create a PackedGenePred object from a row in a genePred file"
+    return _genePredFromRow(PackedGenePred, row)
+
 def _colOrNone(rec, colName, typeCnv):
     val = rec.get(colName)
     return None if (val is None) else typeCnv(val)
@@ -528,13 +764,114 @@ def genePredFromBigGenePred(row):
     return gp
 
 
+_cacheGeneCols = ("name", "chrom", "strand", "score", "name2", "cdsStartStat", "cdsEndStat",
+                  "hasExonFrames", "cdsStartIExon", "cdsEndIExon")
+_cacheGeneIntCols = ("txStart", "txEnd", "cdsStart", "cdsEnd")
+
+def _genePredsEncode(gps):
+    "encode GenePreds as columns for ParseCache"
+    cols = {col: [getattr(gp, col) for gp in gps] for col in _cacheGeneCols}
+    for col in _cacheGeneIntCols:
+        cols[col] = array('q', [getattr(gp, col) for gp in gps])
+    exonCols = [gp._getExonColumns() for gp in gps]
+    cols["exonCount"] = array('l', [len(starts) for starts, _, _ in exonCols])
+    cols["exonStarts"] = array('q', [start for starts, _, _ in exonCols for start in starts])
+    cols["exonEnds"] = array('q', [end for _, ends, _ in exonCols for end in ends])
+    cols["exonFrames"] = array('b', [frame for _, _, frames in exonCols for frame in frames])
+    return cols
+
+def _genePredsDecodeHeaders(cols, gpClass):
+    "generator of (gp, exonCount) with the non-exon fields decoded from columns"
+    for (name, chrom, strand, score, name2, cdsStartStat, cdsEndStat, hasExonFrames, cdsStartIExon, cdsEndIExon,
+         txStart, txEnd, cdsStart, cdsEnd, exonCount) in zip(*(cols[col] for col in _cacheGeneCols + _cacheGeneIntCols),
+                                                             cols["exonCount"]):
+        gp = gpClass(name, chrom, strand, txStart, txEnd, cdsStart, cdsEnd)
+        gp.score = score
+        gp.name2 = name2
+        gp.cdsStartStat = cdsStartStat
+        gp.cdsEndStat = cdsEndStat
+        gp.hasExonFrames = hasExonFrames
+        gp.cdsStartIExon = cdsStartIExon
+        gp.cdsEndIExon = cdsEndIExon
+        yield gp, exonCount
+
+def _genePredsDecode(cols):
+    "decode GenePreds from columns saved in ParseCache"
+    gps = []
+    exonStarts, exonEnds = cols["exonStarts"], cols["exonEnds"]
+    frames = (None, Frame(0), Frame(1), Frame(2))
+    exonFrames = [frames[frame + 1] for frame in cols["exonFrames"]]
+    iStart = 0
+    for gp, exonCount in _genePredsDecodeHeaders(cols, GenePred):
+        iEnd = iStart + exonCount
+        gp.exons = [Exon(gp, i, start, end, frame)
+                    for i, start, end, frame in zip(range(exonCount), exonStarts[iStart:iEnd],
+                                                    exonEnds[iStart:iEnd], exonFrames[iStart:iEnd])]
+        gps.append(gp)
+        iStart = iEnd
+    return gps
+
+def _packedGenePredsEncode(gps):
+    "encode PackedGenePreds as columns for ParseCache, with the coordinate arrays concatenated"
+    cols = {col: [getattr(gp, col) for gp in gps] for col in _cacheGeneCols}
+    cols["exonCount"] = array('l', [len(gp.exonFrames) for gp in gps])
+    cols["coords"] = array('I', b"".join([gp._coords.tobytes() for gp in gps]))
+    cols["exonFrames"] = array('b', b"".join([gp.exonFrames.tobytes() for gp in gps]))
+    return cols
+
+def _packedGenePredsDecode(cols):
+    """decode PackedGenePreds from columns saved in ParseCache, assigning the
+    fields directly, as this is the performance critical path"""
+    gps = []
+    coords = cols["coords"]
+    exonFrames = cols["exonFrames"]
+    new = PackedGenePred.__new__
+    iCoord = iExon = 0
+    for (name, chrom, strand, score, name2, cdsStartStat, cdsEndStat, hasExonFrames, cdsStartIExon, cdsEndIExon,
+         exonCount) in zip(*(cols[col] for col in _cacheGeneCols), cols["exonCount"]):
+        gp = new(PackedGenePred)
+        gp.name = name
+        gp.chrom = chrom
+        gp.strand = strand
+        gp.score = score
+        gp.name2 = name2
+        gp.cdsStartStat = cdsStartStat
+        gp.cdsEndStat = cdsEndStat
+        gp.hasExonFrames = hasExonFrames
+        gp.cdsStartIExon = cdsStartIExon
+        gp.cdsEndIExon = cdsEndIExon
+        iCoordEnd = iCoord + PackedGenePred._EXONS_OFF + 2 * exonCount
+        gp._coords = coords[iCoord:iCoordEnd]
+        gp.exonFrames = exonFrames[iExon:iExon + exonCount]
+        gps.append(gp)
+        iCoord = iCoordEnd
+        iExon += exonCount
+    return gps
+
+def _genePredsRead(fileName):
+    return list(GenePredReader(fileName))
+
+def _packedGenePredsRead(fileName):
+    return list(GenePredReader(fileName, packed=True))
+
+
 class GenePredTbl(list):
-    """Table of GenePred objects loaded from a tab-file"""
-    def __init__(self, fileName, buildIdx=False, buildUniqIdx=False, buildRangeIdx=False):
+    """Table of GenePred objects loaded from a tab-file.  If cache is a
+    pycbio.sys.parseCache.ParseCache object, the parsed file is saved in
+    and reloaded from the cache.  If packed is True, PackedGenePred objects
+    are loaded, which use much less memory."""
+    def __init__(self, fileName, buildIdx=False, buildUniqIdx=False, buildRangeIdx=False, *, cache=None, packed=False):
         if buildIdx and buildUniqIdx:
             raise PycbioException("can't specify both buildIdx and buildUniqIdx")
-        for row in GenePredReader(fileName):
-            self.append(row)
+        if (cache is not None) and fileOps.isFilePath(fileName):
+            if packed:
+                self.extend(cache.load(fileName, _packedGenePredsRead, kind="packedGenePred",
+                                       encode=_packedGenePredsEncode, decode=_packedGenePredsDecode))
+            else:
+                self.extend(cache.load(fileName, _genePredsRead, kind="genePred",
+                                       encode=_genePredsEncode, decode=_genePredsDecode))
+        else:
+            self.extend(GenePredReader(fileName, packed=packed))
         self.names = None
         self.rangeMap = None
         if buildUniqIdx:
@@ -563,9 +900,16 @@ class GenePredTbl(list):
             self.rangeMap.add(gene.chrom, gene.txStart, gene.txEnd, gene, gene.strand)
 
 
-def GenePredReader(fspec):
+def GenePredReader(fspec, *, workers=None, packed=False):
     """Read genePreds from a tab file which maybe specified as
-    a file name or a file-like object"""
-    for gp in TabFileReader(fspec, rowClass=lambda row: genePredFromRow(row),
-                            hashAreComments=True, skipBlankLines=True):
+    a file name or a file-like object.  If workers is greater than one,
+    parsing is done in that many processes, see TabFileParallelReader.
+    If packed is True, PackedGenePred objects are returned."""
+    rowClass = packedGenePredFromRow if packed else genePredFromRow
+    if (workers is not None) and (workers > 1):
+        reader = TabFileParallelReader(fspec, rowClass=rowClass, hashAreComments=True, skipBlankLines=True,
+                                       workers=workers)
+    else:
+        reader = TabFileReader(fspec, rowClass=rowClass, hashAreComments=True, skipBlankLines=True)
+    for gp in reader:
         yield gp
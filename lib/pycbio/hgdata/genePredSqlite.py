@@ -56,8 +56,16 @@ class GenePredSqliteTable(HgSqliteTable):
         """create index after loading"""
         self._index(self.indexSql)
 
+    def rtreeIndex(self):
+        """create an R*Tree index on the transcript range after loading, which is
+        then used by getRangeOverlap instead of the bin index.  The index is
+        dropped if rows are loaded afterwards, as it is not updated; call this
+        again after loading to recreate it."""
+        self._createRTree("chrom", "txStart", "txEnd")
+
     def loadsWithBin(self, binnedRows):
-        """load genePred rows which already have bin column"""
+        """load genePred rows which already have bin column, dropping any R*Tree index"""
+        self._dropRTree()
         self._inserts(self.insertSql, self.columnNamesBin, binnedRows)
 
     def loads(self, rows):
@@ -106,12 +114,8 @@ class GenePredSqliteTable(HgSqliteTable):
         """Get annotations overlapping range To query the whole sequence, set
         start and end to None.  If raw is specified. Don't convert to GenePred
         objects if raw is True."""
-        if start is None:
-            rangeWhere = "(chrom = '{}')".format(chrom)
-        else:
-            rangeWhere = rangeFinder.getOverlappingSqlExpr("bin", "chrom", "txStart", "txEnd", chrom, start, end)
+        rangeWhere, sqlArgs = self._rangeOverlapWhere("bin", "chrom", "txStart", "txEnd", chrom, start, end)
         sql = "SELECT {{columns}} FROM {{table}} WHERE {}".format(rangeWhere)
-        sqlArgs = []
         if strand is not None:
             sql += " AND (strand = ?)"
             sqlArgs.append(strand)
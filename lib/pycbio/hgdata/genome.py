@@ -3,8 +3,10 @@
 import os
 import re
 from abc import ABC, abstractmethod
+from collections import OrderedDict
 from pycbio import PycbioDataError
 from pycbio.sys.symEnum import SymEnum
+from pycbio.hgdata.twoBit import TwoBitReader
 
 class GenomeFmt(SymEnum):
     """format of the genome sequence file"""
@@ -12,8 +14,20 @@ class GenomeFmt(SymEnum):
     twobit = 2
     guess = 3
 
+
+DEFAULT_WINDOW_SIZE = 16384
+DEFAULT_MAX_SPAN = 1048576
+
 class Genome(ABC):
-    """Random access to genome sequences"""
+    """Random access to genome sequences.  If cache_windows is greater than
+    zero, small requests are served from a least-recently-used cache of
+    that many decoded windows of window_size bases, which greatly speeds up
+    fetching many nearby short regions, such as splice sites."""
+
+    def __init__(self, *, cache_windows=0, window_size=DEFAULT_WINDOW_SIZE):
+        self._cache_windows = cache_windows
+        self._window_size = window_size
+        self._windows = OrderedDict()
 
     @abstractmethod
     def get_seq_ids(self):
@@ -21,19 +35,75 @@ class Genome(ABC):
         pass
 
     @abstractmethod
-    def get_seq_length(self):
+    def get_seq_length(self, seq_id):
         "length of a sequence"
         pass
 
     @abstractmethod
+    def _fetch(self, seq_id, start, end):
+        "read a region of a sequence"
+        pass
+
+    def _get_window(self, seq_id, iwin):
+        key = (seq_id, iwin)
+        seq = self._windows.get(key)
+        if seq is not None:
+            self._windows.move_to_end(key)
+        else:
+            start = iwin * self._window_size
+            seq = self._windows[key] = self._fetch(seq_id, start,
+                                                   min(start + self._window_size, self.get_seq_length(seq_id)))
+            if len(self._windows) > self._cache_windows:
+                self._windows.popitem(last=False)
+        return seq
+
+    def _get_cached(self, seq_id, start, end):
+        ws = self._window_size
+        iwin = start // ws
+        off = start - iwin * ws
+        if (end - 1) // ws == iwin:
+            return self._get_window(seq_id, iwin)[off:off + (end - start)]
+        else:
+            return (self._get_window(seq_id, iwin)[off:] +
+                    self._get_window(seq_id, iwin + 1)[:end - (iwin + 1) * ws])
+
     def get_seq(self, seq_id, start=None, end=None):
         "get a sequence or region of a sequence"
-        pass
+        if start is None:
+            start = 0
+        if end is None:
+            end = self.get_seq_length(seq_id)
+        if (self._cache_windows > 0) and (0 < end - start <= self._window_size) and (end <= self.get_seq_length(seq_id)):
+            return self._get_cached(seq_id, start, end)
+        return self._fetch(seq_id, start, end)
+
+    def get_seqs(self, regions, *, max_gap=DEFAULT_WINDOW_SIZE, max_span=DEFAULT_MAX_SPAN):
+        """get sequences for an iterable of (seq_id, start, end) regions,
+        returning a list in the same order.  Regions are sorted and ones on
+        the same sequence separated by no more than max_gap bases are read
+        with a single fetch of up to max_span bases."""
+        regions = list(regions)
+        seqs = len(regions) * [None]
+        order = sorted(range(len(regions)), key=regions.__getitem__)
+        i = 0
+        while i < len(order):
+            seq_id, start, end = regions[order[i]]
+            j = i + 1
+            while ((j < len(order)) and (regions[order[j]][0] == seq_id) and (regions[order[j]][1] <= end + max_gap)
+                   and (regions[order[j]][2] - start <= max_span)):
+                end = max(end, regions[order[j]][2])
+                j += 1
+            seq = self._fetch(seq_id, start, end)
+            for k in order[i:j]:
+                seqs[k] = seq[regions[k][1] - start:regions[k][2] - start]
+            i = j
+        return seqs
 
 class _GenomeFasta(Genome):
     """Random access to samtools faidx FASTA genome sequences"""
 
-    def __init__(self, fasta_file):
+    def __init__(self, fasta_file, **cache_opts):
+        super().__init__(**cache_opts)
         import pysam  # lazy import
         self._fh = pysam.FastaFile(fasta_file)
 
@@ -43,43 +113,41 @@ class _GenomeFasta(Genome):
     def get_seq_length(self, seq_id):
         return self._fh.get_reference_length(seq_id)
 
-    def get_seq(self, seq_id, start=None, end=None):
+    def _fetch(self, seq_id, start, end):
         return self._fh.fetch(seq_id, start, end)
 
 class _GenomeTwoBit(Genome):
     """Random access to UCSC two-bit genome sequences"""
 
-    def __init__(self, twobit_file):
-        from twobitreader import TwoBitFile  # lazy import
-        self._fh = TwoBitFile(twobit_file)
+    def __init__(self, twobit_file, **cache_opts):
+        super().__init__(**cache_opts)
+        self._fh = TwoBitReader(twobit_file)
 
     def get_seq_ids(self):
-        return list(sorted(self._fh.keys()))
+        return list(sorted(self._fh.get_seq_ids()))
 
     def get_seq_length(self, seq_id):
-        return len(self._fh[seq_id])
+        return self._fh.get_seq_length(seq_id)
 
-    def get_seq(self, seq_id, start=None, end=None):
-        if start is None:
-            start = 0
-        if end is None:
-            end = self._fh.get_seq_length()
-        return self._fh[seq_id][start:end]
+    def _fetch(self, seq_id, start, end):
+        return self._fh.get_seq(seq_id, start, end)
 
 
-def genome_factory(seq_file, *, fmt=GenomeFmt.guess):
+def genome_factory(seq_file, *, fmt=GenomeFmt.guess, cache_windows=0, window_size=DEFAULT_WINDOW_SIZE):
     """create the genome reader for the format.  If guess is specified,
-    determine file type from extension"""
+    determine file type from extension.  See Genome for the window cache
+    options."""
+    cache_opts = dict(cache_windows=cache_windows, window_size=window_size)
     fasta_re = r".+\.(fa|fasta)(\.gz)?$"
     twobit_re = r".+\.2bit$"
     if fmt is GenomeFmt.fasta:
-        return _GenomeFasta(seq_file)
+        return _GenomeFasta(seq_file, **cache_opts)
     elif fmt is GenomeFmt.twobit:
-        return _GenomeTwoBit(seq_file)
+        return _GenomeTwoBit(seq_file, **cache_opts)
     elif fmt is GenomeFmt.guess:
         if re.match(fasta_re, os.fspath(seq_file)):
-            return _GenomeFasta(seq_file)
+            return _GenomeFasta(seq_file, **cache_opts)
         elif re.match(twobit_re, os.fspath(seq_file)):
-            return _GenomeTwoBit(seq_file)
+            return _GenomeTwoBit(seq_file, **cache_opts)
         else:
             raise PycbioDataError(f"can not determine genome file type for `{seq_file}'")
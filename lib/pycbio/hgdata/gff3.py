@@ -12,6 +12,7 @@ import re
 import collections
 from pycbio import PycbioException
 from pycbio.sys import fileOps
+from pycbio.sys.parseCache import gcDisabled
 
 GFF3_HEADER = "##gff-version 3"
 
@@ -55,23 +56,105 @@ def _encodeAttr(v):
         return v
 
 
+def _unquote(v):
+    """
+    Decode a column, attribute name or value, skipping the expensive
+    decoding when there is nothing to decode.
+    """
+    if '%' in v:
+        return urllib.parse.unquote(v)
+    else:
+        return v
+
+
+def _parseAttrVal(attrStr, fileName, lineNumber):
+    """
+    Parse `attr=val', returning tuple of (attr, values), where values is a
+    list to handle multi-value attributes.  GFF3 spec is not very specific
+    on the allowed values.
+    """
+    name, sep, val = attrStr.partition('=')
+    if not (sep and name and name[0].isascii() and name[0].isalpha()):
+        raise GFF3Exception("can't parse attr/value: '" + attrStr + "'",
+                            fileName, lineNumber)
+    # Split by comma separate then unquote.  Commas in values must be
+    # url encoded.
+    return (_unquote(name), [_unquote(v) for v in val.split(',')])
+
+
+def _parseAttrs(attrsStr, fileName, lineNumber):
+    """
+    Parse the attrs and values column into a dict of lists of values.
+    Attributes are separated by `;' optionally followed by spaces.
+    """
+    attrs = dict()
+    attrStrs = attrsStr.split(';')
+    for i, attrStr in enumerate(attrStrs):
+        name, vals = _parseAttrVal(attrStr if i == 0 else attrStr.lstrip(' '),
+                                   fileName, lineNumber)
+        if name in attrs:
+            raise GFF3Exception("duplicated attribute name: {}".format(name),
+                                fileName, lineNumber)
+        attrs[name] = vals
+    return attrs
+
+
+# cache of prefix and regular expression to find an attribute that is not
+# first in an unparsed column.  A regular expression anchored with `^|;' is
+# much slower to search.
+_scanAttrPats = {}
+
+
+def _scanAttr(attrsStr, name):
+    """
+    Find an attribute in an unparsed attribute column without parsing the
+    other attributes, returning the list of values or None if not found.
+    """
+    pats = _scanAttrPats.get(name)
+    if pats is None:
+        pats = _scanAttrPats[name] = (name + "=", re.compile("; *" + re.escape(name) + "=([^;]*)"))
+    prefix, attrRe = pats
+    if attrsStr.startswith(prefix):
+        val = attrsStr[len(prefix):].split(';', 1)[0]
+    else:
+        m = attrRe.search(attrsStr)
+        if m is None:
+            return None
+        val = m.group(1)
+    return [_unquote(v) for v in val.split(',')]
+
+
 class Feature:
     """
     One feature notation from a GFF3 file.  Coordinates are in zero-based, half-open.
     Missing attribute, as code by `.' in the file are stored as None.
+
+    A feature may be lazy, keeping the unparsed attribute column, which is
+    only decoded when the attrs field is first accessed.  Getting single
+    attributes with the get*Attr* methods or featureId does not decode the
+    whole column.  Errors in the attribute column of a lazy feature are
+    reported when it is decoded.
     """
 
     __slots__ = ("seqname", "source", "type", "start", "end", "score",
-                 "strand", "frame", "attrs", "gff3Set", "lineNumber",
+                 "strand", "frame", "_attrs", "_attrsStr", "gff3Set", "lineNumber",
                  "parents", "children")
 
     def __init__(self, seqname, source, type, start, end, score, strand,
-                 frame, attrs, gff3Set, lineNumber=None):
+                 frame, attrs, gff3Set, lineNumber=None, *, attrsStr=None):
         """
         The attrs field is a dict of lists/tupes as attrs maybe
         multi-valued.  Range should be one based and will be converted to
-        zero-based, half-open.
+        zero-based, half-open.  To create a lazy feature, attrs is None
+        and attrsStr is the unparsed attribute column.
         """
+        self._init(seqname, source, type, start, end, score, strand, frame,
+                   copy.deepcopy(attrs), attrsStr, gff3Set, lineNumber)
+
+    def _init(self, seqname, source, type, start, end, score, strand, frame,
+              attrs, attrsStr, gff3Set, lineNumber):
+        if (attrs is None) == (attrsStr is None):
+            raise GFF3Exception("exactly one of attrs or attrsStr must be specified")
         self.seqname = seqname
         self.source = source
         self.type = type
@@ -80,17 +163,57 @@ class Feature:
         self.score = score
         self.strand = strand
         self.frame = frame
-        self.attrs = copy.deepcopy(attrs)
+        self._attrs = attrs
+        self._attrsStr = attrsStr
         self.gff3Set = gff3Set
         self.lineNumber = lineNumber
         self.parents = set()
         self.children = set()
 
+    @classmethod
+    def _create(cls, seqname, source, type, start, end, score, strand, frame,
+                attrs, attrsStr, gff3Set, lineNumber):
+        "create a feature from parsed data, without copying attrs"
+        feature = cls.__new__(cls)
+        feature._init(seqname, source, type, start, end, score, strand, frame,
+                      attrs, attrsStr, gff3Set, lineNumber)
+        return feature
+
     def __getstate__(self):
-        return (self.seqname, self.source, self.type, self.start, self.end, self.score, self.strand, self.frame, self.attrs, self.gff3Set, self.lineNumber, self.parents, self.children)
+        return (self.seqname, self.source, self.type, self.start, self.end, self.score, self.strand, self.frame, self._attrs, self._attrsStr, self.gff3Set, self.lineNumber, self.parents, self.children)
 
     def __setstate__(self, state):
-        self.seqname, self.source, self.type, self.start, self.end, self.score, self.strand, self.frame, self.attrs, self.gff3Set, self.lineNumber, self.parents, self.children = state
+        self.seqname, self.source, self.type, self.start, self.end, self.score, self.strand, self.frame, self._attrs, self._attrsStr, self.gff3Set, self.lineNumber, self.parents, self.children = state
+
+    @property
+    def attrs(self):
+        """
+        dict of attribute names to lists of values, decoding the attribute
+        column of a lazy feature on first access
+        """
+        if self._attrs is None:
+            self._attrs = _parseAttrs(self._attrsStr, self._fileName(), self.lineNumber)
+            self._attrsStr = None
+        return self._attrs
+
+    @attrs.setter
+    def attrs(self, attrs):
+        self._attrs = attrs
+        self._attrsStr = None
+
+    @property
+    def isLazy(self):
+        "has the attribute column not been decoded"
+        return self._attrs is None
+
+    def _fileName(self):
+        return self.gff3Set.fileName if self.gff3Set is not None else None
+
+    def _getAttr(self, name):
+        "get attribute values or None, without decoding the attribute column"
+        if self._attrs is None:
+            return _scanAttr(self._attrsStr, name)
+        return self._attrs.get(name)
 
     @staticmethod
     def _dotIfNone(val):
@@ -126,27 +249,27 @@ class Feature:
         """
         ID attribute or None if records doesn't have an ID
         """
-        featId = self.attrs.get("ID")
+        featId = self._getAttr("ID")
         if featId is not None:
             featId = featId[0]
         return featId
 
     def getAttr1(self, name, default=None):
         """get a single valued attributes or default.  Error if multi-valued"""
-        values = self.attrs.get(name)
+        values = self._getAttr(name)
         if values is None:
             return default
         if len(values) != 1:
             raise GFF3Exception("expected single valued attr: {}".format(name),
-                                self.gff3Set.fileName, self.lineNumber)
+                                self._fileName(), self.lineNumber)
         return values[0]
 
     def getRAttr(self, name):
         "get a require attributes list of values, error if not found"
-        values = self.attrs.get(name)
+        values = self._getAttr(name)
         if values is None:
             raise GFF3Exception("required attribute not found: {}".format(name),
-                                self.gff3Set.fileName, self.lineNumber)
+                                self._fileName(), self.lineNumber)
         return values
 
     def getRAttr1(self, name):
@@ -154,7 +277,7 @@ class Feature:
         values = self.getRAttr(name)
         if len(values) != 1:
             raise GFF3Exception("expected single valued attr: {}".format(name),
-                                self.gff3Set.fileName, self.lineNumber)
+                                self._fileName(), self.lineNumber)
         return values[0]
 
 
@@ -180,7 +303,7 @@ class Gff3Set:
         """
         Link a feature with it's parents.
         """
-        parentIds = feature.attrs.get("Parent")
+        parentIds = feature._getAttr("Parent")
         if parentIds is None:
             self.roots.add(feature)
         else:
@@ -230,45 +353,15 @@ class Gff3Set:
 class Gff3Parser:
     """
     Parser for GFF3 files.  This parse does basic validation, but does not
-    fully test for conformance.
+    fully test for conformance.  If lazyAttrs is True, features are created
+    lazy, with the attribute columns decoded when first accessed.  This
+    greatly speeds up parsing when only a few attributes are used.
     """
 
-    def __init__(self):
+    def __init__(self, *, lazyAttrs=False):
+        self.lazyAttrs = lazyAttrs
         self.fileName = self.lineNumber = None
 
-    # parses `attr=val'; GFF3 spec is not very specific on the allowed values.
-    SPLIT_ATTR_RE = re.compile("^([a-zA-Z][^=]*)=(.*)$")
-
-    def _parseAttrVal(self, attrStr):
-        """
-        Returns tuple of tuple of (attr, value), multiple are returned to
-        handle multi-value attributes.
-        """
-        m = self.SPLIT_ATTR_RE.match(attrStr)
-        if m is None:
-            raise GFF3Exception("can't parse attr/value: '" + attrStr + "'",
-                                self.fileName, self.lineNumber)
-        name = urllib.parse.unquote(m.group(1))
-        val = m.group(2)
-        # Split by comma separate then unquote.  Commas in values must be
-        # url encoded.
-        return (name, [urllib.parse.unquote(v) for v in val.split(',')])
-
-    SPLIT_ATTR_COL_RE = re.compile("; *")
-
-    def _parseAttrs(self, attrsStr):
-        """
-        Parse the attrs and values
-        """
-        attrs = dict()
-        for attrStr in self.SPLIT_ATTR_COL_RE.split(attrsStr):
-            name, vals = self._parseAttrVal(attrStr)
-            if name in attrs:
-                raise GFF3Exception("duplicated attribute name: {}".format(name),
-                                    self.fileName, self.lineNumber)
-            attrs[name] = vals
-        return attrs
-
     GFF3_NUM_COLS = 9
 
     def _parseRecord(self, gff3Set, line):
@@ -281,18 +374,20 @@ class Gff3Parser:
                 "Wrong number of columns, expected {}, got {}".format(
                     self.GFF3_NUM_COLS, len(row)),
                 self.fileName, self.lineNumber)
-        feature = Feature(urllib.parse.unquote(row[0]), urllib.parse.unquote(row[1]),
-                          urllib.parse.unquote(row[2]),
-                          int(row[3]), int(row[4]), row[5], row[6], row[7],
-                          self._parseAttrs(row[8]), gff3Set, self.lineNumber)
+        if self.lazyAttrs:
+            attrs, attrsStr = None, row[8]
+        else:
+            attrs, attrsStr = _parseAttrs(row[8], self.fileName, self.lineNumber), None
+        feature = Feature._create(_unquote(row[0]), _unquote(row[1]), _unquote(row[2]),
+                                  int(row[3]), int(row[4]), row[5], row[6], row[7],
+                                  attrs, attrsStr, gff3Set, self.lineNumber)
         gff3Set.add(feature)
 
-    # spaces or comment line
-    IGNORED_LINE_RE = re.compile("(^[ ]*$)|(^[ ]*#.*$)")
-
     @staticmethod
     def _isIgnoredLine(line):
-        return Gff3Parser.IGNORED_LINE_RE.search(line) is not None
+        "spaces or comment line"
+        line = line.lstrip(' ')
+        return (len(line) == 0) or (line[0] == '#')
 
     def _checkHeader(self, line):
         # split to allow multiple spaces and tabs
@@ -307,24 +402,38 @@ class Gff3Parser:
         elif not self._isIgnoredLine(line):
             self._parseRecord(gff3Set, line)
 
-    def parse(self, gff3File, gff3Fh=None):
+    def parse(self, gff3File, gff3Fh=None, *, cache=None):
         """
         Parse the gff3 files and return a Gff3Set object in format.  If
         gff3File ends with .gz or .bz2, it will decompressed.  If gff3Fh is
         specified, then parse the already opened stream, with gff3File used
-        for error message.
+        for error message.  If cache is a pycbio.sys.parseCache.ParseCache
+        object and gff3Fh is not specified, the parsed file is saved in
+        and reloaded from the cache.  Unlike GenePredTbl and BedTable, the
+        Gff3Set is pickled as-is rather than encoded in columns, as the
+        features are linked in a tree with arbitrary attributes, so the
+        cache is larger and slower to load.
         """
+        if (cache is not None) and (gff3Fh is None):
+            return cache.load(gff3File, self._parse, kind="gff3-lazy" if self.lazyAttrs else "gff3")
+        return self._parse(gff3File, gff3Fh)
+
+    def _parse(self, gff3File, gff3Fh=None):
         self.fileName = gff3File
         self.lineNumber = 0
         fh = fileOps.opengz(gff3File, 'r') if gff3Fh is None else gff3Fh
+        # the garbage collector is disabled as it spends much of the time
+        # scanning the large number of features being created
         try:
-            gff3Set = Gff3Set(self.fileName)
-            for line in fh:
-                self.lineNumber += 1
-                self._parseLine(gff3Set, line[0:-1])
+            with gcDisabled():
+                gff3Set = Gff3Set(self.fileName)
+                for line in fh:
+                    self.lineNumber += 1
+                    self._parseLine(gff3Set, line[0:-1])
         finally:
             self.fileName = self.lineNumber = None
             if gff3Fh is None:
                 fh.close()
-        gff3Set.finish()
+        with gcDisabled():
+            gff3Set.finish()
         return gff3Set
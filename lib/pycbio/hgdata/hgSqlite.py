@@ -3,7 +3,11 @@
 Storage of genome data in sqlite for use in cluster jobs and other random
 access uses.
 """
+from collections import namedtuple
+from itertools import islice
+from pycbio.db import sqliteOps
 from pycbio.db.sqliteOps import SqliteCursor
+from pycbio.hgdata import rangeFinder
 
 # FIXME: removed duplicated functions and move to base class or mix-in especially gencode
 # FIXME: move generic sqlite to another module.
@@ -18,15 +22,76 @@ def noneIfEmpty(s):
     return s if s != "" else None
 
 
+class LoadStats(namedtuple("LoadStats", ("rows", "runTime"))):
+    "statistics from a bulk load, runTime is a perfOps.RunTime"
+    __slots__ = ()
+
+    @property
+    def rowsPerSec(self):
+        return self.rows / max(self.runTime.wall, 1.0e-9)
+
+    def __str__(self):
+        return f"{self.rows} rows in {self.runTime.wall:.1f} sec, {self.rowsPerSec:.0f} rows/sec"
+
+
 class HgSqliteTable:
     """Base class for SQL list table interface object."""
     def __init__(self, conn, table):
         self.conn = conn
         self.table = table
+        self._haveRTree = None  # cache of check for R*Tree index
+
+    # R*Tree range index tables: the R*Tree has the sequence id as the first
+    # dimension and the range as the second.  Sequence ids are obtained from
+    # sequence name table.
+    rtreeCreateSqls = ["""CREATE VIRTUAL TABLE {table}_rtree USING rtree_i32(id, seqIdMin, seqIdMax, rngStart, rngEnd)""",
+                       """CREATE TABLE {table}_rtreeSeqs (seqId INTEGER PRIMARY KEY, seq TEXT UNIQUE NOT NULL)"""]
+    rtreeDropSqls = ["""DROP TABLE IF EXISTS {table}_rtree""",
+                     """DROP TABLE IF EXISTS {table}_rtreeSeqs"""]
+
+    def _createRTree(self, seqCol, startCol, endCol):
+        """create or replace an R*Tree index on a range after loading.  The
+        index is not updated when rows are added, so it is dropped by
+        _dropRTree when rows are loaded.  Coordinates must fit in 32-bit
+        integers"""
+        self.executes(self.rtreeDropSqls + self.rtreeCreateSqls
+                      + ["INSERT INTO {{table}}_rtreeSeqs (seq) SELECT DISTINCT {} FROM {{table}}".format(seqCol),
+                         "INSERT INTO {{table}}_rtree SELECT t.oid, s.seqId, s.seqId, t.{}, t.{} "
+                         "FROM {{table}} t, {{table}}_rtreeSeqs s WHERE t.{} = s.seq".format(startCol, endCol, seqCol)])
+        self._haveRTree = True
+
+    def _dropRTree(self):
+        "drop the R*Tree index if it exists, range queries then use the bin index"
+        if sqliteOps.haveTable(self.conn, self.table + "_rtree"):
+            self.executes(self.rtreeDropSqls)
+        self._haveRTree = False
+
+    def haveRTree(self):
+        "does this table have an R*Tree range index"
+        if self._haveRTree is None:
+            self._haveRTree = sqliteOps.haveTable(self.conn, self.table + "_rtree")
+        return self._haveRTree
+
+    def _rangeOverlapWhere(self, binCol, seqCol, startCol, endCol, seq, start, end):
+        """Get a parameterized SQL expression and parameters to select rows
+        overlapping a range, using the R*Tree index if it exists, otherwise
+        the bin index.  If start is None, all rows on seq are selected.  The SQL
+        is the same for all ranges, so cached prepared statements are reused"""
+        if start is None:
+            return "({} = ?)".format(seqCol), [seq]
+        elif self.haveRTree():
+            return ("(oid IN (SELECT id FROM {table}_rtree WHERE "
+                    "(seqIdMin = (SELECT seqId FROM {table}_rtreeSeqs WHERE seq = ?)) "
+                    "AND (rngStart < ?) AND (rngEnd > ?)))"), [seq, end, start]
+        else:
+            return (rangeFinder.getOverlappingSqlParamExpr(binCol, seqCol, startCol, endCol, "{table}"),
+                    rangeFinder.getOverlappingSqlParams(seq, start, end))
 
     def _create(self, createSql):
-        self.executes(["DROP TABLE IF EXISTS {table};".format(table=self.table),
-                       createSql])
+        self.executes(self.rtreeDropSqls
+                      + ["DROP TABLE IF EXISTS {table};".format(table=self.table),
+                         createSql])
+        self._haveRTree = False
 
     def _index(self, indexSql):
         if isinstance(indexSql, (str, bytes)):
@@ -58,6 +123,22 @@ class HgSqliteTable:
         with SqliteCursor(self.conn) as cur:
             cur.executemany(self._formatSql(insertSql, columns), rows)
 
+    def _insertsChunked(self, insertSql, columns, rows, chunkSize):
+        """insert rows from an iterable, with a transaction for each chunk of
+        chunkSize rows, so rows are never all in memory; returns the number of
+        rows inserted"""
+        sql = self._formatSql(insertSql, columns)
+        rows = iter(rows)
+        count = 0
+        while True:
+            chunk = list(islice(rows, chunkSize))
+            if len(chunk) == 0:
+                break
+            with SqliteCursor(self.conn) as cur:
+                cur.executemany(sql, chunk)
+            count += len(chunk)
+        return count
+
     def queryRows(self, querySql, columns, rowFactory, *queryargs):
         """run query, formatting {table}, {columns} into sql and generator over results and
         setting row factory"""
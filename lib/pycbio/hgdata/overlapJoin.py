@@ -0,0 +1,169 @@
+# Copyright 2006-2026 Mark Diekhans
+"""Streaming overlap join of two coordinate-sorted record streams.
+
+Records are BED, PSL or genePred objects, or any other objects if a function
+is supplied to get their range.  Both streams must be sorted by sequence id
+and then start position, with sequence ids in lexical order, as produced by
+`sort -k1,1 -k2,2n' for BED.  Sort order is checked as records are read.
+Memory use is proportional to the maximum overlap depth, not the size of
+the inputs.
+"""
+from collections import namedtuple
+from pycbio import PycbioDataError
+from pycbio.hgdata.bed import Bed
+from pycbio.hgdata.psl import Psl, reverseStrand
+from pycbio.hgdata.genePred import GenePred
+
+
+class OverlapJoinSortError(PycbioDataError):
+    "input to overlap join is not sorted"
+    pass
+
+
+class RecordRange(namedtuple("RecordRange", ("seqId", "start", "end", "strand"))):
+    "genomic range of a record, strand maybe None"
+    __slots__ = ()
+
+
+def recordRange(rec):
+    """get the RecordRange for a Bed, Psl, or GenePred object.  For PSLs,
+    the target range is used and the strand is the strand of the alignment on
+    the target."""
+    if isinstance(rec, Bed):
+        return RecordRange(rec.chrom, rec.chromStart, rec.chromEnd, rec.strand)
+    elif isinstance(rec, Psl):
+        strand = rec.qStrand if rec.tStrand == '+' else reverseStrand(rec.qStrand)
+        return RecordRange(rec.tName, rec.tStart, rec.tEnd, strand)
+    elif isinstance(rec, GenePred):
+        return RecordRange(rec.chrom, rec.txStart, rec.txEnd, rec.strand)
+    else:
+        raise TypeError(f"don't know how to get range of {type(rec)}, supply a range function")
+
+
+class _JoinInput:
+    """one side of the join, with the next record and active records, which
+    are those that could overlap records that have not been read from the
+    other side, stored by strand key.  Active records are pruned when
+    their number doubles, so the number kept is at most about twice the
+    overlap depth."""
+    __slots__ = ("recs", "rangeFunc", "stranded", "desc", "rec", "rng", "active",
+                 "numActive", "peakActive", "pruneSize")
+
+    MIN_PRUNE_SIZE = 64
+
+    def __init__(self, recs, rangeFunc, stranded, desc):
+        self.recs = iter(recs)
+        self.rangeFunc = rangeFunc
+        self.stranded = stranded
+        self.desc = desc
+        self.rec = self.rng = None
+        self.active = {}
+        self.numActive = 0
+        self.peakActive = 0
+        self.pruneSize = self.MIN_PRUNE_SIZE
+        self.advance()
+
+    def advance(self):
+        "read the next record, checking sort order"
+        prevRng = self.rng
+        self.rec = next(self.recs, None)
+        self.rng = self.rangeFunc(self.rec) if self.rec is not None else None
+        if (self.rng is not None) and (prevRng is not None):
+            if (self.rng.seqId, self.rng.start) < (prevRng.seqId, prevRng.start):
+                raise OverlapJoinSortError(f"{self.desc} records are not sorted by sequence and start: "
+                                           f"{self.rng.seqId}:{self.rng.start} follows {prevRng.seqId}:{prevRng.start}")
+
+    def strandKey(self, rng):
+        if not self.stranded:
+            return None
+        if rng.strand not in ('+', '-'):
+            raise PycbioDataError(f"stranded overlap join requires strand on all {self.desc} records, "
+                                  f"got '{rng.strand}' for {rng.seqId}:{rng.start}-{rng.end}")
+        return rng.strand
+
+    def addActive(self, rec, rng, otherRng):
+        """add a record to the active records, pruning records that can't
+        overlap otherRng, the next range of the other side, or any following
+        records"""
+        self.active.setdefault(self.strandKey(rng), []).append((rec, rng))
+        self.numActive += 1
+        self.peakActive = max(self.peakActive, self.numActive)
+        if self.numActive > self.pruneSize:
+            self._prune(otherRng)
+
+    def _prune(self, otherRng):
+        "drop active records of all strands that end before otherRng or are on a previous sequence"
+        self.numActive = 0
+        for key, active in self.active.items():
+            stillActive = [other for other in active
+                           if (other[1].seqId == otherRng.seqId) and (other[1].end > otherRng.start)]
+            self.active[key] = stillActive
+            self.numActive += len(stillActive)
+        self.pruneSize = max(2 * self.numActive, self.MIN_PRUNE_SIZE)
+
+    def overlapping(self, rng):
+        """get active records overlapping rng, also dropping ones that end
+        before rng or are on a previous sequence, as later records can't
+        overlap them"""
+        key = self.strandKey(rng)
+        active = self.active.get(key)
+        if active is None:
+            return []
+        stillActive = []
+        overlaps = []
+        for other in active:
+            otherRng = other[1]
+            if (otherRng.seqId == rng.seqId) and (otherRng.end > rng.start):
+                stillActive.append(other)
+                if otherRng.start < rng.end:
+                    overlaps.append(other[0])
+        self.numActive -= len(active) - len(stillActive)
+        self.active[key] = stillActive
+        return overlaps
+
+
+def _seqPosKey(rng):
+    return (rng.seqId, rng.start)
+
+
+class OverlapJoin:
+    """Iterable over pairs of overlapping records, (rec1, rec2), from two
+    coordinate-sorted iterables of records.  If stranded is True, records
+    only overlap if they are on the same strand.  The rangeFunc functions
+    return a RecordRange for a record.  Ranges overlap if each one starts
+    before the other ends, as with rangeFinder.Entry.overlaps.  Stranded
+    matching is the same as a stranded RangeFinder query.  It can only be
+    iterated once.  The peakActive property is the maximum number of
+    active records kept for either input, which is a measure of memory
+    use."""
+
+    def __init__(self, recs1, recs2, *, stranded=False, rangeFunc1=recordRange, rangeFunc2=recordRange):
+        self._in1 = _JoinInput(recs1, rangeFunc1, stranded, "first")
+        self._in2 = _JoinInput(recs2, rangeFunc2, stranded, "second")
+
+    @property
+    def peakActive(self):
+        return max(self._in1.peakActive, self._in2.peakActive)
+
+    def __iter__(self):
+        in1 = self._in1
+        in2 = self._in2
+        while (in1.rec is not None) or (in2.rec is not None):
+            if (in2.rec is None) or ((in1.rec is not None) and (_seqPosKey(in1.rng) <= _seqPosKey(in2.rng))):
+                for rec2 in in2.overlapping(in1.rng):
+                    yield (in1.rec, rec2)
+                if in2.rec is not None:
+                    in1.addActive(in1.rec, in1.rng, in2.rng)
+                in1.advance()
+            else:
+                for rec1 in in1.overlapping(in2.rng):
+                    yield (rec1, in2.rec)
+                if in1.rec is not None:
+                    in2.addActive(in2.rec, in2.rng, in1.rng)
+                in2.advance()
+
+
+def overlapJoin(recs1, recs2, *, stranded=False, rangeFunc1=recordRange, rangeFunc2=recordRange):
+    """Generator over pairs of overlapping records, (rec1, rec2), from two
+    coordinate-sorted iterables of records.  See OverlapJoin for details."""
+    yield from OverlapJoin(recs1, recs2, stranded=stranded, rangeFunc1=rangeFunc1, rangeFunc2=rangeFunc2)
@@ -2,10 +2,11 @@
 import re
 from collections import defaultdict, namedtuple
 from deprecation import deprecated
+from pycbio import PycbioException
 from pycbio.hgdata.autoSql import intArraySplit, intArrayJoin, strArraySplit, strArrayJoin
-from pycbio.tsv.tabFile import TabFileReader
+from pycbio.tsv.tabFile import TabFileReader, TabFileParallelReader
 from pycbio.hgdata import dnaOps
-from pycbio.hgdata.cigar import cigarStringParse, cigarFromPysam
+from pycbio.hgdata.cigar import cigarBlocksFromString, cigarBlocksFromPysam
 
 # Notes:
 #  - terms plus and minus are used because `positive' is long and `pos' abbreviation is
@@ -98,8 +99,12 @@ class PslBlock(namedtuple("PslBlock",
         return (other is not None) and (self.qStart == other.qStart) and (self.tStart == other.tStart) and (self.size == other.size) and (self.qSeq == other.qSeq) and (self.tSeq == other.tSeq)
 
 class Psl:
-    """Object containing data from a PSL record."""
-    __slots__ = ("match", "misMatch", "repMatch", "nCount", "qNumInsert", "qBaseInsert", "tNumInsert", "tBaseInsert", "strand", "qName", "qSize", "qStart", "qEnd", "tName", "tSize", "tStart", "tEnd", "blocks")
+    """Object containing data from a PSL record.
+
+    If created with lazyBlocks, the block columns are kept as the raw
+    comma-separated strings and only converted to PslBlock objects when
+    the blocks attribute is first accessed."""
+    __slots__ = ("match", "misMatch", "repMatch", "nCount", "qNumInsert", "qBaseInsert", "tNumInsert", "tBaseInsert", "strand", "qName", "qSize", "qStart", "qEnd", "tName", "tSize", "tStart", "tEnd", "_blocks", "_rawBlocks")
 
     @classmethod
     def _parseBlocks(cls, psl, blockCount, blockSizesStr, qStartsStr, tStartsStr, qSeqsStr, tSeqsStr):
@@ -111,10 +116,20 @@ class Psl:
         if haveSeqs:
             qSeqs = strArraySplit(qSeqsStr)
             tSeqs = strArraySplit(tSeqsStr)
+        blocks = psl._blocks
         for i in range(blockCount):
-            psl.addBlock(qStarts[i], tStarts[i], blockSizes[i],
-                         (qSeqs[i] if haveSeqs else None),
-                         (tSeqs[i] if haveSeqs else None))
+            blocks.append(PslBlock(psl, qStarts[i], tStarts[i], blockSizes[i],
+                                   (qSeqs[i] if haveSeqs else None),
+                                   (tSeqs[i] if haveSeqs else None)))
+
+    def __reduce__(self):
+        """pickle fields and blocks coordinates, which is much faster than the
+        default, as used when returning PSLs from worker processes"""
+        if self._rawBlocks is not None:
+            blocks = None
+        else:
+            blocks = [(blk.qStart, blk.tStart, blk.size, blk.qSeq, blk.tSeq) for blk in self._blocks]
+        return (_pslUnpickle, (tuple([getattr(self, f) for f in _pslPickleFields]), blocks, self._rawBlocks))
 
     def _zeroStats(self):
         self.match = 0
@@ -140,28 +155,51 @@ class Psl:
         self.tSize = tSize
         self.tStart = tStart
         self.tEnd = tEnd
-        self.blocks = []
+        self._blocks = []
+        self._rawBlocks = None
+
+    @property
+    def blocks(self):
+        "list of PslBlock objects, decoding them if they were lazily parsed"
+        if self._rawBlocks is not None:
+            self._decodeRawBlocks()
+        return self._blocks
+
+    @blocks.setter
+    def blocks(self, blocks):
+        self._blocks = blocks
+        self._rawBlocks = None
+
+    def _decodeRawBlocks(self):
+        rawBlocks = self._rawBlocks
+        self._rawBlocks = None
+        self._parseBlocks(self, *rawBlocks)
 
     @classmethod
-    def fromRow(cls, row):
+    def fromRow(cls, row, *, lazyBlocks=False):
         """"Create PSL from a text row of columns, usually split from a tab
-        file line"""
-        psl = Psl(qName=row[9], qSize=int(row[10]), qStart=int(row[11]), qEnd=int(row[12]),
-                  tName=row[13], tSize=int(row[14]), tStart=int(row[15]), tEnd=int(row[16]),
-                  strand=row[8])
-        psl.match = int(row[0])
-        psl.misMatch = int(row[1])
-        psl.repMatch = int(row[2])
-        psl.nCount = int(row[3])
-        psl.qNumInsert = int(row[4])
-        psl.qBaseInsert = int(row[5])
-        psl.tNumInsert = int(row[6])
-        psl.tBaseInsert = int(row[7])
-        blockCount = int(row[17])
+        file line.  If lazyBlocks is True, the block columns are not parsed
+        until the blocks are accessed."""
+        # fields are assigned directly rather than calling __init__, as this
+        # is the performance critical path for reading PSLs
+        psl = cls.__new__(cls)
+        (psl.match, psl.misMatch, psl.repMatch, psl.nCount,
+         psl.qNumInsert, psl.qBaseInsert, psl.tNumInsert, psl.tBaseInsert) = map(int, row[0:8])
+        psl.strand = row[8]
+        psl.qName = row[9]
+        psl.qSize, psl.qStart, psl.qEnd = map(int, row[10:13])
+        psl.tName = row[13]
+        psl.tSize, psl.tStart, psl.tEnd = map(int, row[14:17])
+        psl._blocks = []
         haveSeqs = len(row) > 21
-        cls._parseBlocks(psl, blockCount, row[18], row[19], row[20],
-                         (row[21] if haveSeqs else None),
-                         (row[22] if haveSeqs else None))
+        rawBlocks = (int(row[17]), row[18], row[19], row[20],
+                     (row[21] if haveSeqs else None),
+                     (row[22] if haveSeqs else None))
+        if lazyBlocks:
+            psl._rawBlocks = rawBlocks
+        else:
+            psl._rawBlocks = None
+            cls._parseBlocks(psl, *rawBlocks)
         return psl
 
     @classmethod
@@ -237,7 +275,9 @@ class Psl:
 
     @property
     def blockCount(self):
-        return len(self.blocks)
+        if self._rawBlocks is not None:
+            return self._rawBlocks[0]
+        return len(self._blocks)
 
     @property
     def qStrand(self):
@@ -307,6 +347,22 @@ class Psl:
         "does the specified block overlap the target range"
         return (tStart < self.getTEndPos(iBlk)) and (tEnd > self.getTStartPos(iBlk))
 
+    def _rawBlocksToRow(self, row):
+        "add columns from lazy blocks that have not been decoded"
+        blockCount, blockSizesStr, qStartsStr, tStartsStr, qSeqsStr, tSeqsStr = self._rawBlocks
+        row.extend((str(blockCount), blockSizesStr, qStartsStr, tStartsStr))
+        if qSeqsStr is not None:
+            row.extend((qSeqsStr, tSeqsStr))
+
+    def _blocksToRow(self, row):
+        row.extend((str(self.blockCount),
+                    intArrayJoin([b.size for b in self.blocks]),
+                    intArrayJoin([b.qStart for b in self.blocks]),
+                    intArrayJoin([b.tStart for b in self.blocks])))
+        if self.blocks[0].qSeq is not None:
+            row.append(strArrayJoin([b.qSeq for b in self.blocks]))
+            row.append(strArrayJoin([b.tSeq for b in self.blocks]))
+
     def toRow(self):
         "convert PSL to array of strings"
         row = [str(self.match),
@@ -325,14 +381,11 @@ class Psl:
                self.tName,
                str(self.tSize),
                str(self.tStart),
-               str(self.tEnd),
-               str(self.blockCount),
-               intArrayJoin([b.size for b in self.blocks]),
-               intArrayJoin([b.qStart for b in self.blocks]),
-               intArrayJoin([b.tStart for b in self.blocks])]
-        if self.blocks[0].qSeq is not None:
-            row.append(strArrayJoin([b.qSeq for b in self.blocks]))
-            row.append(strArrayJoin([b.tSeq for b in self.blocks]))
+               str(self.tEnd)]
+        if self._rawBlocks is not None:
+            self._rawBlocksToRow(row)
+        else:
+            self._blocksToRow(row)
         return row
 
     def __str__(self):
@@ -434,11 +487,11 @@ class Psl:
 
     @property
     def qCover(self):
-        return self.alignSize / self.qSize
+        return (self.alignSize / self.qSize) if self.qSize > 0 else 0.0
 
     @property
     def tCover(self):
-        return self.alignSize / self.tSize
+        return (self.alignSize / self.tSize) if self.tSize > 0 else 0.0
 
     @property
     def qSpan(self):
@@ -537,13 +590,40 @@ class Psl:
                 swap._addSwapSidesBlock(self.blocks[i])
         return swap
 
+
+# fields saved by Psl.__reduce__, other than blocks
+_pslPickleFields = tuple(f for f in Psl.__slots__ if not f.startswith('_'))
+
+def _pslUnpickle(fields, blocks, rawBlocks):
+    psl = Psl.__new__(Psl)
+    for name, value in zip(_pslPickleFields, fields):
+        setattr(psl, name, value)
+    psl._rawBlocks = rawBlocks
+    psl._blocks = [] if blocks is None else [PslBlock(psl, *blk) for blk in blocks]
+    return psl
+
+def _pslFromRowLazy(row):
+    return Psl.fromRow(row, lazyBlocks=True)
+
 class PslReader:
-    """Generator to read PSLs from a tab file or file-like object"""
-    def __init__(self, fspec):
+    """Generator to read PSLs from a tab file or file-like object.  If
+    lazyBlocks is True, blocks are only parsed when accessed, which greatly
+    speeds up reading when only the summary columns are used.  If workers
+    is greater than one, parsing is done in that many processes, see
+    TabFileParallelReader."""
+    def __init__(self, fspec, *, lazyBlocks=False, workers=None):
         self.fspec = fspec
+        self.lazyBlocks = lazyBlocks
+        self.workers = workers
 
     def __iter__(self):
-        for psl in TabFileReader(self.fspec, rowClass=Psl.fromRow, hashAreComments=True, skipBlankLines=True):
+        rowClass = _pslFromRowLazy if self.lazyBlocks else Psl.fromRow
+        if (self.workers is not None) and (self.workers > 1):
+            reader = TabFileParallelReader(self.fspec, rowClass=rowClass, hashAreComments=True, skipBlankLines=True,
+                                           workers=self.workers)
+        else:
+            reader = TabFileReader(self.fspec, rowClass=rowClass, hashAreComments=True, skipBlankLines=True)
+        for psl in reader:
             yield psl
 
 
@@ -649,15 +729,48 @@ def pslFromCigarObj(qName, qStrand, tName, tSize, tPos, cigar):
     psl.tStart, psl.tEnd = psl.blocks[0].tStart, psl.blocks[-1].tEnd
     return psl
 
-def pslFromCigar(qName, qStrand, tName, tSize, tPos, cigarStr):
+def _intArrayStr(ints):
+    return ",".join(map(str, ints)) + ","
+
+def pslFromCigarBlocks(qName, qStrand, tName, tSize, blks, *, lazyBlocks=False):
+    """create a PSL from an pycbio.hgdata.cigar.CigarBlocks object.  If
+    lazyBlocks is True, the blocks are stored as the PSL columns and only
+    converted to PslBlock objects if accessed, which is faster when the
+    PSLs are only written."""
+    if blks.blockCount == 0:
+        raise PycbioException(f"CIGAR for {qName} has no aligned blocks")
+    psl = Psl.__new__(Psl)
+    psl.match, psl.misMatch, psl.repMatch, psl.nCount = blks.match, 0, 0, 0
+    psl.qNumInsert, psl.qBaseInsert = blks.qNumInsert, blks.qBaseInsert
+    psl.tNumInsert, psl.tBaseInsert = blks.tNumInsert, blks.tBaseInsert
+    psl.strand = qStrand
+    psl.qName, psl.qSize = qName, blks.qSize
+    # use ends of blocks to deal with soft-clipping
+    psl.qStart, psl.qEnd = blks.qStarts[0], blks.qStarts[-1] + blks.sizes[-1]
+    if qStrand == '-':
+        psl.qStart, psl.qEnd = reverseCoords(psl.qStart, psl.qEnd, psl.qSize)
+    psl.tName, psl.tSize = tName, tSize
+    psl.tStart, psl.tEnd = blks.tStarts[0], blks.tStarts[-1] + blks.sizes[-1]
+    psl._blocks = []
+    if lazyBlocks:
+        psl._rawBlocks = (blks.blockCount, _intArrayStr(blks.sizes), _intArrayStr(blks.qStarts),
+                          _intArrayStr(blks.tStarts), None, None)
+    else:
+        psl._rawBlocks = None
+        psl._blocks = [PslBlock(psl, qStart, tStart, size)
+                       for qStart, tStart, size in zip(blks.qStarts, blks.tStarts, blks.sizes)]
+    return psl
+
+def pslFromCigar(qName, qStrand, tName, tSize, tPos, cigarStr, *, lazyBlocks=False):
     "create a PSL from an cigar string"
-    return pslFromCigarObj(qName, qStrand, tName, tSize, tPos, cigarStringParse(cigarStr))
+    return pslFromCigarBlocks(qName, qStrand, tName, tSize, cigarBlocksFromString(cigarStr, tPos),
+                              lazyBlocks=lazyBlocks)
 
-def pslFromPysam(samfh, aln):
+def pslFromPysam(samfh, aln, *, lazyBlocks=False):
     "create a PSL from pysam.AlignedSegment object"
-    return pslFromCigarObj(aln.query_name,
-                           "-" if aln.is_reverse else "+",
-                           aln.reference_name,
-                           samfh.get_reference_length(aln.reference_name),
-                           aln.reference_start,
-                           cigarFromPysam(aln.cigartuples))
+    return pslFromCigarBlocks(aln.query_name,
+                              "-" if aln.is_reverse else "+",
+                              aln.reference_name,
+                              samfh.get_reference_length(aln.reference_name),
+                              cigarBlocksFromPysam(aln.cigartuples, aln.reference_start),
+                              lazyBlocks=lazyBlocks)
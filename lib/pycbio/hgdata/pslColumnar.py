@@ -0,0 +1,278 @@
+# Copyright 2006-2026 Mark Diekhans
+"""Columnar, array-backed table of PSL alignments.
+
+Scalar fields are stored in typed arrays, one per column, and blocks are
+stored in CSR-style layout: a blockOffsets array indexes into blockSizes,
+qStarts and tStarts arrays for all alignments.  This avoids creating a Psl and
+a PslBlock object per alignment, which is important for multi-million
+alignment files.  Psl objects are only created when an entry is accessed.
+"""
+import sys
+from array import array
+from pycbio import PycbioException
+from pycbio.hgdata.autoSql import strArraySplit, strArrayJoin
+from pycbio.hgdata.psl import Psl
+from pycbio.tsv.tabFile import TabFileReader
+
+# typecode for arrays, 64-bit to handle any genome
+_INT_TYPE = 'q'
+
+# integer columns, in PSL row order, excluding strand and names
+_statCols = ("match", "misMatch", "repMatch", "nCount",
+             "qNumInsert", "qBaseInsert", "tNumInsert", "tBaseInsert")
+_qCoordCols = ("qSize", "qStart", "qEnd")
+_tCoordCols = ("tSize", "tStart", "tEnd")
+_intCols = _statCols + _qCoordCols + _tCoordCols
+_intColRowIdxs = (0, 1, 2, 3, 4, 5, 6, 7, 10, 11, 12, 14, 15, 16)
+
+def _splitIntsInto(arr, commaStr):
+    "append comma-separated integers to an array"
+    if len(commaStr) > 0:
+        arr.extend(map(int, commaStr.rstrip(',').split(',')))
+
+def _joinInts(arr):
+    "format an array slice as a comma-separated string"
+    if len(arr) == 0:
+        return ""
+    return ",".join(map(str, arr)) + ","
+
+
+class PslColumnarTable:
+    """Table of PSLs stored in columns.  Entries can be accessed with an
+    index, returning a newly created Psl object.  Bulk operations (filter,
+    sort, write) operate on the columns without creating Psl objects.
+
+    Integer columns are array.array objects that are attributes named after
+    the Psl field (match, qStart, tEnd, ...); strand, qName and tName are
+    lists of interned strings.  Blocks for entry i are in the half-open
+    range blockOffsets[i] to blockOffsets[i+1] of blockSizes, qStarts and
+    tStarts.  For PSLX, qSeqs and tSeqs are lists parallel to the block
+    arrays, otherwise they are None.
+    """
+
+    def __init__(self, *, haveSeqs=False):
+        for col in _intCols:
+            setattr(self, col, array(_INT_TYPE))
+        self.strand = []
+        self.qName = []
+        self.tName = []
+        self.blockOffsets = array(_INT_TYPE, [0])
+        self.blockSizes = array(_INT_TYPE)
+        self.qStarts = array(_INT_TYPE)
+        self.tStarts = array(_INT_TYPE)
+        self.qSeqs = [] if haveSeqs else None
+        self.tSeqs = [] if haveSeqs else None
+
+    @classmethod
+    def fromFile(cls, fspec):
+        "load a table from a PSL file or file-like object"
+        tbl = None
+        for row in TabFileReader(fspec, hashAreComments=True, skipBlankLines=True):
+            if tbl is None:
+                tbl = cls(haveSeqs=(len(row) > 21))
+            tbl.appendRow(row)
+        return tbl if tbl is not None else cls()
+
+    @classmethod
+    def fromPsls(cls, psls):
+        "create a table from an iterable of Psl objects"
+        tbl = None
+        for psl in psls:
+            if tbl is None:
+                tbl = cls(haveSeqs=(psl.blockCount > 0) and (psl.blocks[0].qSeq is not None))
+            tbl.appendPsl(psl)
+        return tbl if tbl is not None else cls()
+
+    @property
+    def haveSeqs(self):
+        return self.qSeqs is not None
+
+    def _checkSeqs(self, haveSeqs, what):
+        if haveSeqs != self.haveSeqs:
+            raise PycbioException(f"can't mix PSL and PSLX records in a PslColumnarTable: {what}")
+
+    def appendRow(self, row):
+        "append a PSL from a text row of columns"
+        # parse everything before appending so a bad row doesn't leave the
+        # columns inconsistent
+        try:
+            intVals = [int(row[i]) for i in _intColRowIdxs]
+            blockCount = int(row[17])
+            blockSizes = array(_INT_TYPE)
+            qStarts = array(_INT_TYPE)
+            tStarts = array(_INT_TYPE)
+            _splitIntsInto(blockSizes, row[18])
+            _splitIntsInto(qStarts, row[19])
+            _splitIntsInto(tStarts, row[20])
+        except (ValueError, IndexError) as ex:
+            raise PycbioException(f"invalid PSL row: {row}") from ex
+        if not (len(blockSizes) == len(qStarts) == len(tStarts) == blockCount):
+            raise PycbioException(f"PSL blockCount doesn't match number of blocks: {row}")
+        self._checkSeqs(len(row) > 21, row[9])
+
+        for col, val in zip(_intCols, intVals):
+            getattr(self, col).append(val)
+        self.strand.append(sys.intern(row[8]))
+        self.qName.append(sys.intern(row[9]))
+        self.tName.append(sys.intern(row[13]))
+        self.blockSizes.extend(blockSizes)
+        self.qStarts.extend(qStarts)
+        self.tStarts.extend(tStarts)
+        if self.haveSeqs:
+            self.qSeqs.extend(strArraySplit(row[21]))
+            self.tSeqs.extend(strArraySplit(row[22]))
+        self.blockOffsets.append(self.blockOffsets[-1] + blockCount)
+
+    def appendPsl(self, psl):
+        "append a Psl object"
+        for col in _intCols:
+            getattr(self, col).append(getattr(psl, col))
+        self.strand.append(sys.intern(psl.strand))
+        self.qName.append(sys.intern(psl.qName))
+        self.tName.append(sys.intern(psl.tName))
+        self._checkSeqs((psl.blockCount > 0) and (psl.blocks[0].qSeq is not None), psl.qName)
+        for blk in psl.blocks:
+            self.blockSizes.append(blk.size)
+            self.qStarts.append(blk.qStart)
+            self.tStarts.append(blk.tStart)
+            if self.haveSeqs:
+                self.qSeqs.append(blk.qSeq)
+                self.tSeqs.append(blk.tSeq)
+        self.blockOffsets.append(self.blockOffsets[-1] + psl.blockCount)
+
+    def __len__(self):
+        return len(self.qName)
+
+    def _checkIdx(self, idx):
+        if idx < 0:
+            idx += len(self)
+        if not (0 <= idx < len(self)):
+            raise IndexError("PslColumnarTable index out of range")
+        return idx
+
+    def blockCount(self, idx):
+        "number of blocks in an entry"
+        return self.blockOffsets[idx + 1] - self.blockOffsets[idx]
+
+    def getPsl(self, idx):
+        "create a Psl object for an entry"
+        idx = self._checkIdx(idx)
+        psl = Psl(qName=self.qName[idx], qSize=self.qSize[idx], qStart=self.qStart[idx], qEnd=self.qEnd[idx],
+                  tName=self.tName[idx], tSize=self.tSize[idx], tStart=self.tStart[idx], tEnd=self.tEnd[idx],
+                  strand=self.strand[idx])
+        for col in _statCols:
+            setattr(psl, col, getattr(self, col)[idx])
+        for j in range(self.blockOffsets[idx], self.blockOffsets[idx + 1]):
+            psl.addBlock(self.qStarts[j], self.tStarts[j], self.blockSizes[j],
+                         (self.qSeqs[j] if self.haveSeqs else None),
+                         (self.tSeqs[j] if self.haveSeqs else None))
+        return psl
+
+    def __getitem__(self, idx):
+        if isinstance(idx, slice):
+            return self.select(range(*idx.indices(len(self))))
+        return self.getPsl(idx)
+
+    def __iter__(self):
+        for idx in range(len(self)):
+            yield self.getPsl(idx)
+
+    def toRow(self, idx):
+        "convert an entry to a row of strings"
+        idx = self._checkIdx(idx)
+        bStart, bEnd = self.blockOffsets[idx], self.blockOffsets[idx + 1]
+        row = [str(getattr(self, col)[idx]) for col in _statCols]
+        row += [self.strand[idx], self.qName[idx],
+                str(self.qSize[idx]), str(self.qStart[idx]), str(self.qEnd[idx]),
+                self.tName[idx],
+                str(self.tSize[idx]), str(self.tStart[idx]), str(self.tEnd[idx]),
+                str(bEnd - bStart),
+                _joinInts(self.blockSizes[bStart:bEnd]),
+                _joinInts(self.qStarts[bStart:bEnd]),
+                _joinInts(self.tStarts[bStart:bEnd])]
+        if self.haveSeqs:
+            row.append(strArrayJoin(self.qSeqs[bStart:bEnd]))
+            row.append(strArrayJoin(self.tSeqs[bStart:bEnd]))
+        return row
+
+    def write(self, fh):
+        "write all entries in PSL format to a file-like object"
+        for idx in range(len(self)):
+            fh.write("\t".join(self.toRow(idx)))
+            fh.write('\n')
+
+    def identities(self):
+        "array of identity for all entries, as computed by Psl.identity()"
+        return array('d', [((m + r) / (m + r + mm)) if (m + r + mm) > 0 else 0.0
+                           for m, mm, r in zip(self.match, self.misMatch, self.repMatch)])
+
+    def _alignSizes(self):
+        return [m + mm + r for m, mm, r in zip(self.match, self.misMatch, self.repMatch)]
+
+    def qCovers(self):
+        "array of query coverage for all entries, as computed by Psl.qCover"
+        return array('d', [(a / s) if s > 0 else 0.0 for a, s in zip(self._alignSizes(), self.qSize)])
+
+    def tCovers(self):
+        "array of target coverage for all entries, as computed by Psl.tCover"
+        return array('d', [(a / s) if s > 0 else 0.0 for a, s in zip(self._alignSizes(), self.tSize)])
+
+    def select(self, idxs):
+        "create a new table containing the entries with the specified indices, in that order"
+        tbl = PslColumnarTable(haveSeqs=self.haveSeqs)
+        idxs = list(idxs)
+        for col in _intCols:
+            src = getattr(self, col)
+            getattr(tbl, col).extend([src[i] for i in idxs])
+        tbl.strand = [self.strand[i] for i in idxs]
+        tbl.qName = [self.qName[i] for i in idxs]
+        tbl.tName = [self.tName[i] for i in idxs]
+        offsets = self.blockOffsets
+        for i in idxs:
+            bStart, bEnd = offsets[i], offsets[i + 1]
+            tbl.blockSizes.extend(self.blockSizes[bStart:bEnd])
+            tbl.qStarts.extend(self.qStarts[bStart:bEnd])
+            tbl.tStarts.extend(self.tStarts[bStart:bEnd])
+            if self.haveSeqs:
+                tbl.qSeqs.extend(self.qSeqs[bStart:bEnd])
+                tbl.tSeqs.extend(self.tSeqs[bStart:bEnd])
+            tbl.blockOffsets.append(tbl.blockOffsets[-1] + (bEnd - bStart))
+        return tbl
+
+    def filterIndices(self, *, minIdentity=None, minQCover=None, minTCover=None):
+        "get indices of entries passing all of the specified minimum thresholds"
+        keep = [True] * len(self)
+        for minVal, vals in ((minIdentity, self.identities),
+                             (minQCover, self.qCovers),
+                             (minTCover, self.tCovers)):
+            if minVal is not None:
+                keep = [k and (v >= minVal) for k, v in zip(keep, vals())]
+        return [i for i, k in enumerate(keep) if k]
+
+    def filter(self, *, minIdentity=None, minQCover=None, minTCover=None):
+        "create a new table of entries passing all of the specified minimum thresholds"
+        return self.select(self.filterIndices(minIdentity=minIdentity, minQCover=minQCover, minTCover=minTCover))
+
+    def _sortIndices(self, keyCols):
+        # successive stable sorts from least to most significant key avoid
+        # creating a key tuple per entry
+        idxs = list(range(len(self)))
+        for col in reversed(keyCols):
+            idxs.sort(key=col.__getitem__)
+        return idxs
+
+    def targetOrder(self):
+        "get indices of entries sorted in the order of Psl.targetKey"
+        return self._sortIndices((self.tName, self.tStart, self.tEnd))
+
+    def queryOrder(self):
+        "get indices of entries sorted in the order of Psl.queryKey"
+        return self._sortIndices((self.qName, self.qStart, self.qEnd))
+
+    def sortByTarget(self):
+        "create a new table sorted by target coordinates"
+        return self.select(self.targetOrder())
+
+    def sortByQuery(self):
+        "create a new table sorted by query coordinates"
+        return self.select(self.queryOrder())
@@ -1,6 +1,10 @@
 # Copyright 2006-2026 Mark Diekhans
-from collections import namedtuple
-from pycbio.hgdata.psl import Psl
+from bisect import bisect_right
+from array import array
+from collections import namedtuple, deque
+from concurrent.futures import ProcessPoolExecutor
+from pycbio import PycbioDataError
+from pycbio.hgdata.psl import Psl, reverseCoords, reverseStrand
 
 _validStrands = ('+', '-')
 
@@ -78,6 +82,60 @@ def _rangesToPsl(mapPsl, rangeGen):
     psl.updateCounts()
     return psl
 
+class PslMapBatchResult(namedtuple("PslMapBatchResult",
+                                   ("rangeIdxs", "qStarts", "qEnds", "tStarts", "tEnds"))):
+    """Aligned pieces from mapping a batch of ranges, as parallel arrays.
+    rangeIdxs is the index of the input range that produced each piece.
+    Pieces are ordered by range index, then in mapping PSL block order.  The
+    coordinates of the ranges being mapped are on the requested strand and
+    the mapped-to coordinates are on the strand of the mapping PSL, as with
+    PslMapRange.  Unaligned parts of ranges are not included."""
+    __slots__ = ()
+
+    def __len__(self):
+        return len(self.rangeIdxs)
+
+
+class _PslBlockIndex:
+    "arrays of block coordinates of the mapping PSL, for bisect searches"
+    __slots__ = ("qStarts", "qEnds", "tStarts", "tEnds")
+
+    def __init__(self, mapPsl):
+        blocks = mapPsl.blocks
+        self.qStarts = array('q', [blk.qStart for blk in blocks])
+        self.qEnds = array('q', [blk.qEnd for blk in blocks])
+        self.tStarts = array('q', [blk.tStart for blk in blocks])
+        self.tEnds = array('q', [blk.tEnd for blk in blocks])
+
+
+def _batchMap(srcBlkStarts, srcBlkEnds, destBlkStarts, rngStarts, rngEnds, rngIdxs):
+    """map ranges, in rngIdxs order, through blocks in a single pass when
+    ranges are sorted by start, returning arrays of range index, source
+    start and end, and destination start"""
+    outIdxs, outSrcStarts, outSrcEnds, outDestStarts = array('q'), array('q'), array('q'), array('q')
+    numBlks = len(srcBlkStarts)
+    iBlk = 0
+    prevStart = None
+    for iRng in rngIdxs:
+        rngStart, rngEnd = rngStarts[iRng], rngEnds[iRng]
+        if (prevStart is not None) and (rngStart < prevStart):
+            iBlk = bisect_right(srcBlkEnds, rngStart)  # out of order, reposition
+        prevStart = rngStart
+        while (iBlk < numBlks) and (srcBlkEnds[iBlk] <= rngStart):
+            iBlk += 1
+        j = iBlk
+        while (j < numBlks) and (srcBlkStarts[j] < rngEnd):
+            start = max(rngStart, srcBlkStarts[j])
+            end = min(rngEnd, srcBlkEnds[j])
+            if start < end:
+                outIdxs.append(iRng)
+                outSrcStarts.append(start)
+                outSrcEnds.append(end)
+                outDestStarts.append(destBlkStarts[j] + (start - srcBlkStarts[j]))
+            j += 1
+    return outIdxs, outSrcStarts, outSrcEnds, outDestStarts
+
+
 class PslMap:
     """Object for mapping coordinates using PSL alignments.
     Can map from either query-to-target or target-to-query coordinates.
@@ -88,6 +146,15 @@ class PslMap:
     def __init__(self, mapPsl):
         "initialize with mapping PSL"
         self.mapPsl = mapPsl
+        self._blkIndex = None
+
+    @property
+    def blockIndex(self):
+        """block coordinate arrays, built on first use; the mapping PSL must
+        not be modified after this"""
+        if self._blkIndex is None:
+            self._blkIndex = _PslBlockIndex(self.mapPsl)
+        return self._blkIndex
 
     def _t2qProcessGap(self, prevBlk, nextBlk, tRngNext, tRngEnd, qStrand, tStrand):
         """analyze gap before blk, return updated tRngNext"""
@@ -136,11 +203,14 @@ class PslMap:
                               None, tRngNext, self.mapPsl.blocks[0].tStart, None, tStrand)
             tRngNext = self.mapPsl.blocks[0].tStart
 
-        # process blocks and gaps
-        prevBlk = None
-        for blk in self.mapPsl.blocks:
+        # process blocks and gaps, starting with the first block not before range
+        blocks = self.mapPsl.blocks
+        iBlk = bisect_right(self.blockIndex.tEnds, tRngNext)
+        prevBlk = blocks[iBlk - 1] if iBlk > 0 else None
+        for iBlk in range(iBlk, len(blocks)):
             if tRngNext >= tRngEnd:
                 break
+            blk = blocks[iBlk]
             if prevBlk is not None:
                 tRngNext, pmr = self._t2qProcessGap(prevBlk, blk, tRngNext, tRngEnd, qStrand, tStrand)
                 if pmr is not None:
@@ -204,11 +274,14 @@ class PslMap:
                               None, None, None, self.mapPsl.blocks[0].tStart, tStrand)
             qRngNext = self.mapPsl.blocks[0].qStart
 
-        # process blocks and gaps
-        prevBlk = None
-        for blk in self.mapPsl.blocks:
+        # process blocks and gaps, starting with the first block not before range
+        blocks = self.mapPsl.blocks
+        iBlk = bisect_right(self.blockIndex.qEnds, qRngNext)
+        prevBlk = blocks[iBlk - 1] if iBlk > 0 else None
+        for iBlk in range(iBlk, len(blocks)):
             if qRngNext >= qRngEnd:
                 break
+            blk = blocks[iBlk]
             if prevBlk is not None:
                 qRngNext, pmr = self._q2tProcessGap(prevBlk, blk, qRngNext, qRngEnd, qStrand, tStrand)
                 if pmr is not None:
@@ -234,3 +307,186 @@ class PslMap:
         """Map a query range to query ranges using a PSL and output a PSL.
         Return None if range not mapped."""
         return _rangesToPsl(self.mapPsl, self.queryToTargetMap(qRngStart, qRngEnd, qStrand))
+
+    def _mapBatch(self, rngStarts, rngEnds, reverse, size, srcBlkStarts, srcBlkEnds, destBlkStarts):
+        """map ranges, reversing them to the strand of the mapping PSL if
+        needed, returns range indexes, source coordinates on the requested
+        strand and destination coordinates"""
+        if len(rngStarts) != len(rngEnds):
+            raise ValueError(f"range starts and ends arrays have different lengths: {len(rngStarts)} != {len(rngEnds)}")
+        if reverse:
+            # reversed ranges are in ascending order when traversed backwards
+            rngStarts, rngEnds = [size - e for e in rngEnds], [size - s for s in rngStarts]
+            rngIdxs = range(len(rngStarts) - 1, -1, -1)
+        else:
+            rngIdxs = range(len(rngStarts))
+        idxs, srcStarts, srcEnds, destStarts = _batchMap(srcBlkStarts, srcBlkEnds, destBlkStarts,
+                                                         rngStarts, rngEnds, rngIdxs)
+        destEnds = array('q', [d + (e - s) for s, e, d in zip(srcStarts, srcEnds, destStarts)])
+        if reverse:
+            srcStarts, srcEnds = array('q', [size - e for e in srcEnds]), array('q', [size - s for s in srcStarts])
+            # restore range order, stable sort keeps block order within a range
+            order = sorted(range(len(idxs)), key=idxs.__getitem__)
+            idxs, srcStarts, srcEnds, destStarts, destEnds = [array('q', [a[i] for i in order])
+                                                              for a in (idxs, srcStarts, srcEnds, destStarts, destEnds)]
+        return idxs, srcStarts, srcEnds, destStarts, destEnds
+
+    def targetToQueryMapBatch(self, tRngStarts, tRngEnds, tStrand='+'):
+        """Map a batch of target ranges, given as parallel sequences of starts
+        and ends, to query ranges, returning a PslMapBatchResult of the aligned
+        pieces.  Ranges sorted by start are mapped in a single pass over the
+        blocks; unsorted ranges are allowed, but slower."""
+        assert tStrand in _validStrands
+        bi = self.blockIndex
+        idxs, tStarts, tEnds, qStarts, qEnds = self._mapBatch(tRngStarts, tRngEnds, tStrand != self.mapPsl.tStrand,
+                                                              self.mapPsl.tSize, bi.tStarts, bi.tEnds, bi.qStarts)
+        return PslMapBatchResult(idxs, qStarts, qEnds, tStarts, tEnds)
+
+    def queryToTargetMapBatch(self, qRngStarts, qRngEnds, qStrand='+'):
+        """Map a batch of query ranges, given as parallel sequences of starts
+        and ends, to target ranges, returning a PslMapBatchResult of the aligned
+        pieces.  Ranges sorted by start are mapped in a single pass over the
+        blocks; unsorted ranges are allowed, but slower."""
+        assert qStrand in _validStrands
+        bi = self.blockIndex
+        idxs, qStarts, qEnds, tStarts, tEnds = self._mapBatch(qRngStarts, qRngEnds, qStrand != self.mapPsl.qStrand,
+                                                              self.mapPsl.qSize, bi.qStarts, bi.qEnds, bi.tStarts)
+        return PslMapBatchResult(idxs, qStarts, qEnds, tStarts, tEnds)
+
+
+def _isTranslated(psl):
+    "is this a protein or translated nucleotide alignment"
+    if len(psl.strand) < 2:
+        return False
+    lastBlk = psl.blocks[-1]
+    tEnd = lastBlk.tStart + 3 * lastBlk.size
+    if psl.tStrand == '-':
+        return psl.tStart == psl.tSize - tEnd
+    return psl.tEnd == tEnd
+
+def _checkMapPsls(inPsl, mapPsl):
+    if (inPsl.tName != mapPsl.qName) or (inPsl.tSize != mapPsl.qSize):
+        raise PycbioDataError(f"input PSL target {inPsl.tName}:{inPsl.tSize} does not match "
+                              f"mapping PSL query {mapPsl.qName}:{mapPsl.qSize}")
+    for psl in (inPsl, mapPsl):
+        if _isTranslated(psl):
+            raise PycbioDataError(f"mapping translated PSLs is not supported: {psl.qName} to {psl.tName}")
+
+def _mapPslThrough(inPsl, mapper):
+    """map inPsl through the PslMap, which has already been checked"""
+    mapPsl = mapper.mapPsl
+    inBlks = inPsl.blocks
+    res = mapper.queryToTargetMapBatch([blk.tStart for blk in inBlks], [blk.tEnd for blk in inBlks],
+                                       inPsl.tStrand)
+    if len(res) == 0:
+        return None
+
+    # when the strands of the shared sequence differ, the composed alignment
+    # is reversed relative to the input query
+    flip = inPsl.tStrand != mapPsl.qStrand
+    qStrand = reverseStrand(inPsl.qStrand) if flip else inPsl.qStrand
+    if (len(inPsl.strand) == 1) and (len(mapPsl.strand) == 1):
+        strand = qStrand
+    else:
+        strand = qStrand + mapPsl.tStrand
+    outPsl = Psl.create(qName=inPsl.qName, qSize=inPsl.qSize,
+                        tName=mapPsl.tName, tSize=mapPsl.tSize,
+                        strand=strand)
+    blks = []
+    for iBlk, bStart, bEnd, cStart in zip(res.rangeIdxs, res.qStarts, res.qEnds, res.tStarts):
+        inBlk = inBlks[iBlk]
+        aStart = inBlk.qStart + (bStart - inBlk.tStart)
+        aEnd = aStart + (bEnd - bStart)
+        if flip:
+            aStart, aEnd = reverseCoords(aStart, aEnd, inPsl.qSize)
+        blks.append((cStart, aStart, bEnd - bStart))
+    blks.sort()
+    for cStart, aStart, size in blks:
+        outPsl.addBlock(aStart, cStart, size)
+    outPsl.updateBounds()
+    outPsl.updateCounts()
+    return outPsl
+
+def pslMapPsl(inPsl, mapPsl):
+    """Map an alignment of A to B through an alignment of B to C, giving an
+    alignment of A to C, as with the UCSC pslMap program.  The target of
+    inPsl must be the query of mapPsl.  Only untranslated alignments are
+    supported.  All aligned bases are counted as matches.  Return None if
+    no part of inPsl maps."""
+    _checkMapPsls(inPsl, mapPsl)
+    return _mapPslThrough(inPsl, PslMap(mapPsl))
+
+
+class PslMapIndex:
+    """Mapping PSLs indexed by query name, for composing many input PSLs with
+    pslMapPsl.  The PslMap objects for the mapping PSLs, along with their
+    block indexes, are kept, so they are only built once."""
+    def __init__(self, mapPsls=()):
+        self.byQName = {}
+        for mapPsl in mapPsls:
+            self.add(mapPsl)
+
+    def add(self, mapPsl):
+        "add a mapping PSL"
+        self.byQName.setdefault(mapPsl.qName, []).append(PslMap(mapPsl))
+
+    def mapPsl(self, inPsl):
+        """generator of PSLs from mapping inPsl through all mapping PSLs with a
+        query that is the target of inPsl"""
+        for mapper in self.byQName.get(inPsl.tName, ()):
+            _checkMapPsls(inPsl, mapper.mapPsl)
+            outPsl = _mapPslThrough(inPsl, mapper)
+            if outPsl is not None:
+                yield outPsl
+
+
+# mapping index in pool worker processes
+_workerIndex = None
+
+def _workerInit(mapPsls):
+    global _workerIndex
+    _workerIndex = PslMapIndex(mapPsls)
+
+def _workerMapRows(inRows):
+    "map a chunk of PSL rows, PSLs are passed as rows as this is faster to pickle"
+    return [outPsl.toRow() for inRow in inRows
+            for outPsl in _workerIndex.mapPsl(Psl.fromRow(inRow))]
+
+def _pslsFromRows(rows):
+    for row in rows:
+        yield Psl.fromRow(row)
+
+def _chunkRows(inPsls, chunkSize):
+    chunk = []
+    for inPsl in inPsls:
+        chunk.append(inPsl.toRow())
+        if len(chunk) >= chunkSize:
+            yield chunk
+            chunk = []
+    if len(chunk) > 0:
+        yield chunk
+
+def pslMapPsls(inPsls, mapPsls, *, workers=None, chunkSize=1000):
+    """Generator composing each PSL in the iterable inPsls with all of the
+    mapping PSLs with a query matching its target, producing the output of
+    pslMapPsl in input order.  If workers is greater than one, mapping is done
+    in a pool of that many processes, with inPsls sent to them in chunks of
+    chunkSize."""
+    if (workers is None) or (workers <= 1):
+        index = PslMapIndex(mapPsls)
+        for inPsl in inPsls:
+            yield from index.mapPsl(inPsl)
+    else:
+        yield from _poolMapPsls(inPsls, mapPsls, workers, chunkSize)
+
+def _poolMapPsls(inPsls, mapPsls, workers, chunkSize):
+    "map in a process pool, limiting the number of chunks queued"
+    with ProcessPoolExecutor(max_workers=workers, initializer=_workerInit,
+                             initargs=(list(mapPsls),)) as executor:
+        pending = deque()
+        for inRows in _chunkRows(inPsls, chunkSize):
+            pending.append(executor.submit(_workerMapRows, inRows))
+            if len(pending) >= 2 * workers:
+                yield from _pslsFromRows(pending.popleft().result())
+        while len(pending) > 0:
+            yield from _pslsFromRows(pending.popleft().result())
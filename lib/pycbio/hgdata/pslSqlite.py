@@ -3,12 +3,49 @@
 Storage of PSL format tables in sqlite for use in cluster jobs and other
 random access uses.
 """
-from pycbio.hgdata.hgSqlite import HgSqliteTable
+import os
+import tempfile
+from os import path as osp
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+from pycbio.db import sqliteOps
+from pycbio.hgdata.hgSqlite import HgSqliteTable, LoadStats
 from pycbio.hgdata.psl import Psl
 from pycbio.hgdata import rangeFinder
+from pycbio.sys import fileOps
+from pycbio.sys.perfOps import RunTime
 from pycbio.tsv import TabFileReader
 
 
+# table name in temporary databases used by parallel loading
+_chunkTable = "chunk"
+
+def _binPslRow(row):
+    "add bin; note modifies row"
+    row.insert(0, rangeFinder.calcBin(int(row[15]), int(row[16])))
+    return row
+
+def _lineChunks(pslFile, chunkSize):
+    with fileOps.FileAccessor(pslFile) as fh:
+        while True:
+            lines = list(islice(fh, chunkSize))
+            if len(lines) == 0:
+                break
+            yield lines
+
+def _loadChunkDb(lines, chunkDb):
+    """parse PSL lines and load into a new database, run in parse worker
+    processes, return the number of rows loaded"""
+    conn = sqliteOps.connect(chunkDb, create=True)
+    try:
+        sqliteOps.setFastLoadPragmas(conn)
+        tbl = PslSqliteTable(conn, _chunkTable, create=True)
+        return tbl._insertsChunked(tbl.insertSql, tbl.columnNamesBin,
+                                   (_binPslRow(line[0:-1].split('\t')) for line in lines), len(lines))
+    finally:
+        conn.close()
+
+
 class PslSqliteTable(HgSqliteTable):
     """
     Storage for PSL alignments.  Psl objects, or raw sql rows can be
@@ -63,33 +100,85 @@ class PslSqliteTable(HgSqliteTable):
         """create index after loading"""
         self._index(self.indexSql)
 
+    def rtreeIndex(self):
+        """create an R*Tree index on the target range after loading, which is
+        then used by getTRangeOverlap instead of the bin index.  The index is
+        dropped if rows are loaded afterwards, as it is not updated; call this
+        again after loading to recreate it."""
+        self._createRTree("tName", "tStart", "tEnd")
+
     def loadsWithBin(self, binnedRows):
-        """load PSLs rows which already have bin column"""
+        """load PSLs rows which already have bin column, dropping any R*Tree index"""
+        self._dropRTree()
         self._inserts(self.insertSql, self.columnNamesBin, binnedRows)
 
     def loads(self, rows):
         """load rows, which can be list-like or Psl objects, adding bin"""
-        binnedRows = []
+        self.loadsWithBin(self._binRows(rows))
+
+    @staticmethod
+    def _binRows(rows):
         for row in rows:
             if isinstance(row, Psl):
                 row = row.toRow()
             bin = rangeFinder.calcBin(int(row[15]), int(row[16]))
-            binnedRows.append((bin,) + tuple(row))
-        self.loadsWithBin(binnedRows)
+            yield (bin,) + tuple(row)
 
-    # FIXME: dups code above
-    @staticmethod
-    def _binPslRow(row):
-        "add bin; note modifies row"
-        row.insert(0, rangeFinder.calcBin(int(row[15]), int(row[16])))
-        return row
-
-    def loadPslFile(self, pslFile):
-        """load a PSL file or file-like object, adding bin"""
-        rows = []
-        for row in TabFileReader(pslFile):
-            rows.append(self._binPslRow(row))
-        self.loadsWithBin(rows)
+    def loadPslFile(self, pslFile, *, chunkSize=100000, parseWorkers=None):
+        """load a PSL file or file-like object, adding bin.  Rows are streamed
+        into the table with a transaction for each chunkSize rows.  If
+        parseWorkers is greater than one, the file is parsed in that many
+        worker processes while the rows are inserted, using temporary files
+        in TMPDIR.  Any R*Tree index is dropped.  Returns the number of rows
+        loaded."""
+        self._dropRTree()
+        if (parseWorkers is not None) and (parseWorkers > 1):
+            return self._parallelLoadPslFile(pslFile, chunkSize, parseWorkers)
+        else:
+            rows = (_binPslRow(row) for row in TabFileReader(pslFile))
+            return self._insertsChunked(self.insertSql, self.columnNamesBin, rows, chunkSize)
+
+    def _copyChunkDb(self, chunkDb):
+        "copy rows from a chunk database into this table, ATTACH can't be in a transaction"
+        self.conn.execute("ATTACH DATABASE ? AS chunkDb", (chunkDb,))
+        try:
+            columns = self._joinColNames(self.columnNamesBin)
+            self.execute(f"INSERT INTO {{table}} ({columns}) SELECT {columns} FROM chunkDb.{_chunkTable}")
+        finally:
+            self.conn.execute("DETACH DATABASE chunkDb")
+        os.unlink(chunkDb)
+
+    def _parallelLoadPslFile(self, pslFile, chunkSize, parseWorkers):
+        """Worker processes parse chunks of the file into temporary databases,
+        which are copied into the table in file order by sqlite, so no
+        per-row work is done in this process.  A limited number of chunks are
+        queued."""
+        count = 0
+        with tempfile.TemporaryDirectory(prefix="pslLoad.", dir=fileOps.findTmpDir()) as tmpDir:
+            with ProcessPoolExecutor(max_workers=parseWorkers) as executor:
+                pending = []
+                for iChunk, lines in enumerate(_lineChunks(pslFile, chunkSize)):
+                    chunkDb = osp.join(tmpDir, f"chunk{iChunk}.db")
+                    pending.append((executor.submit(_loadChunkDb, lines, chunkDb), chunkDb))
+                    if len(pending) > 2 * parseWorkers:
+                        future, chunkDb = pending.pop(0)
+                        count += future.result()
+                        self._copyChunkDb(chunkDb)
+                for future, chunkDb in pending:
+                    count += future.result()
+                    self._copyChunkDb(chunkDb)
+        return count
+
+    def bulkLoadPslFile(self, pslFile, *, chunkSize=100000, parseWorkers=None):
+        """load a large PSL file as with loadPslFile, first setting sqlite
+        pragmas for fast loading, and creating the indexes after loading.
+        This must not be called in a transaction, and the pragmas remain
+        set on the connection.  Returns a LoadStats object."""
+        startTime = RunTime.current()
+        sqliteOps.setFastLoadPragmas(self.conn)
+        rows = self.loadPslFile(pslFile, chunkSize=chunkSize, parseWorkers=parseWorkers)
+        self.index()
+        return LoadStats(rows, RunTime.current() - startTime)
 
     @staticmethod
     def _getRowFactory(raw):
@@ -118,15 +207,13 @@ class PslSqliteTable(HgSqliteTable):
         if raw is True.  Strand should match the strand value in the table
         (one or two) and maybe a list of multiple value.  The where is ANDed
         with the query if supplied."""
-        if tStart is None:
-            rangeWhere = "(tName = '{}')".format(tName)
-        else:
-            rangeWhere = rangeFinder.getOverlappingSqlExpr("bin", "tName", "tStart", "tEnd", tName, tStart, tEnd)
+        rangeWhere, sqlArgs = self._rangeOverlapWhere("bin", "tName", "tStart", "tEnd", tName, tStart, tEnd)
         sql = "SELECT {{columns}} FROM {{table}} WHERE {}".format(rangeWhere)
         if strand is not None:
             if isinstance(strand, str):
                 strand = [strand]
-            sql += " AND (strand in ({}))".format(','.join(["'{}'".format(s) for s in strand]))
+            sql += " AND (strand in ({}))".format(','.join(len(strand) * ["?"]))
+            sqlArgs.extend(strand)
         if extraWhere is not None:
             sql += " AND ({})".format(extraWhere)
-        return self.queryRows(sql, self.columnNames, self._getRowFactory(raw))
+        return self.queryRows(sql, self.columnNames, self._getRowFactory(raw), *sqlArgs)
@@ -1,7 +1,7 @@
 # Copyright 2006-2026 Mark Diekhans
 """Module to access output of pslStats UCSC browser command"""
 from collections import defaultdict
-from pycbio.tsv import TsvReader
+from pycbio.tsv import TsvReader, tsvLoadColumns
 from pycbio.sys.symEnum import SymEnum
 
 # FIXME: make a reader object
@@ -86,3 +86,10 @@ class PslStats(list):
             self.idx[row.qName].append(row)
         elif self.type == PslStatsType.QUERY:
             self.idx[row.qName] = row
+
+
+def pslStatsLoadColumns(pslStatsFile, select=None):
+    """Load any of the pslStats output types into columns, returning a dict
+    of column name to values; see TsvReader.readColumns().  This is faster
+    and uses much less memory than PslStats when computing statistics."""
+    return tsvLoadColumns(pslStatsFile, typeMap, select=select)
@@ -17,9 +17,12 @@ generating SQL where clauses to restrict by bin."""
 # will fit in.
 
 import sys
-from collections import namedtuple
+from array import array
+from bisect import bisect_right
+from collections import namedtuple, defaultdict
 from deprecation import deprecated
 from pycbio import PycbioException
+from pycbio.sys.symEnum import SymEnum
 
 
 class RangeFinderException(PycbioException):
@@ -113,6 +116,32 @@ def getOverlappingSqlExpr(binCol, seqCol, startCol, endCol, seq, start, end):
     return "(({}=\"{}\") and ({}<{}) and ({}>{}) and ({}))".format(seqCol, seq, startCol, end, endCol, start, " or ".join(parts))
 
 
+# maximum number of bin ranges returned by getOverlappingBins
+BIN_MAX_OVERLAPPING_RANGES = len(BIN_OFFSETS_BASIC) + len(BIN_OFFSETS_EXTENDED)
+
+def getOverlappingSqlParamExpr(binCol, seqCol, startCol, endCol, table):
+    """Generate a parameterized SQL expression for rows of table overlapping a
+    range, with the parameters from getOverlappingSqlParams.  The expression
+    is the same for all ranges, so a prepared statement using it can be
+    reused.  Each bin range is a separate subquery, so that each one is an
+    index range search.  There must be an index on (seqName, bin).
+    """
+    # parameters 1 to 3 are seq, start, and end, followed by bin ranges
+    binQueries = " UNION ALL ".join(["SELECT oid FROM {} WHERE ({}=?1) AND ({}>=?{} AND {}<=?{})".format(table, seqCol, binCol, 4 + 2 * i, binCol, 5 + 2 * i)
+                                     for i in range(BIN_MAX_OVERLAPPING_RANGES)])
+    return "((oid IN ({})) and ({}<?3) and ({}>?2))".format(binQueries, startCol, endCol)
+
+def getOverlappingSqlParams(seq, start, end):
+    """Generate the list of parameters for the expression from
+    getOverlappingSqlParamExpr.  Unused bin ranges are set to a range that
+    matches no bin."""
+    params = [seq, start, end]
+    binRanges = list(getOverlappingBins(start, end))
+    for bins in binRanges + (BIN_MAX_OVERLAPPING_RANGES - len(binRanges)) * [(-1, -1)]:
+        params.extend(bins)
+    return params
+
+
 class Entry(namedtuple("Entry",
                        ("start", "end", "value"))):
     "entry associating a range with a value"
@@ -126,6 +155,45 @@ class Entry(namedtuple("Entry",
         return str(self.start) + "-" + str(self.end) + ": " + str(self.value)
 
 
+def _sweepOverlaps(entries, queries, starts, ends, hitQueryIdxs, hitEntries):
+    """Sweep-line overlap of entries sorted by start with query indices sorted
+    by start, appending hits to the output arrays.  The active list holds
+    entries that started before the end of some query and have not ended
+    before the start of the current query."""
+    active = []
+    iEntry = 0
+    numEntries = len(entries)
+    for iQuery in queries:
+        qStart, qEnd = starts[iQuery], ends[iQuery]
+        if qStart >= qEnd:
+            continue
+        while (iEntry < numEntries) and (entries[iEntry].start < qEnd):
+            active.append(entries[iEntry])
+            iEntry += 1
+        stillActive = []
+        for entry in active:
+            if entry.end > qStart:
+                stillActive.append(entry)
+                # a previous, longer query may have activated this entry
+                if entry.start < qEnd:
+                    hitQueryIdxs.append(iQuery)
+                    hitEntries.append(entry)
+        active = stillActive
+
+def _addMerge(container, entry, mergeFunc):
+    """add an entry to a RangeBins or RangeNCList container, first removing
+    the entries it overlaps and merging them into the new entry"""
+    overEntries = list(container.overlapping(entry.start, entry.end))  # must make copy
+    if len(overEntries) > 0:
+        for e in overEntries:
+            container.remove(e)
+        entries = [entry] + overEntries
+        entry = Entry(min((e.start for e in entries)),
+                      max((e.end for e in entries)),
+                      mergeFunc([e.value for e in entries]))
+    container.add(entry)
+
+
 class RangeBins:
     """Range indexed container for a single sequence.  This using a binning
     scheme that implements spacial indexing. Based on UCSC hg browser binRange
@@ -148,19 +216,8 @@ class RangeBins:
         self.minStart = min(self.minStart, entry.start)
         self.maxEnd = max(self.maxEnd, entry.end)
 
-    def _mergeEntries(self, newEntry, overEntries, mergeFunc):
-        for e in overEntries:
-            self.remove(e)
-        entries = [newEntry] + overEntries
-        return Entry(min((e.start for e in entries)),
-                     max((e.end for e in entries)),
-                     mergeFunc([e.value for e in entries]))
-
     def addMerge(self, entry, mergeFunc):
-        overEntries = list(self.overlapping(entry.start, entry.end))  # must make copy
-        if len(overEntries) > 0:
-            entry = self._mergeEntries(entry, overEntries, mergeFunc)
-        self.add(entry)
+        _addMerge(self, entry, mergeFunc)
 
     def overlapping(self, start, end):
         "generator of entries overlapping the specified range"
@@ -201,17 +258,146 @@ class RangeBins:
                 fh.write("\t" + str(entry) + "\n")
 
 
+class RangeNCList:
+    """Range indexed container for a single sequence, implemented as a nested
+    containment list (Alekseyenko and Lee, 2007).  This is a static index,
+    built on the first query after entries are added or removed.  Queries
+    take O(log n + k) time, regardless of the number of long entries, making
+    it much faster than RangeBins for dense data.  Adding or removing
+    entries after querying causes the index to be rebuilt.
+
+    Once built, the entries are stored in flattened arrays, with each
+    nested list stored contiguously.  Within a list, neither start or end
+    decrease, so a binary search on end finds the first overlapping entry.
+    For the entry at each position, subStarts/subEnds gives the range of
+    its nested list, which is empty if subStarts[i] == subEnds[i].
+    """
+    __slots__ = ("seqId", "strand", "minStart", "maxEnd", "_entries",
+                 "_built", "_starts", "_ends", "_subStarts", "_subEnds", "_topEnd")
+
+    def __init__(self, seqId, strand):
+        self.seqId = seqId
+        self.strand = strand
+        self.minStart = sys.maxsize
+        self.maxEnd = 0
+        self._entries = []
+        self._built = None  # entries in nested list order, None if index must be rebuilt
+
+    def add(self, entry):
+        self._entries.append(entry)
+        self._built = None
+        self.minStart = min(self.minStart, entry.start)
+        self.maxEnd = max(self.maxEnd, entry.end)
+
+    def addMerge(self, entry, mergeFunc):
+        _addMerge(self, entry, mergeFunc)
+
+    @staticmethod
+    def _buildNesting(entries):
+        """sort entries and determine nesting, returns top-level list and
+        a dict of id(parent entry) to list of contained entries"""
+        topList = []
+        subLists = {}
+        stack = []  # current chain of containing entries
+        for entry in sorted(entries, key=lambda e: (e.start, -e.end)):
+            while (len(stack) > 0) and (stack[-1].end < entry.end):
+                stack.pop()
+            if len(stack) == 0:
+                topList.append(entry)
+            else:
+                subLists.setdefault(id(stack[-1]), []).append(entry)
+            stack.append(entry)
+        return topList, subLists
+
+    def _build(self):
+        "build flattened nested containment list"
+        topList, subLists = self._buildNesting(self._entries)
+        built = list(topList)
+        subStarts = []
+        subEnds = []
+        # breadth-first layout; each entry's nested list is appended to
+        # the end of the flattened arrays as it is visited
+        for entry in built:
+            subList = subLists.get(id(entry), ())
+            subStarts.append(len(built))
+            built.extend(subList)
+            subEnds.append(len(built))
+        self._starts = [e.start for e in built]
+        self._ends = [e.end for e in built]
+        self._subStarts = subStarts
+        self._subEnds = subEnds
+        self._topEnd = len(topList)
+        self._built = built
+
+    def overlapping(self, start, end):
+        "generator of entries overlapping the specified range"
+        if start < end:
+            if self._built is None:
+                self._build()
+            built, starts, ends = self._built, self._starts, self._ends
+            subStarts, subEnds = self._subStarts, self._subEnds
+            pending = [(0, self._topEnd)]
+            while len(pending) > 0:
+                lo, hi = pending.pop()
+                i = bisect_right(ends, start, lo, hi)
+                while (i < hi) and (starts[i] < end):
+                    yield built[i]
+                    if subStarts[i] < subEnds[i]:
+                        pending.append((subStarts[i], subEnds[i]))
+                    i += 1
+
+    def remove(self, entry):
+        """Remove an entry with the particular range and value"""
+        try:
+            self._entries.remove(entry)
+        except ValueError:
+            raise _EntryNotFound()
+        self._built = None
+
+    def values(self):
+        "generator over all values"
+        for entry in self._entries:
+            yield entry.value
+
+    def entries(self):
+        "generator over all Entry objects"
+        yield from self._entries
+
+    def dump(self, fh):
+        "print contents for debugging purposes"
+        fh.write(self.seqId + " (" + str(self.strand) + ")\n")
+        for entry in self._entries:
+            fh.write("\t" + str(entry) + "\n")
+
+
+class RangeFinderEngine(SymEnum):
+    """Index implementation used by RangeFinder.  bins is dynamic and
+    efficient for modification, nclist is static and faster to query,
+    especially with dense data or many long entries."""
+    bins = 1
+    nclist = 2
+
+
+_engineClasses = {
+    RangeFinderEngine.bins: RangeBins,
+    RangeFinderEngine.nclist: RangeNCList,
+}
+
+
 class RangeFinder:
     """Container index by sequence id, range, and optionally strand.
     All entries added to the object must either have strand or not
     have strand.  A query without strand will find all overlapping
     entries on either strand if strand was specified when adding entries.
+    The engine option selects the index implementation, see RangeFinderEngine.
     """
     validStrands = set((None, "+", "-"))
 
-    def __init__(self, *, mergeFunc=None):
+    def __init__(self, *, mergeFunc=None, engine=RangeFinderEngine.bins):
         "mergeFunc must take a list of values and returned a new value"
         self.mergeFunc = mergeFunc
+        self.engine = RangeFinderEngine(engine)
+        self._seqBinsClass = _engineClasses[self.engine]
         self.haveStrand = None
         self.seqBins = {}
 
@@ -237,7 +423,7 @@ class RangeFinder:
         key = self._binKey(seqId, strand)
         bins = self.seqBins.get(key)
         if bins is None:
-            self.seqBins[key] = bins = RangeBins(seqId, strand)
+            self.seqBins[key] = bins = self._seqBinsClass(seqId, strand)
         return bins
 
     def add(self, seqId, start, end, value, strand=None):
@@ -308,6 +494,42 @@ class RangeFinder:
         """generator over values overlapping using a Coords object"""
         return self.overlapping(coords.name, coords.start, coords.end, strand=strand)
 
+    def _batchQueryKeys(self, seqId, strand):
+        "get the seqBins keys to check for a query in a batch"
+        self._checkStrand(strand)
+        if self.haveStrand and (strand is None):
+            return ((seqId, '+'), (seqId, '-'))
+        elif not self.haveStrand:
+            return ((seqId, None),)
+        else:
+            return ((seqId, strand),)
+
+    def overlappingBatch(self, seqIds, starts, ends, strands=None):
+        """Find overlaps for many queries at once.  The queries are parallel
+        sequences of seqIds, starts, ends and optional strands, with the same
+        semantics as overlappingEntries().  Queries and entries are each
+        sorted and overlaps found with a sweep-line merge, avoiding the
+        per-query overhead of overlapping().  Returns a tuple of
+        (queryIdxs, entries), an array of indices into the query sequences
+        and a parallel list of Entry objects, ordered by query index."""
+        queriesByKey = defaultdict(list)
+        for iQuery, seqId in enumerate(seqIds):
+            strand = strands[iQuery] if strands is not None else None
+            for key in self._batchQueryKeys(seqId, strand):
+                queriesByKey[key].append(iQuery)
+
+        hitQueryIdxs = array('q')
+        hitEntries = []
+        for key, queries in queriesByKey.items():
+            bins = self.seqBins.get(key)
+            if bins is not None:
+                entries = sorted(bins.entries(), key=lambda e: e.start)
+                queries.sort(key=starts.__getitem__)
+                _sweepOverlaps(entries, queries, starts, ends, hitQueryIdxs, hitEntries)
+
+        order = sorted(range(len(hitQueryIdxs)), key=hitQueryIdxs.__getitem__)
+        return array('q', [hitQueryIdxs[i] for i in order]), [hitEntries[i] for i in order]
+
     def _removeFromSeqBin(self, seqId, strand, entry):
         # strand maybe None
         self.seqBins.get((seqId, strand)).remove(entry)
@@ -0,0 +1,154 @@
+# Copyright 2006-2026 Mark Diekhans
+"""
+Classification of intron splice junctions by their donor and acceptor
+dinucleotides.  Introns are classified in bulk: they are deduplicated,
+sorted by location and the junction sequences fetched with coalesced reads
+of the genome, which is much faster than fetching each junction separately.
+"""
+import threading
+from collections import namedtuple, defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from pycbio.sys.symEnum import SymEnum, auto
+from pycbio.hgdata import dnaOps
+from pycbio.hgdata.coords import Coords
+from pycbio.hgdata.genome import Genome, genome_factory
+
+
+class SJCategory(SymEnum):
+    STD = auto()
+    RARE = auto()
+    U12 = auto()
+    STD_RC = auto()
+    GAP = auto()
+    UNKNOWN = auto()
+
+
+# introns shorter than this are classified as alignment gaps
+MIN_INTRON_SIZE = 30
+
+# junctions separated by no more than FETCH_MAX_GAP bases are read from the
+# genome together, in reads of up to FETCH_MAX_SPAN bases
+FETCH_MAX_GAP = 4096
+FETCH_MAX_SPAN = 1048576
+
+##
+# mapping of pattern to category
+##
+STD_SJ = 'GT/AG'
+RARE_SJ = 'GC/AG'
+U12_SJ = 'AT/AC'
+
+SJ_CATEGORY_MAP = {
+    STD_SJ: SJCategory.STD,
+    RARE_SJ: SJCategory.RARE,
+    U12_SJ: SJCategory.U12,
+    dnaOps.reverseComplement(STD_SJ): SJCategory.STD_RC,
+}
+
+
+class IntronCat(namedtuple("IntronCat", ("coords", "strand", "junc", "cat"))):
+    "classification of an intron, junc is the donor/acceptor in the direction of transcription"
+    __slots__ = ()
+
+
+def classify_junc(junc, intron_size):
+    "classify a junction string, such as 'GT/AG', for an intron of the given size"
+    if intron_size < MIN_INTRON_SIZE:
+        return SJCategory.GAP
+    cat = SJ_CATEGORY_MAP.get(junc, SJCategory.UNKNOWN)
+    if cat is SJCategory.UNKNOWN:
+        cat = SJ_CATEGORY_MAP.get(dnaOps.reverseComplement(junc), cat)
+    return cat
+
+def get_junc(genome, coords, strand):
+    "fetch the junction string for a single intron"
+    junc = (genome.get_seq(coords.name, coords.start, coords.start + 2).upper() + '/' +
+            genome.get_seq(coords.name, coords.end - 2, coords.end).upper())
+    if strand == '-':
+        junc = dnaOps.reverseComplement(junc)
+    return junc
+
+def bed_introns(bed):
+    "generator of introns as (chrom, start, end, strand) between the blocks of a BED"
+    prev_end = bed.blocks[0].end
+    for blk in bed.blocks[1:]:
+        yield (bed.chrom, prev_end, blk.start, bed.strand)
+        prev_end = blk.end
+
+def _fetch_sites(genome, chrom, sites):
+    """get dict of upper-case dinucleotides at sorted, unique positions on
+    chrom, fetching nearby sites together"""
+    site_seqs = {}
+    i = 0
+    while i < len(sites):
+        start = sites[i]
+        j = i + 1
+        while (j < len(sites)) and (sites[j] - sites[j - 1] <= FETCH_MAX_GAP) and (sites[j] - start < FETCH_MAX_SPAN):
+            j += 1
+        seq = genome.get_seq(chrom, start, sites[j - 1] + 2).upper()
+        for pos in sites[i:j]:
+            site_seqs[pos] = seq[pos - start:pos - start + 2]
+        i = j
+    return site_seqs
+
+class _JuncClassifier:
+    """classify positive strand junction strings for each strand, caching
+    the results, as there are few distinct junctions"""
+    def __init__(self):
+        self.cache = {}
+
+    def _classify(self, junc):
+        rc_junc = dnaOps.reverseComplement(junc)
+        juncs = self.cache[junc] = {"+": (junc, classify_junc(junc, MIN_INTRON_SIZE)),
+                                    "-": (rc_junc, classify_junc(rc_junc, MIN_INTRON_SIZE))}
+        juncs[""] = juncs["+"]
+        return juncs
+
+    def classify(self, junc, strand):
+        "return (junc, cat) for strand, with strand of '' for no strand"
+        juncs = self.cache.get(junc)
+        if juncs is None:
+            juncs = self._classify(junc)
+        return juncs[strand]
+
+def _classify_chrom(genome, chrom, introns):
+    """classify a set of (start, end, strand) introns on chrom, where strand
+    is '' for introns without a strand"""
+    introns = sorted(introns)
+    site_seqs = _fetch_sites(genome, chrom, sorted({start for start, _, _ in introns} | {end - 2 for _, end, _ in introns}))
+    classifier = _JuncClassifier()
+    intron_cats = []
+    for start, end, strand in introns:
+        junc, cat = classifier.classify(site_seqs[start] + '/' + site_seqs[end - 2], strand)
+        if end - start < MIN_INTRON_SIZE:
+            cat = SJCategory.GAP
+        # coordinates were checked when the transcripts were parsed
+        intron_cats.append(IntronCat(tuple.__new__(Coords, (chrom, start, end, None, None)), strand or None, junc, cat))
+    return intron_cats
+
+def classify_introns(genome, introns, *, threads=1):
+    """Classify introns, given as an iterable of (chrom, start, end, strand).
+    Returns a list of IntronCat for each unique intron, sorted by location.
+    Genome is either a Genome object or a genome file.  If threads is
+    greater than one, chromosomes are classified in parallel threads, each
+    opening the genome file, so genome must be a file."""
+    by_chrom = defaultdict(set)
+    for chrom, start, end, strand in introns:
+        by_chrom[chrom].add((start, end, strand or ""))
+    chroms = sorted(by_chrom.keys())
+    if threads > 1:
+        if isinstance(genome, Genome):
+            raise ValueError("classifying introns with multiple threads requires a genome file")
+        thread_data = threading.local()
+
+        def classify(chrom):
+            if not hasattr(thread_data, "genome"):
+                thread_data.genome = genome_factory(genome)
+            return _classify_chrom(thread_data.genome, chrom, by_chrom[chrom])
+        with ThreadPoolExecutor(threads) as executor:
+            chrom_cats = list(executor.map(classify, chroms))
+    else:
+        if not isinstance(genome, Genome):
+            genome = genome_factory(genome)
+        chrom_cats = [_classify_chrom(genome, chrom, by_chrom[chrom]) for chrom in chroms]
+    return [intron_cat for intron_cats in chrom_cats for intron_cat in intron_cats]
@@ -0,0 +1,215 @@
+# Copyright 2006-2026 Mark Diekhans
+"""
+Reading and writing UCSC two-bit genome sequence files.  The file is memory
+mapped and the sequence index and per-sequence headers are parsed when
+first used, so opening a large genome is cheap.  Packed bases are decoded
+by translating all of the bytes of a region at once for each of the four
+bases stored in a byte.
+"""
+import os
+import re
+import sys
+import mmap
+import struct
+from array import array
+from bisect import bisect_right
+from pycbio import PycbioDataError
+
+TWOBIT_SIG = 0x1A412743
+
+_BASES = b"TCAG"
+
+# tables to translate a packed byte to the base in each of the four positions
+_unpack_tables = tuple(bytes(_BASES[(b >> (6 - 2 * i)) & 3] for b in range(256))
+                       for i in range(4))
+
+
+class TwoBitError(PycbioDataError):
+    "error reading or writing a two-bit file"
+    pass
+
+
+class _SeqRec:
+    "header of a sequence record"
+    __slots__ = ("size", "n_starts", "n_ends", "mask_starts", "mask_ends", "dna_offset")
+
+    def __init__(self, size, n_starts, n_ends, mask_starts, mask_ends, dna_offset):
+        self.size = size
+        self.n_starts = n_starts
+        self.n_ends = n_ends
+        self.mask_starts = mask_starts
+        self.mask_ends = mask_ends
+        self.dna_offset = dna_offset
+
+
+def _block_ends(starts, sizes):
+    return array('Q', (s + z for s, z in zip(starts, sizes)))
+
+def _overlapping_blocks(starts, ends, start, end):
+    "generator of (start, end) of sorted blocks overlapping range"
+    for i in range(bisect_right(ends, start), len(starts)):
+        if starts[i] >= end:
+            break
+        yield max(starts[i], start), min(ends[i], end)
+
+
+class TwoBitReader:
+    """Random access to a two-bit file.  Sequences are returned as strings,
+    with masked regions in lower case unless mask is False."""
+    def __init__(self, path):
+        self.path = os.fspath(path)
+        self._index = None
+        self._recs = {}
+        with open(self.path, "rb") as fh:
+            self._mm = mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            self._read_header()
+        except Exception:
+            self.close()
+            raise
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, typ, value, traceback):
+        self.close()
+
+    def close(self):
+        if self._mm is not None:
+            self._mm.close()
+            self._mm = None
+
+    def _read_header(self):
+        if len(self._mm) < 16:
+            raise TwoBitError(f"not a two-bit file, too short: {self.path}")
+        for bo in ("<", ">"):
+            if struct.unpack_from(bo + "I", self._mm, 0)[0] == TWOBIT_SIG:
+                self._byte_order = bo
+                break
+        else:
+            raise TwoBitError(f"not a two-bit file, invalid signature: {self.path}")
+        self._version, self._seq_count = struct.unpack_from(self._byte_order + "II", self._mm, 4)
+        if self._version not in (0, 1):
+            raise TwoBitError(f"unsupported two-bit file version {self._version}: {self.path}")
+
+    def _read_index(self):
+        off_fmt = self._byte_order + ("Q" if self._version == 1 else "I")
+        off_size = struct.calcsize(off_fmt)
+        index = {}
+        off = 16
+        for _ in range(self._seq_count):
+            name_size = self._mm[off]
+            name = self._mm[off + 1:off + 1 + name_size].decode()
+            off += 1 + name_size
+            index[name] = struct.unpack_from(off_fmt, self._mm, off)[0]
+            off += off_size
+        return index
+
+    def _read_array(self, off, count):
+        arr = array('I')
+        arr.frombytes(self._mm[off:off + 4 * count])
+        if (self._byte_order == "<") != (sys.byteorder == "little"):
+            arr.byteswap()
+        return array('Q', arr), off + 4 * count
+
+    def _read_blocks(self, off):
+        count = struct.unpack_from(self._byte_order + "I", self._mm, off)[0]
+        starts, off = self._read_array(off + 4, count)
+        sizes, off = self._read_array(off, count)
+        return starts, _block_ends(starts, sizes), off
+
+    def _get_rec(self, seq_id):
+        rec = self._recs.get(seq_id)
+        if rec is None:
+            off = self._get_index().get(seq_id)
+            if off is None:
+                raise TwoBitError(f"sequence not found in two-bit file: {seq_id}: {self.path}")
+            size = struct.unpack_from(self._byte_order + "I", self._mm, off)[0]
+            n_starts, n_ends, off = self._read_blocks(off + 4)
+            mask_starts, mask_ends, off = self._read_blocks(off)
+            rec = self._recs[seq_id] = _SeqRec(size, n_starts, n_ends, mask_starts, mask_ends, off + 4)
+        return rec
+
+    def _get_index(self):
+        if self._index is None:
+            self._index = self._read_index()
+        return self._index
+
+    def get_seq_ids(self):
+        "list of sequence ids, in the order in the file"
+        return list(self._get_index().keys())
+
+    def get_seq_length(self, seq_id):
+        "length of a sequence"
+        return self._get_rec(seq_id).size
+
+    def _unpack(self, rec, start, end):
+        "decode bases in range into a bytearray"
+        packed = self._mm[rec.dna_offset + (start // 4):rec.dna_offset + ((end + 3) // 4)]
+        dna = bytearray(4 * len(packed))
+        for i in range(4):
+            dna[i::4] = packed.translate(_unpack_tables[i])
+        off = start - 4 * (start // 4)
+        return dna[off:off + (end - start)]
+
+    def get_seq(self, seq_id, start=None, end=None, *, mask=True):
+        """get a sequence or region of a sequence.  If mask is True, masked
+        regions are returned in lower case."""
+        rec = self._get_rec(seq_id)
+        if start is None:
+            start = 0
+        if end is None:
+            end = rec.size
+        if not (0 <= start <= end <= rec.size):
+            raise TwoBitError(f"invalid range {seq_id}:{start}-{end}, sequence length is {rec.size}: {self.path}")
+        dna = self._unpack(rec, start, end)
+        for s, e in _overlapping_blocks(rec.n_starts, rec.n_ends, start, end):
+            dna[s - start:e - start] = b"N" * (e - s)
+        if mask:
+            for s, e in _overlapping_blocks(rec.mask_starts, rec.mask_ends, start, end):
+                dna[s - start:e - start] = dna[s - start:e - start].lower()
+        return dna.decode("ascii")
+
+
+_pack_codes = {b: i for i, b in enumerate(_BASES)}
+_pack_table = {bytes(quad): ((_pack_codes[quad[0]] << 6) | (_pack_codes[quad[1]] << 4) | (_pack_codes[quad[2]] << 2) | _pack_codes[quad[3]])
+               for quad in ((a, b, c, d) for a in _BASES for b in _BASES for c in _BASES for d in _BASES)}
+
+def _find_runs(regexp, seq):
+    starts = array('I')
+    sizes = array('I')
+    for m in re.finditer(regexp, seq):
+        starts.append(m.start())
+        sizes.append(m.end() - m.start())
+    return starts, sizes
+
+def _pack_seq(seq):
+    # bases that are not TCAG, including N, are stored as T, as with faToTwoBit
+    bases = re.sub("[^TCAG]", "T", seq.upper()).encode("ascii")
+    bases += b"T" * (-len(bases) % 4)
+    return bytes(_pack_table[bases[i:i + 4]] for i in range(0, len(bases), 4))
+
+def _seq_rec_bytes(seq):
+    n_starts, n_sizes = _find_runs("[Nn]+", seq)
+    mask_starts, mask_sizes = _find_runs("[a-z]+", seq)
+    return b"".join([struct.pack("=II", len(seq), len(n_starts)), n_starts.tobytes(), n_sizes.tobytes(),
+                     struct.pack("=I", len(mask_starts)), mask_starts.tobytes(), mask_sizes.tobytes(),
+                     struct.pack("=I", 0), _pack_seq(seq)])
+
+def write_two_bit(path, seqs):
+    """write a two-bit file from an iterable of (seq_id, seq), with lower case
+    bases stored as masked.  The file is in native byte order."""
+    recs = [(seq_id.encode(), _seq_rec_bytes(seq)) for seq_id, seq in seqs]
+    index_size = sum(1 + len(name) + 4 for name, _ in recs)
+    offset = 16 + index_size
+    version = 0 if offset + sum(len(rec) for _, rec in recs) < 2 ** 32 else 1
+    off_fmt = "=Q" if version == 1 else "=I"
+    if version == 1:
+        offset += 4 * len(recs)
+    with open(os.fspath(path), "wb") as fh:
+        fh.write(struct.pack("=IIII", TWOBIT_SIG, version, len(recs), 0))
+        for name, rec in recs:
+            fh.write(struct.pack("=B", len(name)) + name + struct.pack(off_fmt, offset))
+            offset += len(rec)
+        for _, rec in recs:
+            fh.write(rec)
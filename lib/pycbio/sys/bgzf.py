@@ -0,0 +1,197 @@
+# Copyright 2006-2026 Mark Diekhans
+"""
+Support for BGZF (blocked gzip) files, as produced by bgzip.  A BGZF file is
+a series of gzip members, each containing at most 64kb of data, with the
+compressed size of the member stored in a gzip extra field.  This allows
+blocks to be found without decompressing them.  A position in the file is
+given by a virtual offset, which is the file offset of the block shifted
+left 16 bits, or-ed with the offset in the uncompressed data of the block.
+"""
+import os
+import struct
+import zlib
+from pycbio import PycbioDataError
+
+# header of a block with the BC extra field, up to BSIZE.
+_HEADER_SIZE = 18
+_MAX_BLOCK_DATA = 0xff00  # as used by bgzip
+
+# EOF marker block
+EOF_BLOCK = bytes.fromhex("1f8b08040000000000ff0600424302001b0003000000000000000000")
+
+
+class BgzfError(PycbioDataError):
+    "error in BGZF file format"
+    pass
+
+
+def _isBgzfHeader(header):
+    return ((len(header) >= _HEADER_SIZE) and (header[0:4] == b"\x1f\x8b\x08\x04")
+            and (header[12:14] == b"BC") and (header[14:16] == b"\x02\x00"))
+
+def isBgzf(path):
+    "check if a file is in BGZF format by checking the first block header"
+    with open(path, "rb") as fh:
+        return _isBgzfHeader(fh.read(_HEADER_SIZE))
+
+def readBlock(fh):
+    """read the next compressed block from a file open in binary mode,
+    return None on EOF"""
+    header = fh.read(_HEADER_SIZE)
+    if len(header) == 0:
+        return None
+    if not _isBgzfHeader(header):
+        raise BgzfError(f"invalid BGZF block header in {getattr(fh, 'name', fh)}")
+    blockSize = struct.unpack_from("<H", header, 16)[0] + 1
+    rest = fh.read(blockSize - _HEADER_SIZE)
+    if len(rest) != blockSize - _HEADER_SIZE:
+        raise BgzfError(f"truncated BGZF block in {getattr(fh, 'name', fh)}")
+    return header + rest
+
+def readBlockGroups(fh, groupSize):
+    """generator of bytes containing consecutive compressed blocks, with
+    approximately groupSize bytes of compressed data in each"""
+    group = []
+    size = 0
+    while True:
+        block = readBlock(fh)
+        if block is None:
+            break
+        group.append(block)
+        size += len(block)
+        if size >= groupSize:
+            yield b"".join(group)
+            group = []
+            size = 0
+    if len(group) > 0:
+        yield b"".join(group)
+
+def decompressBlocks(data):
+    "decompress bytes containing one or more complete blocks"
+    data = memoryview(data)
+    parts = []
+    off = 0
+    while off < len(data):
+        blockSize = struct.unpack_from("<H", data, off + 16)[0] + 1
+        parts.append(zlib.decompress(data[off + _HEADER_SIZE:off + blockSize - 8], -15))
+        off += blockSize
+    return b"".join(parts)
+
+def compressBlock(data, level=6):
+    "compress up to 64kb of data into a BGZF block"
+    if len(data) > _MAX_BLOCK_DATA:
+        raise ValueError(f"data too large for a BGZF block: {len(data)}")
+    compressor = zlib.compressobj(level, zlib.DEFLATED, -15)
+    cdata = compressor.compress(data) + compressor.flush()
+    header = struct.pack("<4BI2BH2BHH", 0x1f, 0x8b, 8, 4, 0, 0, 0xff, 6, ord('B'), ord('C'), 2,
+                         _HEADER_SIZE + len(cdata) + 8 - 1)
+    return header + cdata + struct.pack("<II", zlib.crc32(data), len(data))
+
+def compress(data, level=6):
+    "compress bytes into BGZF format, including EOF block"
+    return b"".join([compressBlock(data[i:i + _MAX_BLOCK_DATA], level)
+                     for i in range(0, len(data), _MAX_BLOCK_DATA)] + [EOF_BLOCK])
+
+def writeFile(path, data, level=6):
+    "write bytes to a BGZF file"
+    with open(os.fspath(path), "wb") as fh:
+        fh.write(compress(data, level))
+
+def makeVirtualOffset(blockOffset, dataOffset):
+    """create a virtual offset from the file offset of a block and the offset
+    in the uncompressed data of that block"""
+    return (blockOffset << 16) | dataOffset
+
+def splitVirtualOffset(virtualOffset):
+    "split a virtual offset into the block file offset and uncompressed data offset"
+    return virtualOffset >> 16, virtualOffset & 0xffff
+
+
+class BgzfReader:
+    """Binary reader for a BGZF file supporting random access with virtual
+    offsets, as used by BAM and tabix indexes.  The tell() method returns the
+    virtual offset of the current position and seek() positions to a
+    virtual offset.  Reading is done in bytes, iterating over the object
+    returns lines."""
+    def __init__(self, path):
+        self.path = os.fspath(path)
+        self._fh = open(self.path, "rb")
+        self._blockOffset = 0
+        self._nextBlockOffset = 0
+        self._data = b""
+        self._pos = 0
+        self._loadBlock(0)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, typ, value, traceback):
+        self.close()
+
+    def close(self):
+        if self._fh is not None:
+            self._fh.close()
+            self._fh = None
+
+    def _loadBlock(self, blockOffset):
+        self._fh.seek(blockOffset)
+        block = readBlock(self._fh)
+        self._blockOffset = blockOffset
+        if block is None:
+            self._data = b""
+            self._nextBlockOffset = blockOffset
+        else:
+            self._data = decompressBlocks(block)
+            self._nextBlockOffset = blockOffset + len(block)
+        self._pos = 0
+
+    def _fill(self):
+        "make sure there is data in the current block, return False on EOF"
+        while self._pos >= len(self._data):
+            if self._nextBlockOffset == self._blockOffset:
+                return False
+            self._loadBlock(self._nextBlockOffset)
+        return True
+
+    def tell(self):
+        "virtual offset of the current position"
+        return makeVirtualOffset(self._blockOffset, self._pos)
+
+    def seek(self, virtualOffset):
+        "position to a virtual offset, as returned by tell()"
+        blockOffset, dataOffset = splitVirtualOffset(virtualOffset)
+        if blockOffset != self._blockOffset:
+            self._loadBlock(blockOffset)
+        if dataOffset > len(self._data):
+            raise BgzfError(f"invalid virtual offset {virtualOffset}, data offset beyond end of block in {self.path}")
+        self._pos = dataOffset
+
+    def read(self, size=-1):
+        "read up to size bytes, or to EOF if size is negative"
+        parts = []
+        while (size != 0) and self._fill():
+            end = len(self._data) if size < 0 else min(len(self._data), self._pos + size)
+            parts.append(self._data[self._pos:end])
+            if size > 0:
+                size -= end - self._pos
+            self._pos = end
+        return b"".join(parts)
+
+    def readline(self):
+        "read a line, including the newline, returning an empty bytes on EOF"
+        parts = []
+        while self._fill():
+            iNl = self._data.find(b"\n", self._pos)
+            end = len(self._data) if iNl < 0 else iNl + 1
+            parts.append(self._data[self._pos:end])
+            self._pos = end
+            if iNl >= 0:
+                break
+        return b"".join(parts)
+
+    def __iter__(self):
+        while True:
+            line = self.readline()
+            if len(line) == 0:
+                break
+            yield line
@@ -0,0 +1,115 @@
+# Copyright 2006-2026 Mark Diekhans
+"""
+External merge sort of records that don't fit in memory.  Records are read
+in batches that are sorted in memory and written as runs to compressed
+temporary files, as tab-separated rows.  The runs are then merged with a
+k-way heap merge.  Records are converted to and from rows with serializer
+functions, such as Bed.toRow and Bed.parse or Psl.toRow and Psl.fromRow.
+"""
+import gzip
+import heapq
+from os import path as osp
+from pycbio import PycbioException
+from pycbio.sys import fileOps
+
+DEFAULT_MAX_RECORDS = 1000000
+DEFAULT_MAX_MERGE = 64
+
+
+def _writeRun(records, toRow, runFile, compressLevel):
+    "write records to a run file"
+    with gzip.open(runFile, "wt", compresslevel=compressLevel) as fh:
+        for rec in records:
+            fh.write('\t'.join([str(c) for c in toRow(rec)]))
+            fh.write('\n')
+
+def _readRun(runFile, fromRow):
+    "generator over records in a run file"
+    with gzip.open(runFile, "rt") as fh:
+        for line in fh:
+            yield fromRow(line[0:-1].split('\t'))
+
+
+class _RunSet:
+    "set of run files in a temporary directory, which is created on first use"
+    def __init__(self, toRow, fromRow, key, tmpDir, compressLevel):
+        self.toRow = toRow
+        self.fromRow = fromRow
+        self.key = key
+        self.tmpDir = tmpDir
+        self.compressLevel = compressLevel
+        self.runDir = None
+        self.runCount = 0
+
+    def _newRunFile(self):
+        if self.runDir is None:
+            self.runDir = fileOps.tmpDirGet(prefix="externalSort.", tmpDir=self.tmpDir)
+        self.runCount += 1
+        return osp.join(self.runDir, f"run{self.runCount}.tsv.gz")
+
+    def write(self, records):
+        "write a sorted run, returning file name"
+        runFile = self._newRunFile()
+        _writeRun(records, self.toRow, runFile, self.compressLevel)
+        return runFile
+
+    def merge(self, runFiles):
+        "generator over records merged from run files"
+        return heapq.merge(*[_readRun(rf, self.fromRow) for rf in runFiles], key=self.key)
+
+    def mergeRuns(self, runFiles):
+        "merge run files into a new run file, removing the merged files"
+        runFile = self.write(self.merge(runFiles))
+        fileOps.rmFiles(*runFiles)
+        return runFile
+
+    def remove(self):
+        if self.runDir is not None:
+            fileOps.rmTree(self.runDir)
+
+
+def _sortedRuns(runSet, records, maxRecords, maxMerge):
+    """sort records into runs, merging runs when there are maxMerge of them,
+    returning (runFiles, batch), where batch is the last batch of sorted
+    records, which is not written if there are no run files."""
+    runFiles = []
+    batch = []
+    for rec in records:
+        batch.append(rec)
+        if len(batch) >= maxRecords:
+            batch.sort(key=runSet.key)
+            runFiles.append(runSet.write(batch))
+            batch = []
+            if len(runFiles) >= maxMerge:
+                runFiles = [runSet.mergeRuns(runFiles)]
+    batch.sort(key=runSet.key)
+    return runFiles, batch
+
+def externalSort(records, key, toRow, fromRow, *, maxRecords=DEFAULT_MAX_RECORDS,
+                 maxMerge=DEFAULT_MAX_MERGE, tmpDir=None, compressLevel=1):
+    """Generator over records from the iterable records, sorted by the key
+    function.  The sort is stable.  At most maxRecords records are held in
+    memory for sorting; larger inputs are sorted in batches which are
+    serialized with toRow to temporary files in tmpDir and read back with
+    fromRow.  The toRow function returns a list of columns, which are
+    converted to strings and must not contain tabs or newlines, and fromRow
+    is passed a list of string columns.  At most maxMerge run files are
+    merged at once, with runs merged into a larger run as needed.
+    Temporary files are removed when the generator completes or is
+    closed."""
+    if maxRecords < 1:
+        raise PycbioException(f"externalSort maxRecords must be at least 1, got {maxRecords}")
+    if maxMerge < 2:
+        raise PycbioException(f"externalSort maxMerge must be at least 2, got {maxMerge}")
+    runSet = _RunSet(toRow, fromRow, key, tmpDir, compressLevel)
+    try:
+        runFiles, batch = _sortedRuns(runSet, records, maxRecords, maxMerge)
+        if len(runFiles) == 0:
+            yield from batch
+        else:
+            if len(batch) > 0:
+                runFiles.append(runSet.write(batch))
+            del batch
+            yield from runSet.merge(runFiles)
+    finally:
+        runSet.remove()
@@ -9,10 +9,16 @@ import re
 import glob
 import socket
 import tempfile
+import gzip
+import bz2
 import pipettor
 from shutil import which
 from contextlib import contextmanager
 from pycbio import PycbioException
+try:
+    from isal import igzip   # faster gzip, if available
+except ModuleNotFoundError:
+    igzip = None
 
 # FIXME: normalize file line read routines to all take fh or name, remove redundant code.
 
@@ -188,13 +194,38 @@ def decompressCmd(path):
         return ["cat"]
 
 
-def opengz(fileName, mode="r", *, buffering=-1, encoding=None, errors=None, bgzip=False):
+# compressed files smaller than this are decompressed in-process by opengz
+OPENGZ_IN_PROCESS_MAX = 32 * 1024 * 1024
+
+def _openInProcess(fileName, mode, encoding, errors):
+    "open a gzip or bzip2 file for reading with the Python modules"
+    if "b" not in mode:
+        mode = mode + "t"
+    if fileName.endswith(".bz2"):
+        return bz2.open(fileName, mode, encoding=encoding, errors=errors)
+    elif igzip is not None:
+        return igzip.open(fileName, mode, encoding=encoding, errors=errors)
+    else:
+        return gzip.open(fileName, mode, encoding=encoding, errors=errors)
+
+def _useInProcess(fileName, inProcessMax):
+    if fileName.endswith(".Z"):
+        return False  # not supported by Python
+    return (inProcessMax is None) or (osp.getsize(fileName) < inProcessMax)
+
+def opengz(fileName, mode="r", *, buffering=-1, encoding=None, errors=None, bgzip=False,
+           inProcessMax=OPENGZ_IN_PROCESS_MAX):
     """open a file, if it ends in an extension indicating compression, open
     with a compression or decompression pipe.  If bgzip is specified for write,
-    it is used to writing"""
+    it is used to writing.  When reading, compressed files smaller than
+    inProcessMax bytes are decompressed in this process, avoiding the cost of
+    starting a decompression process; this is better for many small files.
+    Set inProcessMax to 0 to always use a pipe, or None to never use one."""
     fileName = os.fspath(fileName)
     if not isCompressed(fileName):
         return open(fileName, mode, buffering=buffering, encoding=encoding, errors=errors)
+    elif mode.startswith("r") and _useInProcess(fileName, inProcessMax):
+        return _openInProcess(fileName, mode, encoding, errors)
     elif mode.startswith("r"):
         cmd = decompressCmd(fileName)
         return pipettor.Popen(cmd + [fileName], mode=mode, buffering=buffering, encoding=encoding, errors=errors)
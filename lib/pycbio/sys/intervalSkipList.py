@@ -8,8 +8,22 @@ tr92-016, June 1992
 ftp://ftp.cis.ufl.edu/pub/tech-reports/tr92/tr92-016.ps.Z
 see also
 http://www-pub.cise.ufl.edu/~hanson/IS-lists/
+
+Intervals are specified as half-open, zero-based ranges, as used for genomic
+coordinates, and are stored internally as closed ranges [start, end-1], as in
+the paper.  There is a node in the list for each distinct endpoint.  Each
+interval places markers on a path of edges from its start node to its end
+node, using the highest level edges contained in the interval.  A node's
+eqMarkers holds the intervals with a marker on an edge touching the node.
+
+When a node is inserted or deleted, the intervals with markers on the edges
+that are split or joined have their markers removed and placed again on the
+highest level edges of the new list.  This has the same result as the marker
+promotion and demotion described in the paper, keeping the expected number
+of markers for an interval at O(log n).
 """
 
+import random
 from collections import namedtuple
 
 
@@ -18,6 +32,24 @@ class Entry(namedtuple("Entry", ("start", "end", "val"))):
     __slots__ = ()
 
 
+class _Interval:
+    """Internal record of an inserted entry.  Identity is by object, so
+    identical entries can be inserted multiple times.  Coordinates are
+    closed.  Edges is a set of (node, level) edges with markers for this
+    interval and eqNodes are the nodes with this interval in eqMarkers."""
+    __slots__ = ("entry", "left", "right", "leftNode", "rightNode", "edges", "eqNodes")
+
+    def __init__(self, entry):
+        if entry.start >= entry.end:
+            raise ValueError(f"IntervalSkipList entry must have start < end: {entry}")
+        self.entry = entry
+        self.left = entry.start
+        self.right = entry.end - 1
+        self.leftNode = self.rightNode = None
+        self.edges = set()
+        self.eqNodes = set()
+
+
 class Node:
     """a node in the skip list.
 
@@ -29,82 +61,208 @@ class Node:
         eqMarkers - a set of markers for intervals that have a a marker on an
                     edge that ends on this node,
     """
-    def __init__(self, pos):
+    __slots__ = ("pos", "forward", "markers", "owners", "eqMarkers")
+
+    def __init__(self, pos, level):
         self.pos = pos
-        self.forward = []
-        self.markers = []
+        self.forward = level * [None]
+        self.markers = [set() for _ in range(level)]
         self.owners = set()
         self.eqMarkers = set()
 
 
 class IntervalSkipList:
-    "skip list object addressed by interval"
-    def __init__(self, maxLevel):
+    """skip list object addressed by interval.  This is a dynamic index,
+    supporting interleaved insertion, removal and queries.  Queries take
+    expected O(log n) time, plus the number of intervals returned.  Insertion
+    and removal take expected O(log n) time, plus expected O(log n) time for
+    each interval with markers on an edge that is split or joined.
+
+    maxLevel should be about log2 of the maximum number of endpoints expected.
+    """
+    def __init__(self, maxLevel=24, *, seed=None):
         self.maxLevel = maxLevel
-        self.head = Node(None)
+        self.head = Node(None, maxLevel)
+        self.level = 1  # highest level currently in use
+        self._rand = random.Random(seed)
+        self._intervals = {}  # Entry to list of _Interval objects
+        self._count = 0
+
+    def __len__(self):
+        return self._count
+
+    def randomLevel(self):
+        "choose a level for a new node, with a probability of 1/2 for each level"
+        level = 1
+        while (level < self.maxLevel) and (self._rand.random() < 0.5):
+            level += 1
+        return level
+
+    def _search(self, searchKey):
+        """find the last node before searchKey at each level, returning the
+        update vector"""
+        update = self.maxLevel * [self.head]
+        x = self.head
+        for i in range(self.level - 1, -1, -1):
+            while (x.forward[i] is not None) and (x.forward[i].pos < searchKey):
+                x = x.forward[i]
+            update[i] = x
+        return update
+
+    def _placeMarkersBetween(self, ival, x, endPos):
+        """place markers for an interval on the highest level edges on the
+        path from node x to the node at endPos"""
+        x.eqMarkers.add(ival)
+        ival.eqNodes.add(x)
+        while x.pos != endPos:
+            i = len(x.forward) - 1
+            while (x.forward[i] is None) or (x.forward[i].pos > endPos):
+                i -= 1
+            x.markers[i].add(ival)
+            ival.edges.add((x, i))
+            x = x.forward[i]
+            x.eqMarkers.add(ival)
+            ival.eqNodes.add(x)
+
+    def _placeMarkers(self, ival):
+        "place markers for an interval from its start node to its end node"
+        self._placeMarkersBetween(ival, ival.leftNode, ival.right)
+
+    def _removeMarkers(self, ival):
+        for node, i in ival.edges:
+            node.markers[i].discard(ival)
+        for node in ival.eqNodes:
+            node.eqMarkers.discard(ival)
+        ival.edges.clear()
+        ival.eqNodes.clear()
 
     def _insert(self, key):
-        pass
+        "get the node for key, inserting it if it doesn't exist"
+        update = self._search(key)
+        x = update[0].forward[0]
+        if (x is not None) and (x.pos == key):
+            return x
+        level = self.randomLevel()
+        self.level = max(self.level, level)
+        x = Node(key, level)
+        self._adjustMarkersOnInsert(x, update)
+        return x
+
+    def _replaceMarkers(self, ivals):
+        "move markers for intervals to the highest level edges"
+        for ival in ivals:
+            self._removeMarkers(ival)
+            self._placeMarkers(ival)
 
     def _adjustMarkersOnInsert(self, x, update):
-        pass
+        """link in new node x; intervals marked on the split edges are the
+        only ones whose paths change"""
+        affected = set()
+        for i in range(len(x.forward)):
+            affected |= update[i].markers[i]
+            x.forward[i] = update[i].forward[i]
+            update[i].forward[i] = x
+        self._replaceMarkers(affected)
+
+    def _remove(self, x, update):
+        "remove a node that is no longer an endpoint of any interval"
+        self._adjustMarkersOnDelete(x, update)
+        while (self.level > 1) and (self.head.forward[self.level - 1] is None):
+            self.level -= 1
 
     def _adjustMarkersOnDelete(self, x, update):
-        pass
+        """unlink node x; intervals with paths through x are the only ones
+        whose paths change"""
+        affected = set(x.eqMarkers)
+        for ival in affected:
+            self._removeMarkers(ival)
+        for i in range(len(x.forward)):
+            update[i].forward[i] = x.forward[i]
+        for ival in affected:
+            self._placeMarkers(ival)
 
-    def remove(self, I):
-        pass
+    def _removeNodeIfUnowned(self, x):
+        if len(x.owners) == 0:
+            self._remove(x, self._search(x.pos))
 
-    def _remove(self, x, update):
-        pass
+    def insert(self, I):
+        "insert an Entry object"
+        ival = _Interval(I)
+        ival.leftNode = self._insert(ival.left)
+        ival.rightNode = self._insert(ival.right)
+        ival.leftNode.owners.add(ival)
+        ival.rightNode.owners.add(ival)
+        self._placeMarkers(ival)
+        self._intervals.setdefault(I, []).append(ival)
+        self._count += 1
 
-    def _search(self, searchKey, update):
-        pass
+    def add(self, start, end, val):
+        "add an interval and value, returning the Entry object"
+        entry = Entry(start, end, val)
+        self.insert(entry)
+        return entry
+
+    def remove(self, I):
+        "remove an Entry object, ValueError if it is not in the list"
+        ivals = self._intervals.get(I)
+        if ivals is None:
+            raise ValueError(f"entry to remove not found: {I}")
+        ival = ivals.pop()
+        if len(ivals) == 0:
+            del self._intervals[I]
+        self._count -= 1
+        self._removeMarkers(ival)
+        ival.leftNode.owners.discard(ival)
+        ival.rightNode.owners.discard(ival)
+        self._removeNodeIfUnowned(ival.leftNode)
+        if ival.rightNode is not ival.leftNode:
+            self._removeNodeIfUnowned(ival.rightNode)
 
     def _findIntervals(self, start):
-        "return list of intervals overlapping v"
+        """find intervals containing the closed coordinate start, returns
+        the set of intervals and the first node with pos >= start"""
         x = self.head
-        vals = set()
+        ivals = set()
         # Step down to bottom level
-        for i in range(self.maxLevel - 1, -1, -1):
+        for i in range(self.level - 1, -1, -1):
             # Search forward on current level as far as possible.
-            while (x.forward[i] is not None) and (x.forward[i].start < start):
+            while (x.forward[i] is not None) and (x.forward[i].pos < start):
                 x = x.forward[i]
-
             # Pick up interval markers on edge when dropping down a level.
-            vals.add(x.markers[i])
-
-        # Scan forward on bottom level to find location where search key will
-        # lie.
-        while (x.forward[0] is not None) and (x.forward[0].start < start):
-            x = x.forward[0]
-
-        # If K is not in list, pick up interval markers on edge, otherwise
-        # pick up markers on node with value = K.
-        if (x.forward[0] is None) or (x.forward[0].start != start):
-            vals |= x.markers[0]
-        else:
-            vals |= x.forward[0].eqMarkers
-
-        return vals
-
-    def insert(self, I):
-        pass
+            ivals |= x.markers[i]
 
-    def _placeMarkers(self, left, right, I):
-        pass
+        # If start is in list, pick up markers on node with that position.
+        x = x.forward[0]
+        if (x is not None) and (x.pos == start):
+            ivals |= x.eqMarkers
+        return ivals, x
 
-    def _removeMarkers(self, left, I):
-        pass
+    def stabbing(self, pos):
+        "return list of Entry objects containing the position pos"
+        ivals, x = self._findIntervals(pos)
+        return [ival.entry for ival in ivals]
 
-    def _removeMarkFromLevel(self, m, i, l, r):
-        pass
-
-    def normalizedRandom(self):
-        pass
+    def overlapping(self, start, end):
+        """return list of Entry objects overlapping the half-open range
+        start to end"""
+        if start >= end:
+            return []
+        ivals, x = self._findIntervals(start)
+        # add intervals starting after start and before end
+        if (x is not None) and (x.pos == start):
+            x = x.forward[0]
+        while (x is not None) and (x.pos < end):
+            for ival in x.owners:
+                if ival.left == x.pos:
+                    ivals.add(ival)
+            x = x.forward[0]
+        return [ival.entry for ival in ivals]
 
-    def randomLevel(self):
-        pass
+    def entries(self):
+        "generator over all Entry objects"
+        for entry, ivals in self._intervals.items():
+            for _ in ivals:
+                yield entry
 
 
 __all__ = (Entry.__name__, IntervalSkipList.__name__)
@@ -0,0 +1,143 @@
+# Copyright 2006-2026 Mark Diekhans
+"""
+Cache of the results of parsing files, saved as pickles in a cache directory.
+Entries are keyed on the absolute path, modification time and size of the
+parsed file, so a changed file is transparently re-parsed.  Parsers may
+supply functions to encode results in a compact form, such as columns of
+arrays, which loads much faster than pickled objects.  Least recently used
+entries are removed when the cache grows beyond a maximum size.
+"""
+import os
+import os.path as osp
+import gc
+import pickle
+import hashlib
+from contextlib import contextmanager
+from pycbio.sys import fileOps
+
+# increment when the format of cached data changes
+CACHE_VERSION = 3
+
+DEFAULT_MAX_SIZE = 4 * 1024 * 1024 * 1024
+
+_ENTRY_EXT = ".pcache"
+
+_MISSING = object()
+
+
+def defaultCacheDir():
+    """Get the default cache directory.  This is the PYCBIO_CACHE_DIR
+    environment variable if set, otherwise pycbio/parse in XDG_CACHE_HOME,
+    or ~/.cache"""
+    cacheDir = os.environ.get("PYCBIO_CACHE_DIR")
+    if cacheDir:
+        return cacheDir
+    cacheHome = os.environ.get("XDG_CACHE_HOME") or osp.expanduser("~/.cache")
+    return osp.join(cacheHome, "pycbio", "parse")
+
+@contextmanager
+def gcDisabled():
+    """Context manager that disables the cyclic garbage collector, which
+    greatly speeds up creating large numbers of container objects."""
+    enabled = gc.isenabled()
+    gc.disable()
+    try:
+        yield
+    finally:
+        if enabled:
+            gc.enable()
+
+def _isEntryName(name):
+    return name.endswith(_ENTRY_EXT) and (".tmp." not in name)
+
+
+class ParseCache:
+    """Cache of parsed files in cacheDir, which defaults to
+    defaultCacheDir().  The cache is pruned to maxSize bytes after each
+    entry is added.  Safe for use by concurrent processes."""
+    def __init__(self, cacheDir=None, *, maxSize=DEFAULT_MAX_SIZE):
+        self.cacheDir = cacheDir if cacheDir is not None else defaultCacheDir()
+        self.maxSize = maxSize
+
+    def _entryPath(self, path, kind):
+        st = os.stat(path)
+        key = f"{CACHE_VERSION}\t{kind}\t{osp.abspath(path)}\t{st.st_mtime_ns}\t{st.st_size}"
+        return osp.join(self.cacheDir, hashlib.sha256(key.encode()).hexdigest() + _ENTRY_EXT)
+
+    def _read(self, entryPath):
+        "read an entry, returning _MISSING if not cached or not readable"
+        try:
+            with open(entryPath, "rb") as fh:
+                with gcDisabled():
+                    data = pickle.load(fh)
+        except FileNotFoundError:
+            return _MISSING
+        except Exception:
+            # truncated or incompatible, parse again
+            fileOps.unlinkIfExists(entryPath)
+            return _MISSING
+        try:
+            os.utime(entryPath)  # mark as recently used
+        except FileNotFoundError:
+            pass
+        return data
+
+    def _write(self, entryPath, data):
+        with fileOps.AtomicFileCreate(entryPath) as tmpPath:
+            with open(tmpPath, "wb") as fh:
+                pickle.dump(data, fh, protocol=pickle.HIGHEST_PROTOCOL)
+
+    def load(self, path, parseFunc, *, kind, encode=None, decode=None):
+        """Get the result of parsing the file path, from the cache if the file
+        has not changed, otherwise by calling parseFunc(path) and saving the
+        result in the cache.  Kind is a string identifying the parser and any
+        options that change the result.  If specified, encode(result) converts
+        the parse result to the data to save and decode(data) converts it
+        back."""
+        entryPath = self._entryPath(path, kind)
+        data = self._read(entryPath)
+        if data is _MISSING:
+            result = parseFunc(path)
+            self._write(entryPath, encode(result) if encode is not None else result)
+            self.prune()
+            return result
+        elif decode is not None:
+            with gcDisabled():
+                return decode(data)
+        else:
+            return data
+
+    def _entries(self):
+        "list of (mtime, size, path) of entries"
+        entries = []
+        try:
+            dirEntries = list(os.scandir(self.cacheDir))
+        except FileNotFoundError:
+            return entries
+        for de in dirEntries:
+            if _isEntryName(de.name):
+                try:
+                    st = de.stat()
+                except FileNotFoundError:
+                    continue
+                entries.append((st.st_mtime_ns, st.st_size, de.path))
+        return entries
+
+    def size(self):
+        "total size of entries in the cache"
+        return sum(e[1] for e in self._entries())
+
+    def prune(self):
+        "remove least recently used entries until the cache is no larger than maxSize"
+        entries = sorted(self._entries())
+        total = sum(e[1] for e in entries)
+        for _, size, path in entries:
+            if total <= self.maxSize:
+                break
+            fileOps.unlinkIfExists(path)
+            total -= size
+
+    def clear(self):
+        "remove all entries from the cache"
+        for _, _, path in self._entries():
+            fileOps.unlinkIfExists(path)
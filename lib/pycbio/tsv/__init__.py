@@ -12,14 +12,14 @@ class TsvError(PycbioException):
         super(TsvError, self).__init__(msg)
 
 
-from pycbio.tsv.tsvRow import TsvRow, tsvRowToDict, tsvRowGetColumnSpecs, tsvRowGetColumns
-from pycbio.tsv.tsvReader import TsvReader, strOrNoneType, intOrNoneType, floatOrNoneType, printf_basic_dialect
+from pycbio.tsv.tsvRow import TsvRow, tsvRowToDict, tsvRowGetColumnSpecs, tsvRowGetColumns, tsvSlotRowClass
+from pycbio.tsv.tsvReader import TsvReader, tsvLoadColumns, strOrNoneType, intOrNoneType, floatOrNoneType, printf_basic_dialect
 from pycbio.tsv.tsvWriter import TsvWriter
 from pycbio.tsv.tabFile import TabFile
-from pycbio.tsv.tabFile import TabFileReader
+from pycbio.tsv.tabFile import TabFileReader, TabFileParallelReader
 
-__all__ = (TsvError.__name__, TsvRow.__name__, TsvReader.__name__, TsvWriter.__name__,
+__all__ = (TsvError.__name__, TsvRow.__name__, TsvReader.__name__, tsvLoadColumns.__name__, TsvWriter.__name__,
            "strOrNoneType", "intOrNoneType", "floatOrNoneType",
-           TabFile.__name__, TabFileReader.__name__,
-           tsvRowToDict.__name__, tsvRowGetColumnSpecs.__name__, tsvRowGetColumns.__name__,
+           TabFile.__name__, TabFileReader.__name__, TabFileParallelReader.__name__,
+           tsvRowToDict.__name__, tsvRowGetColumnSpecs.__name__, tsvRowGetColumns.__name__, tsvSlotRowClass.__name__,
            printf_basic_dialect.__name__)
@@ -3,20 +3,26 @@
 # FIXME: needed for faster readings, but needs cleaned up, need reader/writer
 # classes
 # FIXME add try and error msg with file/line num, move to row reader class; see fileOps.iterRows
-from pycbio.sys import fileOps
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+from pycbio.sys import fileOps, bgzf
 
 
 class TabFile(list):
     """Class for reading and hold tab-separated files.
     """
 
-    def __init__(self, fileName, rowClass=None, hashAreComments=False, skipBlankLines=False):
-        """Read tab file into the object
+    def __init__(self, fileName, rowClass=None, hashAreComments=False, skipBlankLines=False, *, rows=None):
+        """Read tab file into the object.  If rows is not None, it is an
+        iterable of already parsed rows of the file, which are used instead
+        of reading it, such as when loaded from a cache.
         """
         self.fileName = fileName
         self.rowClass = rowClass
-        for row in TabFileReader(self.fileName, rowClass=rowClass, hashAreComments=hashAreComments, skipBlankLines=skipBlankLines):
-            self.append(row)
+        if rows is None:
+            rows = TabFileReader(self.fileName, rowClass=rowClass, hashAreComments=hashAreComments, skipBlankLines=skipBlankLines)
+        self.extend(rows)
 
 
 def TabFileReader(fspec, rowClass=None, hashAreComments=False, skipBlankLines=False):
@@ -36,3 +42,104 @@ def TabFileReader(fspec, rowClass=None, hashAreComments=False, skipBlankLines=Fa
             row = processLine(line)
             if row is not None:
                 yield row
+
+
+def _parseLine(line, rowClass, hashAreComments, skipBlankLines):
+    "parse a line, without the newline, returning None if skipped"
+    if hashAreComments and line.startswith("#"):
+        return None
+    if skipBlankLines and (len(line) == 0):
+        return None
+    row = line.split('\t')
+    return rowClass(row) if rowClass is not None else row
+
+def _parseLines(lines, rowClass, hashAreComments, skipBlankLines):
+    rows = []
+    for line in lines:
+        row = _parseLine(line, rowClass, hashAreComments, skipBlankLines)
+        if row is not None:
+            rows.append(row)
+    return rows
+
+def _parseTextChunk(lines, rowClass, hashAreComments, skipBlankLines):
+    "worker function to parse a list of lines, with newlines"
+    return _parseLines((line[0:-1] if line.endswith('\n') else line for line in lines),
+                       rowClass, hashAreComments, skipBlankLines)
+
+def _parseBgzfChunk(data, rowClass, hashAreComments, skipBlankLines):
+    """Worker function to decompress and parse a group of BGZF blocks.  As
+    lines span blocks, returns the bytes before the first newline, the parsed
+    rows of the complete lines, and the bytes after the last newline.  These
+    are returned as bytes, as a multi-byte UTF-8 character may be split
+    between blocks.  If there is no newline, rows is None and the bytes are
+    all returned as the first element."""
+    data = bgzf.decompressBlocks(data)
+    iFirst = data.find(b'\n')
+    if iFirst < 0:
+        return data, None, b""
+    iLast = data.rfind(b'\n')
+    rows = _parseLines(data[iFirst + 1:iLast].decode().split('\n') if iLast > iFirst else (),
+                       rowClass, hashAreComments, skipBlankLines)
+    return data[0:iFirst], rows, data[iLast + 1:]
+
+def _textChunks(fspec, chunkSize):
+    with fileOps.FileAccessor(fspec) as fh:
+        while True:
+            lines = list(islice(fh, chunkSize))
+            if len(lines) == 0:
+                break
+            yield lines
+
+def _bgzfChunks(path, chunkSize):
+    # estimate of compressed size from number of lines
+    with open(path, "rb") as fh:
+        yield from bgzf.readBlockGroups(fh, 16 * chunkSize)
+
+def _orderedResults(executor, func, chunks, workers, *args):
+    "generator of results of func on chunks, in order, limiting the number queued"
+    pending = deque()
+    for chunk in chunks:
+        pending.append(executor.submit(func, chunk, *args))
+        if len(pending) > 2 * workers:
+            yield pending.popleft().result()
+    for future in pending:
+        yield future.result()
+
+def _textParallelRows(executor, fspec, workers, chunkSize, parseArgs):
+    for rows in _orderedResults(executor, _parseTextChunk, _textChunks(fspec, chunkSize), workers, *parseArgs):
+        yield from rows
+
+def _bgzfParallelRows(executor, path, workers, chunkSize, parseArgs):
+    "join lines spanning chunks, as bytes, which are decoded and parsed here"
+    partial = b""
+    for head, rows, tail in _orderedResults(executor, _parseBgzfChunk, _bgzfChunks(path, chunkSize), workers, *parseArgs):
+        if rows is None:
+            partial += head
+        else:
+            row = _parseLine((partial + head).decode(), *parseArgs)
+            if row is not None:
+                yield row
+            yield from rows
+            partial = tail
+    if len(partial) > 0:
+        row = _parseLine(partial.decode(), *parseArgs)
+        if row is not None:
+            yield row
+
+def TabFileParallelReader(fspec, rowClass=None, hashAreComments=False, skipBlankLines=False, *,
+                          workers=2, chunkSize=10000):
+    """Generator over tab file rows, as with TabFileReader, with the parsing
+    done in a pool of worker processes.  Rows are returned in file order.
+    Chunks of about chunkSize lines are read and passed to the workers.  A
+    BGZF file is split on block boundaries, with the blocks decompressed by
+    the workers.  Other compressed files are decompressed by a single
+    process.  The rowClass function and the objects it returns must be
+    picklable, so it can't be a lambda; functools.partial can be used to
+    pass arguments.  The rows are pickled to return them, so this is only
+    faster than TabFileReader when rowClass is expensive."""
+    parseArgs = (rowClass, hashAreComments, skipBlankLines)
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        if fileOps.isFilePath(fspec) and bgzf.isBgzf(fspec):
+            yield from _bgzfParallelRows(executor, fspec, workers, chunkSize, parseArgs)
+        else:
+            yield from _textParallelRows(executor, fspec, workers, chunkSize, parseArgs)
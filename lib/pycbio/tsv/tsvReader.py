@@ -2,8 +2,11 @@
 """TSV reading classes"""
 import sys
 import csv
+from array import array
+from itertools import islice
+from operator import itemgetter
 from pycbio.sys import fileOps
-from pycbio.tsv.tsvRow import TsvRow
+from pycbio.tsv.tsvRow import TsvRow, tsvSlotRowClass
 from pycbio.tsv import TsvError
 from pycbio.tsv.tsvColumns import columnsSpecBuild
 
@@ -49,13 +52,20 @@ class TsvReader:
     If the first character of the header is '#', the '#' and following spaces
     are ignored and not part of the first column name.
 
+    If fast is True and no rowClass is specified, rows are constructed with
+    a class generated from the header that stores columns in __slots__ (see
+    tsvSlotRowClass), which is much faster for wide files.  Unlike TsvRow,
+    these rows can't have attributes added that are not columns; setting one
+    raises AttributeError.  It falls back to TsvRow if a column name can't be
+    used as a slot.
+
     Can be used as a context manager.
     """
 
     def __init__(self, fileName, *, rowClass=None, typeMap=None, defaultColType=None,
                  columns=None, columnNameMapper=None, ignoreExtraCols=False,
                  inFh=None, allowEmpty=False, dialect=csv.excel_tab,
-                 encoding=None, errors=None):
+                 encoding=None, errors=None, fast=False):
         """
         Open TSV file and read header into object. Removes leading '#' from
         UCSC-style headers.
@@ -79,6 +89,8 @@ class TsvReader:
         :param encoding: Optional text encoding (e.g., 'utf-8').
         :param errors: Optional error handling strategy (e.g., 'strict',
             'replace', 'ignore').
+        :param fast: If True, use a generated row class with slots, which
+            doesn't allow adding attributes to rows.
         """
         self.fileName = fileName
         self.inFh = None
@@ -97,6 +109,9 @@ class TsvReader:
         if columns is None:
             columns = self._readHeader(allowEmpty)
         self.columnSpecs = columnsSpecBuild(columns, typeMap, defaultColType, columnNameMapper)
+        self._converters = self._getConverters()
+        if fast and (rowClass is None):
+            self.rowClass = tsvSlotRowClass(self.columns) or TsvRow
 
     @property
     def columns(self):
@@ -138,22 +153,33 @@ class TsvReader:
                 raise TsvError("empty TSV file", reader=self)
             return []
 
-    def _parseColumnWithTypeMap(self, row, iCol):
+    def _columnParser(self, iCol):
+        "parse function for a column, or None if it is not converted"
+        if self.columnSpecs.types is None:
+            return None
         ct = self.columnSpecs.types[iCol]
+        # can be None to have formatter but not parser
         cv = ct[0] if isinstance(ct, tuple) else ct
-        try:
-            # can be None to have formatter but not parser
+        return None if cv is str else cv
+
+    def _getConverters(self):
+        "list of (iCol, parseFunc) for the columns that need converting"
+        converters = []
+        for iCol in range(len(self.columns)):
+            cv = self._columnParser(iCol)
             if cv is not None:
-                row[iCol] = cv(row[iCol])
-        except Exception as ex:
-            raise TsvError(f"Error converting TSV column {iCol} ({self.columns[iCol]}) to object, value \"{row[iCol]}\"") from ex
+                converters.append((iCol, cv))
+        return tuple(converters)
 
     def _parseColumns(self, row):
         "converts columns in row in-place, if needed"
-        for iCol in range(len(self.columnSpecs.columns)):
-            self._parseColumnWithTypeMap(row, iCol)
+        try:
+            for iCol, cv in self._converters:
+                row[iCol] = cv(row[iCol])
+        except Exception as ex:
+            raise TsvError(f"Error converting TSV column {iCol} ({self.columns[iCol]}) to object, value \"{row[iCol]}\"") from ex
 
-    def _constructRow(self, row):
+    def _checkRowLength(self, row):
         if self.ignoreExtraCols:
             if len(row) < len(self.columns):
                 raise TsvError(f"row has {len(row)} columns, expected at least {len(self.columns)}", reader=self)
@@ -161,8 +187,10 @@ class TsvReader:
             if len(row) != len(self.columns):
                 raise TsvError(f"row has {len(row)} columns, expected exactly {len(self.columns)}", reader=self)
 
+    def _constructRow(self, row):
+        self._checkRowLength(row)
         try:
-            if self.columnSpecs.types is not None:
+            if len(self._converters) > 0:
                 self._parseColumns(row)
             return self.rowClass(self, row)
         except Exception as ex:
@@ -177,6 +205,89 @@ class TsvReader:
         finally:
             self.close()
 
+    def _selectColumns(self, select):
+        "column indexes for readColumns"
+        if select is None:
+            return list(range(len(self.columns)))
+        for col in select:
+            if col not in self.columnSpecs.columnMap:
+                raise TsvError(f"selected column not in TSV: {col}")
+        return [self.columnSpecs.columnMap[col] for col in select]
+
+    @staticmethod
+    def _newColumn(cv):
+        "int and float columns are stored in arrays, others in lists"
+        if cv is int:
+            return array('q')
+        elif cv is float:
+            return array('d')
+        else:
+            return []
+
+    def _readChunk(self, chunkSize):
+        chunk = []
+        for row in islice(self._reader, chunkSize):
+            self._checkRowLength(row)
+            chunk.append(row)
+        return chunk
+
+    @staticmethod
+    def _transposeChunk(chunk, iCols):
+        "get an iterable of the values of each column"
+        if len(iCols) == 1:
+            return (map(itemgetter(iCols[0]), chunk),)
+        if len(iCols) < len(chunk[0]):
+            chunk = map(itemgetter(*iCols), chunk)
+        return zip(*chunk)
+
+    def _badColumnValue(self, iCol, cv, chunk):
+        "find the value that can't be converted or stored in a column"
+        column = self._newColumn(cv)
+        for row in chunk:
+            try:
+                column.append(row[iCol] if cv is None else cv(row[iCol]))
+            except Exception:
+                return row[iCol]
+        return None
+
+    def _extendColumn(self, column, iCol, cv, values, chunk):
+        try:
+            column.extend(values if cv is None else map(cv, values))
+        except Exception as ex:
+            raise TsvError(f"Error converting TSV column {iCol} ({self.columns[iCol]}) to object, "
+                           f"value \"{self._badColumnValue(iCol, cv, chunk)}\"") from ex
+
+    def readColumns(self, select=None, *, chunkSize=200):
+        """Read the remaining rows into columns without creating row
+        objects, returning a dict of column name to column values.  Columns
+        with a type of int or float are stored in array.array objects of
+        64-bit values, others in lists.  If select is specified, it is a list
+        of the names of the columns to return, other columns are not
+        converted.  Rows are parsed in chunks of chunkSize.  The file is
+        closed."""
+        try:
+            iCols = self._selectColumns(select)
+            parsers = [self._columnParser(iCol) for iCol in iCols]
+            columns = [self._newColumn(cv) for cv in parsers]
+            while True:
+                chunk = self._readChunk(chunkSize)
+                if len(chunk) == 0:
+                    break
+                for column, iCol, cv, values in zip(columns, iCols, parsers, self._transposeChunk(chunk, iCols)):
+                    self._extendColumn(column, iCol, cv, values, chunk)
+            return {self.columns[iCol]: column for iCol, column in zip(iCols, columns)}
+        except Exception as ex:
+            raise TsvError("Error reading TSV columns", self) from ex
+        finally:
+            self.close()
+
     def formatRow(self, row):
         "format row to a list of strings given specified types"
         return self.columnSpecs.formatRow(row)
+
+
+def tsvLoadColumns(fileName, typeMap=None, *, select=None, **readerArgs):
+    """Load a TSV file into columns, returning a dict of column name to
+    column values, see TsvReader.readColumns().  Other keyword arguments are
+    passed to TsvReader."""
+    return TsvReader(fileName, typeMap=typeMap, **readerArgs).readColumns(select)
@@ -1,5 +1,6 @@
 # Copyright 2006-2026 Mark Diekhans
 """TSV row objects with column values accessible as attributes."""
+import keyword
 
 # FIXME: danger of dump, etc, methods conflicting with columns.  maybe
 # a better convention to avoid collisions or make these functions rather
@@ -8,16 +9,12 @@
 # FIXME: need way to get raw row with Nones for sql
 # FIXME: this could actually be a dict-like object since py3
 
-class TsvRow:
-    "Row of a TSV where columns are fields."
-    # n.b.: doesn't inherit from list, as this results in columns in two
-    # places when they are stored as fields
 
-    def __init__(self, reader, row):
-        # disconnect from reader to allow object to be pickled
-        self._columnSpecs_ = reader.columnSpecs
-        for i in range(len(self._columnSpecs_.columns)):
-            setattr(self, self._columnSpecs_.columns[i], row[i])
+class TsvRowBase:
+    """Methods for a row of a TSV where columns are fields.  Derived classes
+    store the columns as attributes, along with the ColumnSpecs as the
+    _columnSpecs_ attribute."""
+    __slots__ = ()
 
     def __getitem__(self, key):
         "access a column by string key or numeric index"
@@ -90,6 +87,68 @@ class TsvRow:
         fh.write("\n")
 
 
+class TsvRow(TsvRowBase):
+    "Row of a TSV where columns are fields."
+    # n.b.: doesn't inherit from list, as this results in columns in two
+    # places when they are stored as fields
+
+    def __init__(self, reader, row):
+        # disconnect from reader to allow object to be pickled
+        self._columnSpecs_ = reader.columnSpecs
+        for i in range(len(self._columnSpecs_.columns)):
+            setattr(self, self._columnSpecs_.columns[i], row[i])
+
+
+# generated methods to set all columns with one assignment, as namedtuple does
+_slotRowMethodsTmpl = """
+def __init__(self, reader, row):
+    self._columnSpecs_ = reader.columnSpecs
+    ({targets}) = row[0:{numCols}]
+
+def _setColumns_(self, columnSpecs, row):
+    self._columnSpecs_ = columnSpecs
+    ({targets}) = row[0:{numCols}]
+"""
+
+_slotRowClasses = {}
+
+def _slotRowUnpickle(columnSpecs, values):
+    rowClass = tsvSlotRowClass(columnSpecs.columns)
+    row = rowClass.__new__(rowClass)
+    row._setColumns_(columnSpecs, values)
+    return row
+
+def _slotRowReduce(self):
+    return (_slotRowUnpickle, (self._columnSpecs_, tuple(self)))
+
+def _canSlotColumns(columns):
+    return all(col.isidentifier() and (not keyword.iskeyword(col)) and (not col.startswith('_'))
+               for col in columns)
+
+def _mkSlotRowClass(columns):
+    namespace = {}
+    exec(_slotRowMethodsTmpl.format(targets="".join(f"self.{col}, " for col in columns),
+                                    numCols=len(columns)), namespace)
+    return type("TsvSlotRow", (TsvRowBase,),
+                {"__slots__": columns + ("_columnSpecs_",),
+                 "__init__": namespace["__init__"],
+                 "_setColumns_": namespace["_setColumns_"],
+                 "__reduce__": _slotRowReduce})
+
+def tsvSlotRowClass(columns):
+    """Get a row class for the column names, which stores the columns in
+    __slots__, making construction faster and rows smaller than TsvRow.
+    Attributes other than the columns can't be added to the rows.
+    Returns None if any of the column names can't be used as a slot, being
+    Python keywords, not identifiers, or starting with an underscore.
+    Classes are cached by column names."""
+    columns = tuple(columns)
+    rowClass = _slotRowClasses.get(columns)
+    if (rowClass is None) and _canSlotColumns(columns):
+        rowClass = _slotRowClasses[columns] = _mkSlotRowClass(columns)
+    return rowClass
+
+
 def tsvRowToDict(row):
     """convert a TSV row to a dict"""
     return {col: getattr(row, col) for col in row._columnSpecs_.columns}
@@ -0,0 +1,111 @@
+# Copyright 2006-2026 Mark Diekhans
+"""Support for benchmark programs.  These generate synthetic data, time
+alternative implementations of an operation, and report the rates as a TSV.
+They are not run as part of the tests, use `make bench' in this directory.
+"""
+import sys
+import random
+from os import path as osp
+
+sys.path.insert(0, osp.normpath(osp.join(osp.dirname(__file__), "../../lib")))
+from pycbio.sys.perfOps import RunTime
+from pycbio.hgdata.genePred import GenePred, CdsStat
+from pycbio.hgdata.twoBit import write_two_bit
+
+
+class BenchReport:
+    """Collect timings of alternative implementations of an operation.  The
+    first one timed is the baseline for computing the speedup of the others."""
+    def __init__(self, what, unit="rows"):
+        self.what = what
+        self.unit = unit
+        self.results = []
+
+    def time(self, label, func, count, *args, **kwargs):
+        """call func(*args, **kwargs) and record the time to process count
+        units, returns the result of func"""
+        startTime = RunTime.current()
+        result = func(*args, **kwargs)
+        runTime = RunTime.current() - startTime
+        self.results.append((label, count, runTime))
+        return result
+
+    def write(self, fh=sys.stdout):
+        print(self.what, self.unit, "wall_sec", "cpu_sec", f"{self.unit}_per_sec", "speedup", sep='\t', file=fh)
+        baseWall = self.results[0][2].wall if len(self.results) > 0 else None
+        for label, count, runTime in self.results:
+            wall = max(runTime.wall, 1.0e-9)
+            print(label, count, f"{runTime.wall:.3f}", f"{runTime.cpu_user + runTime.cpu_sys:.3f}",
+                  f"{count / wall:.0f}", f"{baseWall / wall:.2f}", sep='\t', file=fh)
+        fh.flush()
+
+
+def randomPslRow(rng, qName, tName, *, maxBlocks=12, tSize=100000000):
+    """generate a random, valid PSL as a row of strings"""
+    blockCount = rng.randint(1, maxBlocks)
+    qStarts, tStarts, sizes = [], [], []
+    qNext = rng.randint(0, 100)
+    tNext = rng.randint(0, tSize - 1000000)
+    for _ in range(blockCount):
+        size = rng.randint(20, 300)
+        qStarts.append(qNext)
+        tStarts.append(tNext)
+        sizes.append(size)
+        qNext += size + rng.choice((0, 0, rng.randint(1, 10)))
+        tNext += size + rng.randint(50, 20000)
+    qSize = qNext + rng.randint(0, 100)
+    match = sum(sizes)
+    misMatch = rng.randint(0, match // 20)
+    return [str(match - misMatch), str(misMatch), "0", "0",
+            "0", "0", str(blockCount - 1), str(tNext - tStarts[0] - match),
+            "+", qName, str(qSize), str(qStarts[0]), str(qStarts[-1] + sizes[-1]),
+            tName, str(tSize), str(tStarts[0]), str(tStarts[-1] + sizes[-1]),
+            str(blockCount),
+            ",".join(map(str, sizes)) + ",",
+            ",".join(map(str, qStarts)) + ",",
+            ",".join(map(str, tStarts)) + ","]
+
+def writeRandomPsls(pslFile, count, *, seed=1, numChroms=24):
+    "write a file of random PSLs"
+    rng = random.Random(seed)
+    with open(pslFile, "w") as fh:
+        for i in range(count):
+            row = randomPslRow(rng, f"NM_{i:09d}.1", f"chr{rng.randint(1, numChroms)}")
+            print(*row, sep='\t', file=fh)
+
+def randomGenePred(rng, name, chrom):
+    """generate a random genePred with frames, with exons from a random PSL"""
+    pslRow = randomPslRow(rng, name, chrom)
+    sizes = [int(v) for v in pslRow[18].split(",")[:-1]]
+    tStarts = [int(v) for v in pslRow[20].split(",")[:-1]]
+    txStart, txEnd = tStarts[0], tStarts[-1] + sizes[-1]
+    gp = GenePred(name, chrom, rng.choice("+-"), txStart, txEnd,
+                  txStart + rng.randint(0, sizes[0] // 3), txEnd - rng.randint(0, sizes[-1] // 3))
+    gp.score = 0
+    gp.name2 = "G" + name
+    gp.cdsStartStat = gp.cdsEndStat = CdsStat.complete
+    for tStart, size in zip(tStarts, sizes):
+        gp.addExon(tStart, tStart + size)
+    gp.assignFrames()
+    return gp
+
+def writeRandomGenePreds(gpFile, count, *, seed=1, numChroms=24):
+    "write a file of random genePreds"
+    rng = random.Random(seed)
+    with open(gpFile, "w") as fh:
+        for i in range(count):
+            randomGenePred(rng, f"NM_{i:09d}.1", f"chr{rng.randint(1, numChroms)}").write(fh)
+
+def writeRandomTwoBit(twoBitFile, chromSize, *, seed=1, numChroms=3):
+    """write a two-bit genome with runs of masked and N bases, similar in
+    density to a real genome, with chromosomes chr1, chr2, ..."""
+    rng = random.Random(seed)
+    parts = []
+    for _ in range(200):
+        parts.append("".join(rng.choice("ACGT") for _ in range(rng.randint(50, 1000))))
+        parts.append("".join(rng.choice("acgt") for _ in range(rng.randint(50, 500))))
+        if rng.random() < 0.05:
+            parts.append(rng.randint(1, 500) * "N")
+    chunk = "".join(parts)
+    write_two_bit(twoBitFile, [(f"chr{i}", (chunk * (chromSize // len(chunk) + 1))[:chromSize])
+                               for i in range(1, numChroms + 1)])
@@ -0,0 +1,51 @@
+# Copyright 2006-2026 Mark Diekhans
+import sys
+import pysam
+import pytest
+if __name__ == '__main__':
+    sys.path.insert(0, "../../../../lib")
+import pycbio.sys.testingSupport as ts
+from pycbio import PycbioException
+from pycbio.hgdata.psl import pslFromPysam
+from pycbio.hgdata.bamPsl import bamPslReader, bamToPsl
+
+
+def _mkSortedBam(request, *, index=True):
+    "create a sorted BAM from the multimap SAM"
+    bamFile = ts.get_test_output_file(request, ".bam")
+    pysam.sort("-o", bamFile, ts.get_test_input_file(request, "multimap.sam"))
+    if index:
+        pysam.index(bamFile)
+    return bamFile
+
+def _pysamPsls(bamFile):
+    "PSLs from the object based conversion"
+    with pysam.AlignmentFile(bamFile) as samfh:
+        return [str(pslFromPysam(samfh, aln)) for aln in samfh.fetch(until_eof=True)]
+
+def testBamPslReader(request):
+    samFile = ts.get_test_input_file(request, "multimap.sam")
+    psls = list(bamPslReader(samFile))
+    assert [str(p) for p in psls] == _pysamPsls(samFile)
+    # lazy blocks decode to the same blocks
+    psls2 = list(bamPslReader(samFile, lazyBlocks=False))
+    assert [p.blocks for p in psls] == [p.blocks for p in psls2]
+
+def testBamToPsl(request):
+    pslFile = ts.get_test_output_file(request, ".psl")
+    cnt = bamToPsl(ts.get_test_input_file(request, "multimap.sam"), pslFile)
+    assert cnt == 14
+    ts.diff_results_expected(request, ".psl", expect_basename="test_psl.py::testMultiMapSam")
+
+def testBamToPslWorkers(request):
+    bamFile = _mkSortedBam(request)
+    pslFile = ts.get_test_output_file(request, ".psl")
+    cnt = bamToPsl(bamFile, pslFile, workers=2, tmpDir=ts.get_test_output_dir(request))
+    assert cnt == 14
+    with open(pslFile) as fh:
+        assert fh.read().splitlines() == _pysamPsls(bamFile)
+
+def testBamToPslWorkersNoIndex(request):
+    bamFile = _mkSortedBam(request, index=False)
+    with pytest.raises(PycbioException, match="must be indexed"):
+        bamToPsl(bamFile, ts.get_test_output_file(request, ".psl"), workers=2)
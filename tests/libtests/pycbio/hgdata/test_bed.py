@@ -7,6 +7,7 @@ if __name__ == '__main__':
     sys.path.insert(0, "../../../../lib")
 import pycbio.sys.testingSupport as ts
 from pycbio.sys import fileOps
+from pycbio.sys.parseCache import ParseCache
 from pycbio.hgdata.bed import Bed, BedBlock, BedTable, BedReader, bedFromPsl, bedMergeBlocks, BedException, encodeRow, defaultIfNone
 from pycbio.sys.color import Color
 import pipettor
@@ -84,6 +85,11 @@ def testBed6ExtraGzip(request):
             bed.write(outFh)
     ts.diff_test_files(ts.get_test_input_file(request, "bed6extra.bed"), outBedFile)
 
+def testBedParallelRead(request):
+    inBed = ts.get_test_input_file(request, "bed12extra.bed")
+    beds = list(BedReader(inBed))
+    assert [b.toRow() for b in BedReader(inBed, workers=2)] == [b.toRow() for b in beds]
+
 def testBedExtend(request):
     testRow = ["chrZ", "1000", "2000", "fred", "1962", "7", "1"]
     b1 = BedGame.parse(testRow)
@@ -400,3 +406,13 @@ def testBedReaderEmpty(request):
     beds = list(BedReader(tmpfile))
     assert len(beds) == 0
     os.unlink(tmpfile)
+
+def testBedTableCached(request, tmp_path):
+    inFile = ts.get_test_input_file(request, "bed12extra.bed")
+    cache = ParseCache(tmp_path)
+    BedTable(inFile, cache=cache)
+    beds = BedTable(inFile, nameIdx=True, cache=cache)
+    assert [b.toRow() for b in beds] == [b.toRow() for b in BedReader(inFile)]
+    assert [b.numStdCols for b in beds] == [b.numStdCols for b in BedReader(inFile)]
+    beds = BedTable(inFile, numStdCols=9, cache=cache)
+    assert [b.toRow() for b in beds] == [b.toRow() for b in BedReader(inFile, numStdCols=9)]
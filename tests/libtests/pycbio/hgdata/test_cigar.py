@@ -1,10 +1,12 @@
 # Copyright 2006-2026 Mark Diekhans
 import sys
 import pysam
+import pytest
 if __name__ == '__main__':
     sys.path.insert(0, "../../../../lib")
 import pycbio.sys.testingSupport as ts
-from pycbio.hgdata.cigar import cigarStringParse, cigarFromPysam
+from pycbio.hgdata.cigar import cigarStringParse, cigarFromPysam, cigarBlocksFromString, cigarBlocksFromPysam
+from pycbio.hgdata.psl import pslFromCigarObj
 
 
 def testCigars():
@@ -43,3 +45,40 @@ def testPysamToCigar(request):
             cigar = cigarFromPysam(aln.cigartuples)
             print(str(cigar), file=cigarfh)
     ts.diff_results_expected(request, ".cigar")
+
+def _checkBlocks(blks, cigar, tStart):
+    "compare to PSL from Cigar object"
+    psl = pslFromCigarObj("q", "+", "t", 1000000, tStart, cigar)
+    assert list(blks.qStarts) == [b.qStart for b in psl.blocks]
+    assert list(blks.tStarts) == [b.tStart for b in psl.blocks]
+    assert list(blks.sizes) == [b.size for b in psl.blocks]
+    assert ((blks.qSize, blks.tEnd, blks.match, blks.qNumInsert, blks.qBaseInsert, blks.tNumInsert, blks.tBaseInsert)
+            == (psl.qSize, psl.tEnd, psl.match, psl.qNumInsert, psl.qBaseInsert, psl.tNumInsert, psl.tBaseInsert))
+
+def testCigarBlocksFromString():
+    cases = ("485S133M1D22M2D9M1D139M11S",
+             "20H5S10M2I3=1X4N6M100P5M3S",
+             "2354MD150M",
+             "175M 4D 832M	52516I1\n0M3I755M",
+             "10m2i5d3m")
+    for cigarStr in cases:
+        _checkBlocks(cigarBlocksFromString(cigarStr, 1000), cigarStringParse(cigarStr), 1000)
+
+def testCigarBlocksFromPysam(request):
+    with pysam.AlignmentFile(ts.get_test_input_file(request, "ont-rna.sam"), "r") as samfh:
+        for aln in samfh:
+            _checkBlocks(cigarBlocksFromPysam(aln.cigartuples, aln.reference_start),
+                         cigarFromPysam(aln.cigartuples), aln.reference_start)
+
+@pytest.mark.parametrize("cigarStr,errMsg", [("10M5Q", "unknown operation"),
+                                             ("10M5", "doesn't parse"),
+                                             ("10M-5D", "Invalid cigar string")])
+def testCigarInvalid(cigarStr, errMsg):
+    with pytest.raises(TypeError, match=errMsg):
+        cigarStringParse(cigarStr)
+    with pytest.raises(TypeError, match=errMsg):
+        cigarBlocksFromString(cigarStr)
+
+def testCigarBlocksInvalidPysam():
+    with pytest.raises(TypeError, match="unknown operation"):
+        cigarBlocksFromPysam([(0, 10), (9, 2)])
@@ -1,5 +1,8 @@
 # Copyright 2006-2026 Mark Diekhans
 import sys
+import random
+from collections import Counter
+import pytest
 if __name__ == '__main__':
     sys.path.insert(0, "../../../../lib")
 from pycbio.hgdata import dnaOps
@@ -23,3 +26,63 @@ def testIsValidByte():
     assert dnaOps.isValidBase(b'a')
     assert dnaOps.isValidBase(b'C')
     assert not dnaOps.isValidBase(b'@')
+
+def testReverseComplementInto():
+    out = bytearray(18)
+    assert dnaOps.reverseComplementInto("cgcggccatttgtctctt", out) is out
+    assert out == b"aagagacaaatggccgcg"
+    buf = bytearray(b"ACGTN")
+    dnaOps.reverseComplementInto(buf, buf)
+    assert buf == b"NACGT"
+    with pytest.raises(ValueError):
+        dnaOps.reverseComplementInto("ACGT", bytearray(3))
+
+def testReverseComplementIntoNumpy():
+    numpy = pytest.importorskip("numpy")
+    seq = numpy.frombuffer(b"cgcggccatttgtctctt", dtype=numpy.uint8)
+    out = numpy.zeros(len(seq), dtype=numpy.uint8)
+    dnaOps.reverseComplementInto(seq, out)
+    assert out.tobytes() == b"aagagacaaatggccgcg"
+
+@pytest.mark.parametrize("seqType", (str, bytes, bytearray, memoryview))
+def testIsValidSeq(seqType):
+    def cnv(seq):
+        return seq if seqType is str else seqType(seq.encode())
+    assert dnaOps.isValidSeq(cnv("ACGTacgtRYKM"))
+    assert not dnaOps.isValidSeq(cnv("ACGT@acgt"))
+    assert dnaOps.firstInvalidBase(cnv("ACGT@acgt")) == 4
+    assert dnaOps.firstInvalidBase(cnv("ACGTacgt")) == -1
+    assert dnaOps.isValidSeq(cnv(""))
+
+def testIsValidSeqUnicode():
+    assert not dnaOps.isValidSeq("ACGé")
+
+def testFindNRuns():
+    seq = b"NNACGTnNnACGTNACNNNN"
+    assert dnaOps.findNRuns(seq) == [(0, 2), (6, 9), (13, 14), (16, 20)]
+    assert dnaOps.findNRuns(seq, minSize=3) == [(6, 9), (16, 20)]
+    assert dnaOps.findNRuns("ACGT") == []
+
+def testGcContentWindows():
+    seq = "GGCCAATTNNNNGCAT"
+    assert list(dnaOps.gcContentWindows(seq, 4)) == [1.0, 0.0, pytest.approx(float("nan"), nan_ok=True), 0.5]
+    assert list(dnaOps.gcContentWindows(seq, 8, step=4)) == [0.5, 0.0, 0.5, 0.5]
+    with pytest.raises(ValueError):
+        dnaOps.gcContentWindows(seq, 0)
+
+def _bruteKmerCounts(seq, k):
+    seq = seq.upper()
+    return Counter(seq[i:i + k] for i in range(len(seq) - k + 1)
+                   if set(seq[i:i + k]) <= set("ACGT"))
+
+@pytest.mark.parametrize("useNumpy", (True, False))
+def testKmerCounts(monkeypatch, useNumpy):
+    if useNumpy:
+        pytest.importorskip("numpy")
+    else:
+        monkeypatch.setattr(dnaOps, "numpy", None)
+    rng = random.Random(3)
+    seq = "".join(rng.choice("ACGTacgtN") for _ in range(5000))
+    for k in (1, 3, 7):
+        assert dnaOps.kmerCounts(seq, k, chunkSize=1000) == _bruteKmerCounts(seq, k)
+    assert dnaOps.kmerCounts("AC", 3) == Counter()
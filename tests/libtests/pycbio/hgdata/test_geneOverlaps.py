@@ -0,0 +1,75 @@
+# Copyright 2006-2026 Mark Diekhans
+import sys
+import random
+import pytest
+if __name__ == '__main__':
+    sys.path.insert(0, "../../../../lib")
+import pycbio.sys.testingSupport as ts
+from pycbio.hgdata.genePred import GenePred, PackedGenePred, GenePredTbl
+from pycbio.hgdata.geneOverlaps import geneOverlaps, GeneOverlap
+
+def _randomGenes(rng, count, prefix):
+    genes = []
+    for i in range(count):
+        start = rng.randint(0, 50000)
+        exons = []
+        pos = start
+        for _ in range(rng.randint(1, 6)):
+            size = rng.randint(1, 500)
+            exons.append((pos, pos + size))
+            pos += size + rng.randint(1, 2000)
+        txStart, txEnd = exons[0][0], exons[-1][1]
+        if rng.random() < 0.2:
+            cdsStart = cdsEnd = txEnd
+        else:
+            cdsStart = rng.randint(txStart, txEnd)
+            cdsEnd = rng.randint(cdsStart, txEnd)
+        gene = GenePred(f"{prefix}{i}", rng.choice(("chr1", "chr2")), rng.choice("+-"), txStart, txEnd, cdsStart, cdsEnd)
+        for exonStart, exonEnd in exons:
+            gene.addExon(exonStart, exonEnd)
+        genes.append(gene)
+    return genes
+
+def _pairwise(genes1, genes2, stranded):
+    "expected results using GenePred methods on all pairs"
+    results = []
+    for i1, gene1 in enumerate(genes1):
+        for i2, gene2 in enumerate(genes2):
+            if not stranded:
+                gene2 = gene2.clone()
+                gene2.strand = gene1.strand
+            overlap = gene1.overlapAmt(gene2)
+            if overlap > 0:
+                results.append((i1, i2, overlap, gene1.cdsOverlapAmt(gene2),
+                                gene1.similarity(gene2), gene1.cdsSimilarity(gene2)))
+    return results
+
+def _results(overlapTbl):
+    return [(overlapTbl.idx1[i], overlapTbl.idx2[i], overlapTbl.exonOverlap[i], overlapTbl.cdsOverlap[i],
+             overlapTbl.similarity[i], overlapTbl.cdsSimilarity[i]) for i in range(len(overlapTbl))]
+
+@pytest.mark.parametrize("stranded", (True, False))
+def testRandom(stranded):
+    rng = random.Random(5)
+    genes1 = _randomGenes(rng, 200, "a")
+    genes2 = _randomGenes(rng, 150, "b")
+    expect = _pairwise(genes1, genes2, stranded)
+    assert len(expect) > 0
+    assert _results(geneOverlaps(genes1, genes2, stranded=stranded)) == expect
+    packed1 = [PackedGenePred.fromGenePred(gene) for gene in genes1]
+    assert _results(geneOverlaps(packed1, genes2, stranded=stranded)) == expect
+
+def testSelf(request):
+    genes = GenePredTbl(ts.get_test_input_file(request, "fileFrameStatTest.gp"), packed=True)
+    overlapTbl = geneOverlaps(genes, genes)
+    assert _results(overlapTbl) == _pairwise(genes, genes, True)
+    for overlap in overlapTbl:
+        assert isinstance(overlap, GeneOverlap)
+        if overlap.gene1 is overlap.gene2:
+            assert overlap.exonOverlap == overlap.gene1.getLenExons()
+            assert overlap.similarity == 1.0
+
+def testEmpty():
+    genes = _randomGenes(random.Random(1), 10, "a")
+    assert len(geneOverlaps(genes, [])) == 0
+    assert list(geneOverlaps([], genes)) == []
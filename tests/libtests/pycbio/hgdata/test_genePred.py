@@ -1,10 +1,12 @@
 # Copyright 2006-2026 Mark Diekhans
 import sys
+from array import array
 if __name__ == '__main__':
     sys.path.insert(0, "../../../../lib")
 import pycbio.sys.testingSupport as ts
 from pycbio.sys import fileOps
-from pycbio.hgdata.genePred import GenePredTbl, genePredFromBigGenePred, GenePredReader
+from pycbio.sys.parseCache import ParseCache
+from pycbio.hgdata.genePred import GenePred, PackedGenePred, GenePredTbl, genePredFromBigGenePred, GenePredReader
 
 # lists defining expected results from exon features.
 # they are in the form (utr5 cds utr3)
@@ -113,3 +115,113 @@ def testReadWrite(request):
         for gp in GenePredReader(inFile):
             gp.write(outFh)
     ts.diff_test_files(inFile, outFile)
+
+def testParallelRead(request):
+    inFile = ts.get_test_input_file(request, "fileFrameStatTest.gp")
+    outFile = ts.get_test_output_file(request, ".gp")
+    with open(outFile, "w") as outFh:
+        for gp in GenePredReader(inFile, workers=2):
+            gp.write(outFh)
+    ts.diff_test_files(inFile, outFile)
+
+def testCached(request, tmp_path):
+    inFile = ts.get_test_input_file(request, "fileFrameStatTest.gp")
+    cache = ParseCache(tmp_path)
+    GenePredTbl(inFile, cache=cache)
+    gpTbl = GenePredTbl(inFile, buildUniqIdx=True, cache=cache)
+    expect = list(GenePredReader(inFile))
+    assert [gp.getRow() for gp in gpTbl] == [gp.getRow() for gp in expect]
+    assert [(gp.cdsStartIExon, gp.cdsEndIExon) for gp in gpTbl] == [(gp.cdsStartIExon, gp.cdsEndIExon) for gp in expect]
+    assert gpTbl.names["NM_000017.1"].exons[9].gene is gpTbl.names["NM_000017.1"]
+
+def _exonTuples(gp):
+    return [(e.iExon, e.start, e.end, e.frame) for e in gp.exons]
+
+def _loadBoth(request, fileName):
+    inFile = ts.get_test_input_file(request, fileName)
+    return GenePredTbl(inFile), GenePredTbl(inFile, packed=True)
+
+def testPackedLoad(request):
+    for fileName in ("fromPslMinTest.gp", "fileFrameStatTest.gp"):
+        gpTbl, packedTbl = _loadBoth(request, fileName)
+        assert len(gpTbl) == len(packedTbl)
+        for gp, pgp in zip(gpTbl, packedTbl):
+            assert isinstance(pgp, PackedGenePred)
+            assert pgp.getRow() == gp.getRow()
+            assert _exonTuples(pgp) == _exonTuples(gp)
+            assert pgp.exons[0].gene is pgp
+            assert (pgp.cdsStartIExon, pgp.cdsEndIExon) == (gp.cdsStartIExon, gp.cdsEndIExon)
+            assert pgp.getLenExons() == gp.getLenExons()
+            assert pgp.getLenCds() == gp.getLenCds()
+            assert pgp.getNumCdsExons() == gp.getNumCdsExons()
+            assert pgp.getFeatures() == gp.getFeatures()
+            assert [e.iExon for e in pgp.getSortedExons()] == gp.getSortedExonIndexes()
+            assert pgp.sameCds(gp) and gp.sameCds(pgp)
+            for e in gp.exons:
+                for pos in (e.start - 1, e.start, e.end - 1, e.end):
+                    pe = pgp.findContainingExon(pos)
+                    ge = gp.findContainingExon(pos)
+                    assert (None if pe is None else pe.iExon) == (None if ge is None else ge.iExon)
+
+def testPackedFeatures(request):
+    r = GenePredTbl(ts.get_test_input_file(request, "fromPslMinTest.gp"), packed=True)[0]
+    assert r.getNumExons() == 10
+    assert r.getExon(9).start == 119589051
+    chkFeatures(r, featsNM_000017)
+
+def testPackedOverlap(request):
+    gpTbl, packedTbl = _loadBoth(request, "fileFrameStatTest.gp")
+    # make overlapping pairs from each gene and a copy shifted by a few bases
+    shifted = []
+    for gp in gpTbl:
+        sgp = GenePred(gp.name, gp.chrom, gp.strand, gp.txStart + 7, gp.txEnd + 7, gp.cdsStart + 5, gp.cdsEnd + 5)
+        for e in gp.exons:
+            sgp.addExon(e.start + 7, e.end + 7)
+        shifted.append(sgp)
+    for gp1, pgp1 in zip(gpTbl, packedTbl):
+        for gp2 in gpTbl + shifted:
+            pgp2 = PackedGenePred.fromGenePred(gp2)
+            assert pgp1.overlapAmt(pgp2) == gp1.overlapAmt(gp2)
+            assert pgp1.overlapAmt(gp2) == gp1.overlapAmt(gp2)
+            assert pgp1.cdsOverlapAmt(pgp2) == gp1.cdsOverlapAmt(gp2)
+            assert pgp1.cdsOverlapAmt(gp2) == gp1.cdsOverlapAmt(gp2)
+            assert pgp1.similarity(pgp2) == gp1.similarity(gp2)
+            assert pgp1.cdsSimilarity(pgp2) == gp1.cdsSimilarity(gp2)
+
+def testPackedAssignFrames(request):
+    gpTbl, packedTbl = _loadBoth(request, "fileFrameStatTest.gp")
+    for gp, pgp in zip(gpTbl, packedTbl):
+        gp.assignFrames()
+        pgp.exonFrames = array('b', len(pgp.exonFrames) * [-1])
+        pgp.assignFrames()
+        assert pgp.getRow() == gp.getRow()
+
+def testPackedBuild():
+    pgp = PackedGenePred("tx", "chr1", "-", 100, 1000, 150, 900)
+    pgp.addExon(100, 200)
+    pgp.addExon(500, 600)
+    pgp.addExon(800, 1000)
+    assert (pgp.cdsStartIExon, pgp.cdsEndIExon) == (0, 2)
+    assert pgp.getLenExons() == 400
+    assert pgp.getLenCds() == 250
+    pgp.assignFrames()
+    assert list(pgp.exonFrames) == [2, 1, 0]
+    assert pgp.clone().getRow() == pgp.getRow()
+
+def testPackedParallelRead(request):
+    inFile = ts.get_test_input_file(request, "fileFrameStatTest.gp")
+    outFile = ts.get_test_output_file(request, ".gp")
+    with open(outFile, "w") as outFh:
+        for gp in GenePredReader(inFile, workers=2, packed=True):
+            gp.write(outFh)
+    ts.diff_test_files(inFile, outFile)
+
+def testPackedCached(request, tmp_path):
+    inFile = ts.get_test_input_file(request, "fileFrameStatTest.gp")
+    cache = ParseCache(tmp_path)
+    GenePredTbl(inFile, cache=cache, packed=True)
+    gpTbl = GenePredTbl(inFile, buildUniqIdx=True, cache=cache, packed=True)
+    expect = list(GenePredReader(inFile))
+    assert all(isinstance(gp, PackedGenePred) for gp in gpTbl)
+    assert [gp.getRow() for gp in gpTbl] == [gp.getRow() for gp in expect]
+    assert [(gp.cdsStartIExon, gp.cdsEndIExon) for gp in gpTbl] == [(gp.cdsStartIExon, gp.cdsEndIExon) for gp in expect]
@@ -1,5 +1,6 @@
 # Copyright 2025-2026 Mark Diekhans
 import sys
+import random
 import os.path as osp
 from pathlib import Path
 import pytest
@@ -7,6 +8,7 @@ import pytest
 sys.path = ["../../../../lib", "../.."] + sys.path
 import pycbio.sys.testingSupport as ts
 from pycbio.hgdata.genome import genome_factory
+from pycbio.hgdata.twoBit import write_two_bit
 
 COMMON_OUTPUT_DIR = "../../../common-output"
 GRCH38_FA = "grch38-regions.fa.gz"
@@ -42,3 +44,45 @@ def test_genome_factory_path(request, genome_file):
 def test_genome_seq(request, genome_file):
     genome = _get_genome(request, genome_file)
     assert genome.get_seq("chr19_51887540_51906200", 100, 128) == 'CCAAGCACTGGTTCCAATGCGGAGACCA'
+
+def _write_two_bit(request):
+    rng = random.Random(5)
+    seqs = [(f"chr{i}", "".join(rng.choice("ACGTacgtN") for _ in range(rng.randint(500, 1500))))
+            for i in range(3)]
+    two_bit = ts.get_test_output_file(request, ".2bit")
+    write_two_bit(two_bit, seqs)
+    return two_bit, dict(seqs)
+
+def test_two_bit_whole_seq(request):
+    two_bit, seqs = _write_two_bit(request)
+    genome = genome_factory(two_bit)
+    assert genome.get_seq_ids() == sorted(seqs.keys())
+    for seq_id, seq in seqs.items():
+        assert genome.get_seq(seq_id) == seq
+        assert genome.get_seq(seq_id, 10) == seq[10:]
+
+def test_window_cache(request):
+    two_bit, seqs = _write_two_bit(request)
+    genome = genome_factory(two_bit, cache_windows=3, window_size=100)
+    rng = random.Random(1)
+    for _ in range(1000):
+        seq_id = rng.choice(sorted(seqs.keys()))
+        seq = seqs[seq_id]
+        start = rng.randint(0, len(seq) - 1)
+        end = min(start + rng.choice((1, 2, 50, 100, 250)), len(seq))
+        assert genome.get_seq(seq_id, start, end) == seq[start:end]
+    assert len(genome._windows) == 3
+
+def test_get_seqs(request):
+    two_bit, seqs = _write_two_bit(request)
+    genome = genome_factory(two_bit)
+    rng = random.Random(2)
+    regions = []
+    for _ in range(200):
+        seq_id = rng.choice(sorted(seqs.keys()))
+        start = rng.randint(0, len(seqs[seq_id]) - 1)
+        regions.append((seq_id, start, min(start + rng.randint(0, 30), len(seqs[seq_id]))))
+    for max_gap in (0, 100, 100000):
+        assert genome.get_seqs(regions, max_gap=max_gap) == [seqs[r[0]][r[1]:r[2]] for r in regions]
+    assert genome.get_seqs(regions, max_span=200) == [seqs[r[0]][r[1]:r[2]] for r in regions]
+    assert genome.get_seqs([]) == []
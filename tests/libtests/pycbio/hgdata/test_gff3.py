@@ -1,12 +1,14 @@
 # Copyright 2006-2026 Mark Diekhans
 import sys
 import pickle
+import pytest
 import pipettor
 if __name__ == '__main__':
     sys.path.insert(0, "../../../../lib")
 import pycbio.sys.testingSupport as ts
-from pycbio.hgdata.gff3 import Gff3Parser
+from pycbio.hgdata.gff3 import Gff3Parser, GFF3Exception
 from pycbio.sys import fileOps
+from pycbio.sys.parseCache import ParseCache
 
 
 def _countRows(gff3File):
@@ -21,18 +23,18 @@ def _write(gff3, outGff3):
     with open(outGff3, "w") as fh:
         gff3.write(fh)
 
-def _parseTest(request, gff3In):
+def _parseTest(request, gff3In, *, lazyAttrs=False, expect_basename=None):
     # parse and write
-    gff3a = Gff3Parser().parse(gff3In)
+    gff3a = Gff3Parser(lazyAttrs=lazyAttrs).parse(gff3In)
     gff3Out1 = ts.get_test_output_file(request, ".gff3")
     _write(gff3a, gff3Out1)
     assert _countRows(gff3a.fileName) == _countRows(gff3Out1)
-    ts.diff_results_expected(request, ".gff3")
+    ts.diff_results_expected(request, ".gff3", expect_basename=expect_basename)
 
-    gff3b = Gff3Parser().parse(gff3In)
+    gff3b = Gff3Parser(lazyAttrs=lazyAttrs).parse(gff3In)
     gff3Out2 = ts.get_test_output_file(request, ".2.gff3")
     _write(gff3b, gff3Out2)
-    ts.diff_test_files(ts.get_test_expect_file(request, ".gff3"),
+    ts.diff_test_files(ts.get_test_expect_file(request, ".gff3", basename=expect_basename),
                        ts.get_test_output_file(request, ".2.gff3"))
     return gff3a
 
@@ -68,3 +70,61 @@ def testCompressed(request):
     gff3InGz = ts.get_test_output_file(request, ".tmp.gff3.gz")
     pipettor.run(("gzip", "-c", ts.get_test_input_file(request, "discontinuous.gff3")), stdout=gff3InGz)
     _parseTest(request, gff3InGz)
+
+def testCached(request, tmp_path):
+    gff3In = ts.get_test_input_file(request, "sacCerTest.gff3")
+    cache = ParseCache(tmp_path)
+    Gff3Parser().parse(gff3In, cache=cache)
+    gff3a = Gff3Parser().parse(gff3In, cache=cache)
+    assert cache.size() > 0
+    assert len(gff3a.roots) == len(Gff3Parser().parse(gff3In).roots)
+    gff3Out = ts.get_test_output_file(request, ".gff3")
+    _write(gff3a, gff3Out)
+    ts.diff_results_expected(request, ".gff3", expect_basename="test_gff3.py::testSacCer")
+
+def testLazySacCer(request):
+    gff3In = ts.get_test_input_file(request, "sacCerTest.gff3")
+    gff3a = Gff3Parser(lazyAttrs=True).parse(gff3In)
+    feat = gff3a.byFeatureId["YAL069W"][0]
+    assert feat.isLazy
+    assert feat.featureId == "YAL069W"
+    assert feat.getRAttr1("orf_classification") == "Dubious"
+    assert feat.isLazy
+    assert feat.attrs["orf_classification"] == ["Dubious"]
+    assert not feat.isLazy
+    _parseTest(request, gff3In, lazyAttrs=True, expect_basename="test_gff3.py::testSacCer")
+
+def testLazySpecialCases(request):
+    _parseTest(request, ts.get_test_input_file(request, "specialCasesTest.gff3"),
+               lazyAttrs=True, expect_basename="test_gff3.py::testSpecialCases")
+
+def testLazyDiscontinuous(request):
+    _parseTest(request, ts.get_test_input_file(request, "discontinuous.gff3"),
+               lazyAttrs=True, expect_basename="test_gff3.py::testDiscontinuous")
+
+def testLazyPickle(request):
+    gff3in = Gff3Parser(lazyAttrs=True).parse(ts.get_test_input_file(request, "discontinuous.gff3"))
+    gff3re = pickle.loads(pickle.dumps(gff3in))
+    gff3out = ts.get_test_output_file(request, ".gff3")
+    _write(gff3re, gff3out)
+    ts.diff_results_expected(request, ".gff3", expect_basename="test_gff3.py::testDiscontinuous")
+
+def testLazyQuoted(tmp_path):
+    gff3In = tmp_path / "quoted.gff3"
+    gff3In.write_text("##gff-version 3\n"
+                      "chr%201\tsrc\tgene\t1\t100\t.\t+\t.\tID=g%3B1; Note=a%2Cb,c;bad%3Dname=x\n")
+    for lazyAttrs in (False, True):
+        feat = Gff3Parser(lazyAttrs=lazyAttrs).parse(str(gff3In)).byFeatureId["g;1"][0]
+        assert feat.seqname == "chr 1"
+        assert feat.getRAttr("Note") == ["a,b", "c"]
+        assert feat.attrs == {"ID": ["g;1"], "Note": ["a,b", "c"], "bad=name": ["x"]}
+
+def testLazyAttrError(tmp_path):
+    gff3In = tmp_path / "bad.gff3"
+    gff3In.write_text("##gff-version 3\n"
+                      "chr1\tsrc\tgene\t1\t100\t.\t+\t.\tID=g1;Note=a;Note=b\n")
+    with pytest.raises(GFF3Exception, match="bad.gff3:2: duplicated attribute name: Note"):
+        Gff3Parser().parse(str(gff3In))
+    feat = Gff3Parser(lazyAttrs=True).parse(str(gff3In)).byFeatureId["g1"][0]
+    with pytest.raises(GFF3Exception, match="bad.gff3:2: duplicated attribute name: Note"):
+        feat.attrs
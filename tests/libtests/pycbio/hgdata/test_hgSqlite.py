@@ -4,6 +4,7 @@ Test for storage of genome data in sqlite for use in cluster jobs and other rand
 access uses.
 """
 import sys
+import random
 import pytest
 if __name__ == '__main__':
     sys.path.insert(0, "../../../../lib")
@@ -15,6 +16,7 @@ from pycbio.hgdata.genePredSqlite import GenePredSqliteTable
 from pycbio.hgdata.gencodeSqlite import GencodeAttrs, GencodeAttrsSqliteTable, GencodeTranscriptSource, GencodeTranscriptSourceSqliteTable
 from pycbio.hgdata.gencodeSqlite import GencodeTranscriptionSupportLevel, GencodeTranscriptionSupportLevelSqliteTable
 from pycbio.hgdata.gencodeSqlite import GencodeToGeneSymbol, GencodeToGeneSymbolSqliteTable
+from pycbio.hgdata.gencodeSqlite import GencodeGene, GencodeGeneSqliteTable
 from pycbio.hgdata.psl import Psl
 from pycbio.hgdata.genePred import genePredFromRow
 
@@ -153,6 +155,97 @@ def testPslTRangeOverlapStrand(request, pslStrandDb):
     coords = _makePslObjCoords(psls)
     assert coords == expect
 
+@pytest.fixture(scope="session")
+def pslRTreeDb():
+    conn, pslTbl = _buildTestDb("pslTest.psl")
+    pslTbl.rtreeIndex()
+    yield pslTbl
+    conn.close()
+
+def _brutePslOverlap(pslTbl, tName, tStart, tEnd):
+    return _makePslObjCoords([psl for psl in pslTbl.getAll()
+                              if (psl.tName == tName) and (psl.tStart < tEnd) and (psl.tEnd > tStart)])
+
+def testPslTRangeOverlapRandom(pslDb, pslRTreeDb):
+    assert not pslDb.haveRTree()
+    assert pslRTreeDb.haveRTree()
+    rng = random.Random(1)
+    psls = list(pslDb.getAll())
+    hits = 0
+    for i in range(200):
+        # queries near alignments and anywhere
+        psl = rng.choice(psls)
+        tName = psl.tName
+        tStart = max(psl.tStart + rng.randint(-20000, 20000), 0) if i % 4 else rng.randint(0, 150000000)
+        tEnd = tStart + rng.choice((1, rng.randint(1, 10000), rng.randint(1, 600000000)))
+        expect = _brutePslOverlap(pslDb, tName, tStart, tEnd)
+        hits += len(expect)
+        assert _makePslObjCoords(pslDb.getTRangeOverlap(tName, tStart, tEnd)) == expect
+        assert _makePslObjCoords(pslRTreeDb.getTRangeOverlap(tName, tStart, tEnd)) == expect
+    assert hits > 100
+
+def testPslTRangeOverlapWholeSeq(pslDb, pslRTreeDb):
+    expect = _brutePslOverlap(pslDb, "chr1", 0, 1000000000)
+    assert len(expect) > 0
+    assert _makePslObjCoords(pslDb.getTRangeOverlap("chr1", None, None)) == expect
+    assert _makePslObjCoords(pslRTreeDb.getTRangeOverlap("chr1", None, None)) == expect
+
+def testPslRTreeStrand(pslStrandDb):
+    conn, pslTbl = _buildTestDb("overlapingStrandCases.psl")
+    try:
+        pslTbl.rtreeIndex()
+        for strand in ('-', ('+', '+-')):
+            assert (_makePslObjCoords(pslTbl.getTRangeOverlap("chr1", 0, 80000, strand))
+                    == _makePslObjCoords(pslStrandDb.getTRangeOverlap("chr1", 0, 80000, strand)))
+    finally:
+        conn.close()
+
+def _checkPslRanges(pslTbl):
+    "check range queries of every PSL against brute force"
+    psls = list(pslTbl.getAll())
+    assert len(psls) > 0
+    for psl in psls:
+        expect = _brutePslOverlap(pslTbl, psl.tName, psl.tStart, psl.tEnd)
+        assert _makePslObjCoords(pslTbl.getTRangeOverlap(psl.tName, psl.tStart, psl.tEnd)) == expect
+
+def testPslRecreateDropsRTree(request):
+    conn, pslTbl = _buildTestDb("overlapingStrandCases.psl")
+    try:
+        pslTbl.rtreeIndex()
+        pslTbl = PslSqliteTable(conn, "aligns", create=True)
+        assert not sqliteOps.haveTable(conn, "aligns_rtree")
+        pslTbl.loadPslFile(ts.get_test_input_file(request, "pslTest.psl"))
+        assert not pslTbl.haveRTree()
+        _checkPslRanges(pslTbl)
+    finally:
+        conn.close()
+
+def testPslLoadAfterRTree():
+    conn, pslTbl = _buildTestDb("pslTest.psl")
+    try:
+        pslTbl.rtreeIndex()
+        pslTbl.loads(pslTestData)
+        assert not pslTbl.haveRTree()
+        _checkPslRanges(pslTbl)
+        pslTbl.rtreeIndex()
+        assert pslTbl.haveRTree()
+        _checkPslRanges(pslTbl)
+    finally:
+        conn.close()
+
+@pytest.mark.parametrize("parseWorkers", (None, 2))
+def testPslLoadChunked(request, pslDb, parseWorkers):
+    conn = sqliteOps.connect(None)
+    try:
+        tbl = PslSqliteTable(conn, "aligns", True)
+        stats = tbl.bulkLoadPslFile(ts.get_test_input_file(request, "pslTest.psl"), chunkSize=5, parseWorkers=parseWorkers)
+        assert stats.rows == pslDb.getOidRange()[1] - 1
+        assert stats.rowsPerSec > 0
+        assert list(tbl.getAll(raw=True)) == list(pslDb.getAll(raw=True))
+        assert _makePslObjCoords(tbl.getTRangeOverlap("chr1", 4268, 14754)) == _makePslObjCoords(pslDb.getTRangeOverlap("chr1", 4268, 14754))
+    finally:
+        conn.close()
+
 def testPslMemLoadPsl():
     conn = sqliteOps.connect(None)
     try:
@@ -218,6 +311,33 @@ def testGpRangeOverlap(request, gpTbl):
     coords = _makeGpRawCoords(rows)
     assert coords == expect
 
+def testGpRangeOverlapRTree(request, gpTbl):
+    conn = sqliteOps.connect(None)
+    try:
+        tbl = GenePredSqliteTable(conn, "refGene", True)
+        tbl.loadGenePredFile(ts.get_test_input_file(request, "fileFrameStatTest.gp"))
+        tbl.index()
+        tbl.rtreeIndex()
+        for start, end, strand in ((100000000, 200000000, None), (100000000, 800000000, '-'), (None, None, None)):
+            assert (_makeGpObjCoords(tbl.getRangeOverlap("chr12", start, end, strand=strand))
+                    == _makeGpObjCoords(gpTbl.getRangeOverlap("chr12", start, end, strand=strand)))
+    finally:
+        conn.close()
+
+def testGpLoadAfterRTree(request):
+    conn = sqliteOps.connect(None)
+    try:
+        tbl = GenePredSqliteTable(conn, "refGene", True)
+        tbl.loads([gpTestData[0]])
+        tbl.rtreeIndex()
+        tbl.loads([gpTestData[2]])
+        assert not tbl.haveRTree()
+        assert _makeGpObjCoords(tbl.getRangeOverlap("chr12", 100000000, 200000000)) == [
+            ("NM_000017.1", "chr12", 119575618, 119589763, '+'),
+            ("NM_000277.1", "chr12", 101734570, 101813848, '-')]
+    finally:
+        conn.close()
+
 def testGpRangeOverlapStrand(request, gpTbl):
     gps = gpTbl.getRangeOverlap("chr12", 100000000, 800000000, strand='-')
     expect = [('NM_000277.1', 'chr12', 101734570, 101813848, '-')]
@@ -406,3 +526,33 @@ def testGencodeSymMemLoad():
         assert transSrc == GencodeToGeneSymbol(*genSymTestData[2])
     finally:
         conn.close()
+
+
+###
+# GencodeGeneSqliteTable
+###
+genGeneTestData = (("chr1", 11868, 14409, "ENSG00000223972.6", 0, "+", "transcribed_unprocessed_pseudogene", "DDX11L1"),
+                   ("chr1", 14695, 24891, "ENSG00000227232.5", 0, "-", "unprocessed_pseudogene", "WASH7P"),
+                   ("chr1", 17368, 17436, "ENSG00000278267.1", 0, "-", "miRNA", "MIR6859-1"),
+                   ("chr2", 38813, 46870, "ENSG00000184731.6", 0, "-", "protein_coding", "FAM110C"))
+
+def _geneNames(genes):
+    return sorted(g.geneName for g in genes)
+
+@pytest.mark.parametrize("rtree", (False, True))
+def testGencodeGeneRangeOverlap(rtree):
+    conn = sqliteOps.connect(None)
+    try:
+        tbl = GencodeGeneSqliteTable(conn, "gencodeGene", True)
+        tbl.loads(genGeneTestData)
+        tbl.index()
+        if rtree:
+            tbl.rtreeIndex()
+        assert _geneNames(tbl.getRangeOverlap("chr1", 14400, 17400)) == ["DDX11L1", "MIR6859-1", "WASH7P"]
+        assert _geneNames(tbl.getRangeOverlap("chr1", 14409, 14695)) == []
+        assert _geneNames(tbl.getRangeOverlap("chr1", 0, 100000, strand='-')) == ["MIR6859-1", "WASH7P"]
+        assert _geneNames(tbl.getRangeOverlap("chr2", None, None)) == ["FAM110C"]
+        assert list(tbl.getRangeOverlap("chr1", 17400, 17401)) == [GencodeGene(*genGeneTestData[1]),
+                                                                   GencodeGene(*genGeneTestData[2])]
+    finally:
+        conn.close()
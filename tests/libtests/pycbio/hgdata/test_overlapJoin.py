@@ -0,0 +1,91 @@
+# Copyright 2006-2026 Mark Diekhans
+import sys
+import random
+import pytest
+if __name__ == '__main__':
+    sys.path.insert(0, "../../../../lib")
+import pycbio.sys.testingSupport as ts
+from pycbio.hgdata.bed import Bed
+from pycbio.hgdata.psl import PslReader
+from pycbio.hgdata.genePred import GenePredReader
+from pycbio.hgdata.rangeFinder import RangeFinder
+from pycbio.hgdata.overlapJoin import overlapJoin, OverlapJoin, recordRange, RecordRange, OverlapJoinSortError
+
+def _randomBeds(rng, count, prefix):
+    beds = []
+    for i in range(count):
+        start = rng.randint(0, 20000)
+        end = start + rng.choice((0, rng.randint(1, 100), rng.randint(1, 3000)))
+        beds.append(Bed(rng.choice(("chr1", "chr10", "chr2")), start, end, f"{prefix}{i}", strand=rng.choice("+-")))
+    beds.sort(key=lambda b: (b.chrom, b.chromStart))
+    return beds
+
+def _bruteJoin(beds1, beds2, stranded):
+    return sorted((b1.name, b2.name) for b1 in beds1 for b2 in beds2
+                  if ((b1.chrom == b2.chrom) and (b1.chromStart < b2.chromEnd) and (b1.chromEnd > b2.chromStart)
+                      and ((not stranded) or (b1.strand == b2.strand))))
+
+@pytest.mark.parametrize("stranded", (False, True))
+def testRandomBeds(stranded):
+    rng = random.Random(11)
+    beds1 = _randomBeds(rng, 1000, "a")
+    beds2 = _randomBeds(rng, 1500, "b")
+    pairs = sorted((b1.name, b2.name) for b1, b2 in overlapJoin(beds1, beds2, stranded=stranded))
+    assert len(pairs) > 0
+    assert pairs == _bruteJoin(beds1, beds2, stranded)
+
+def _checkActiveBounded(beds1, beds2, stranded, maxActive):
+    join = OverlapJoin(beds1, beds2, stranded=stranded)
+    pairs = sorted((b1.name, b2.name) for b1, b2 in join)
+    assert pairs == sorted((b1.name, b2.name) for b1, b2 in overlapJoin(beds1, beds2, stranded=stranded))
+    assert 0 < join.peakActive <= maxActive
+
+def _nonOverlappingBeds(count, strand):
+    return [Bed("chr1", 10 * i, 10 * i + 5, f"n{i}", strand=strand) for i in range(count)]
+
+def testActiveBoundedOneSideShort():
+    # other side has a single record that overlaps every record, so the join
+    # yields on each record
+    beds = _nonOverlappingBeds(100000, "+")
+    one = [Bed("chr1", 0, 1000000, "one", strand="+")]
+    _checkActiveBounded(beds, one, False, 128)
+    _checkActiveBounded(one, beds, False, 128)
+
+def testActiveBoundedStranded():
+    # the '-' records never overlap, so they must be pruned when the '+' side advances
+    beds1 = [Bed("chr1", 10 * i, 10 * i + 5, f"a{i}", strand="+" if i % 100 == 0 else "-")
+             for i in range(100000)]
+    beds2 = [Bed("chr1", 10 * i, 10 * i + 5, f"b{i}", strand="+") for i in range(0, 100000, 100)]
+    _checkActiveBounded(beds1, beds2, True, 128)
+    _checkActiveBounded(beds2, beds1, True, 128)
+
+def testEmpty():
+    beds = [Bed("chr1", 10, 20, "a")]
+    assert list(overlapJoin([], beds)) == []
+    assert list(overlapJoin(beds, [])) == []
+
+def testUnsorted():
+    beds1 = [Bed("chr1", 10, 20, "a"), Bed("chr1", 5, 30, "b")]
+    beds2 = [Bed("chr1", 1, 20, "c")]
+    with pytest.raises(OverlapJoinSortError, match="first records are not sorted"):
+        list(overlapJoin(beds1, beds2))
+    with pytest.raises(OverlapJoinSortError, match="second records are not sorted"):
+        list(overlapJoin(beds2, beds1))
+
+def testPslGenePred(request):
+    psls = sorted(PslReader(ts.get_test_input_file(request, "pslTest.psl")), key=lambda p: (p.tName, p.tStart))
+    gps = sorted(GenePredReader(ts.get_test_input_file(request, "fileFrameStatTest.gp")), key=lambda g: (g.chrom, g.txStart))
+    rf = RangeFinder()
+    for gp in gps:
+        rf.add(gp.chrom, gp.txStart, gp.txEnd, gp)
+    expect = sorted((psl.qName, gp.name) for psl in psls
+                    for gp in rf.overlapping(psl.tName, psl.tStart, psl.tEnd))
+    pairs = sorted((psl.qName, gp.name) for psl, gp in overlapJoin(psls, gps))
+    assert pairs == expect
+
+def testRecordRange():
+    with pytest.raises(TypeError):
+        recordRange("chr1:10-20")
+    beds = [Bed("chr1", 10, 20, "a")]
+    ranges = [("chr1", 15, 16)]
+    assert list(overlapJoin(beds, ranges, rangeFunc2=lambda r: RecordRange(*r, None))) == [(beds[0], ranges[0])]
@@ -5,7 +5,7 @@ if __name__ == '__main__':
     sys.path.insert(0, "../../../../lib")
 import pycbio.sys.testingSupport as ts
 from pycbio.sys import fileOps
-from pycbio.hgdata.psl import Psl, PslTbl, pslFromCigar, pslFromPysam, reverseCoords, reverseStrand, dropQueryUniq
+from pycbio.hgdata.psl import Psl, PslTbl, PslReader, pslFromCigar, pslFromPysam, reverseCoords, reverseStrand, dropQueryUniq
 
 # test data as a string (ps = psl string)
 
@@ -51,6 +51,31 @@ def testPslXCdsGenome(request):
             assert len(blk.qSeq) == len(blk)
             assert len(blk.tSeq) == len(blk)
 
+def testLazyBlocks(request):
+    for fname in ("pslTest.psl", "refseq.hg19.prot-genome.pslx"):
+        inPsl = ts.get_test_input_file(request, fname)
+        lazyPsls = list(PslReader(inPsl, lazyBlocks=True))
+        eagerPsls = list(PslReader(inPsl))
+        # toRow and blockCount don't need to decode the blocks
+        assert [p.toRow() for p in lazyPsls] == [p.toRow() for p in eagerPsls]
+        assert [p.blockCount for p in lazyPsls] == [p.blockCount for p in eagerPsls]
+        assert all(p._rawBlocks is not None for p in lazyPsls)
+        assert lazyPsls == eagerPsls
+        assert all(p._rawBlocks is None for p in lazyPsls)
+        assert lazyPsls[0].blocks[0].psl is lazyPsls[0]
+
+def testParallelRead(request):
+    inPsl = ts.get_test_input_file(request, "refseq.hg19.prot-genome.pslx")
+    psls = list(PslReader(inPsl))
+    assert list(PslReader(inPsl, workers=2)) == psls
+    assert list(PslReader(inPsl, lazyBlocks=True, workers=2)) == psls
+
+def testLazyBlocksModify():
+    psl = Psl.fromRow(psPos.split("\t"), lazyBlocks=True)
+    psl.addBlock(700, 48454200, 10)
+    assert psl.blockCount == 5
+    assert psl.blocks[3].qStart == 74
+
 def _rcTest(psIn, psExpect):
     assert str(splitToPsl(psIn).reverseComplement()) == psExpect
 
@@ -137,6 +162,12 @@ def testOntSam(request):
             pslFromCigar(*args).write(fh)
     ts.diff_results_expected(request, ".psl")
 
+def testOntSamLazy(request):
+    with open(ts.get_test_output_file(request, ".psl"), 'w') as fh:
+        for args in samReader(ts.get_test_input_file(request, "ont-rna.sam")):
+            pslFromCigar(*args, lazyBlocks=True).write(fh)
+    ts.diff_results_expected(request, ".psl", expect_basename="test_psl.py::testOntSam")
+
 def testMultiMapSam(request):
     # use pysam
     # contains supplemental reads
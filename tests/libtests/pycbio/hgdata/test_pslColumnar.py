@@ -0,0 +1,82 @@
+# Copyright 2006-2026 Mark Diekhans
+import sys
+import io
+import pytest
+if __name__ == '__main__':
+    sys.path.insert(0, "../../../../lib")
+import pycbio.sys.testingSupport as ts
+from pycbio import PycbioException
+from pycbio.hgdata.psl import Psl, PslTbl
+from pycbio.hgdata.pslColumnar import PslColumnarTable
+
+def _loadBoth(request, fname):
+    inPsl = ts.get_test_input_file(request, fname)
+    return PslColumnarTable.fromFile(inPsl), PslTbl(inPsl)
+
+def testLoad(request):
+    tbl, pslTbl = _loadBoth(request, "pslTest.psl")
+    assert len(tbl) == len(pslTbl) == 14
+    assert tbl.blockCount(1) == 13
+    assert tbl.qName[1] == "NM_198943.1"
+    for i in range(len(tbl)):
+        assert tbl[i] == pslTbl[i]
+    assert tbl[-1] == pslTbl[-1]
+    with pytest.raises(IndexError):
+        tbl[len(tbl)]
+
+def testPslx(request):
+    tbl, pslTbl = _loadBoth(request, "refseq.hg19.prot-genome.pslx")
+    assert tbl.haveSeqs
+    assert list(tbl) == list(pslTbl)
+
+def testFromPsls(request):
+    _, pslTbl = _loadBoth(request, "pslTest.psl")
+    tbl = PslColumnarTable.fromPsls(pslTbl)
+    assert list(tbl) == list(pslTbl)
+
+def testWrite(request):
+    inPsl = ts.get_test_input_file(request, "pslTest.psl")
+    tbl = PslColumnarTable.fromFile(inPsl)
+    fh = io.StringIO()
+    tbl.write(fh)
+    expect = io.StringIO()
+    for psl in PslTbl(inPsl):
+        psl.write(expect)
+    assert fh.getvalue() == expect.getvalue()
+
+def testFilter(request):
+    tbl, pslTbl = _loadBoth(request, "pslTest.psl")
+    for ident, qCover in ((0.995, None), (None, 0.99), (0.995, 0.95)):
+        filtered = tbl.filter(minIdentity=ident, minQCover=qCover)
+        expect = [p for p in pslTbl
+                  if ((ident is None) or (p.identity() >= ident)) and ((qCover is None) or (p.qCover >= qCover))]
+        assert 0 < len(filtered) < len(tbl)
+        assert list(filtered) == expect
+
+def testCoversZeroSize(request):
+    tbl, pslTbl = _loadBoth(request, "pslTest.psl")
+    tbl.qSize[0] = 0
+    tbl.tSize[1] = 0
+    qCovers = tbl.qCovers()
+    tCovers = tbl.tCovers()
+    assert qCovers[0] == tbl[0].qCover == 0.0
+    assert tCovers[1] == tbl[1].tCover == 0.0
+    assert qCovers[2] == pslTbl[2].qCover
+    assert tCovers[2] == pslTbl[2].tCover
+
+def testSort(request):
+    tbl, pslTbl = _loadBoth(request, "pslTest.psl")
+    assert list(tbl.sortByTarget()) == sorted(pslTbl, key=Psl.targetKey)
+    assert list(tbl.sortByQuery()) == sorted(pslTbl, key=Psl.queryKey)
+
+def testSlice(request):
+    tbl, pslTbl = _loadBoth(request, "pslTest.psl")
+    assert list(tbl[2:5]) == pslTbl[2:5]
+
+def testBadRow(request):
+    tbl = PslColumnarTable()
+    row = "0	10	111	0	1	13	3	344548	+	NM_025031.1	664	21	155	chr22	49554710	48109515	48454184	4	17,11,12,	21,38,49,74,	48109515,48109533,48453547,48454103,".split("\t")
+    with pytest.raises(PycbioException, match="blockCount"):
+        tbl.appendRow(row)
+    assert len(tbl) == 0
+    assert len(tbl.blockSizes) == 0
@@ -1,9 +1,12 @@
 # Copyright 2006-2026 Mark Diekhans
 import sys
+import random
+import pytest
 if __name__ == '__main__':
     sys.path.insert(0, "../../../../lib")
 from pycbio.hgdata.psl import Psl
-from pycbio.hgdata.pslMap import PslMap
+from pycbio import PycbioDataError
+from pycbio.hgdata.pslMap import PslMap, pslMapPsl, pslMapPsls
 
 
 ##
@@ -196,3 +199,130 @@ def testQ2TFullQueryMap():
             ('gap', None, 4506, 4569, None, '-', 38013637, None, None, None, '+'),
             ('gap', None, 4569, 4787, None, '-', 38013637, None, None, None, '+'),
             ('gap', None, 4787, 5002, None, '-', 38013637, None, None, None, '+')) == tuple(got)
+
+def _expectBatch(mapFunc, starts, ends, strand):
+    "expected batch results from the generator, as tuples"
+    expect = []
+    for i in range(len(starts)):
+        for m in mapFunc(starts[i], ends[i], strand):
+            if m.isAligned:
+                expect.append((i, m.qStart, m.qEnd, m.tStart, m.tEnd))
+    return expect
+
+def _batchToTuples(res):
+    return list(zip(res.rangeIdxs, res.qStarts, res.qEnds, res.tStarts, res.tEnds))
+
+def _randomRanges(rng, minPos, maxPos, count):
+    starts = sorted(rng.randint(minPos, maxPos) for _ in range(count))
+    ends = [s + rng.choice((0, rng.randint(1, 50), rng.randint(1, 100000))) for s in starts]
+    return starts, ends
+
+@pytest.mark.parametrize("mapPsl", (_pslPosMRna, _pslDoubleDel1, _pslNegMrna, _pslAugustusBlat))
+@pytest.mark.parametrize("strand", ('+', '-'))
+def testT2QBatch(mapPsl, strand):
+    rng = random.Random(1)
+    mapper = PslMap(mapPsl)
+    starts, ends = _randomRanges(rng, mapPsl.tStart - 1000, mapPsl.tEnd, 500)
+    if strand != mapPsl.tStrand:
+        starts, ends = [mapPsl.tSize - e for e in ends], [mapPsl.tSize - s for s in starts]
+    res = mapper.targetToQueryMapBatch(starts, ends, strand)
+    assert len(res) > 0
+    assert _batchToTuples(res) == _expectBatch(mapper.targetToQueryMap, starts, ends, strand)
+
+@pytest.mark.parametrize("mapPsl", (_pslPosMRna, _pslDoubleDel1, _pslNegMrna, _pslAugustusBlat))
+@pytest.mark.parametrize("strand", ('+', '-'))
+def testQ2TBatch(mapPsl, strand):
+    rng = random.Random(2)
+    mapper = PslMap(mapPsl)
+    starts, ends = _randomRanges(rng, 0, mapPsl.qSize, 500)
+    ends = [min(e, mapPsl.qSize) for e in ends]
+    res = mapper.queryToTargetMapBatch(starts, ends, strand)
+    assert len(res) > 0
+    assert _batchToTuples(res) == _expectBatch(mapper.queryToTargetMap, starts, ends, strand)
+
+def testBatchUnsorted():
+    rng = random.Random(3)
+    mapper = PslMap(_pslPosMRna)
+    starts, ends = _randomRanges(rng, 0, _pslPosMRna.qSize, 200)
+    rngs = list(zip(starts, ends))
+    rng.shuffle(rngs)
+    starts, ends = [r[0] for r in rngs], [r[1] for r in rngs]
+    res = mapper.queryToTargetMapBatch(starts, ends)
+    assert _batchToTuples(res) == _expectBatch(mapper.queryToTargetMap, starts, ends, '+')
+
+def testBatchBadArrays():
+    with pytest.raises(ValueError, match="different lengths"):
+        PslMap(_pslPosMRna).targetToQueryMapBatch([1, 2], [3])
+
+##
+# PSL to PSL mapping
+##
+def _randomPsl(rng, qName, qSize, tName, tSize, strand):
+    psl = Psl.create(qName=qName, qSize=qSize, tName=tName, tSize=tSize, strand=strand)
+    qNext, tNext = rng.randint(0, 50), rng.randint(0, 50)
+    while True:
+        size = rng.randint(1, 60)
+        if (qNext + size > qSize) or (tNext + size > tSize):
+            break
+        psl.addBlock(qNext, tNext, size)
+        qNext += size + rng.choice((0, rng.randint(1, 30)))
+        tNext += size + rng.choice((0, rng.randint(1, 30)))
+    psl.updateBounds()
+    psl.updateCounts()
+    return psl
+
+def _alignedPairs(psl):
+    "set of aligned (qPos, tPos), in positive strand coordinates"
+    pairs = set()
+    for blk in psl.blocks:
+        for i in range(blk.size):
+            qPos, tPos = blk.qStart + i, blk.tStart + i
+            if psl.qStrand == '-':
+                qPos = psl.qSize - 1 - qPos
+            if psl.tStrand == '-':
+                tPos = psl.tSize - 1 - tPos
+            pairs.add((qPos, tPos))
+    return pairs
+
+def _composePairs(inPsl, mapPsl):
+    bToC = {}
+    for b, c in _alignedPairs(mapPsl):
+        bToC[b] = c
+    return {(a, bToC[b]) for a, b in _alignedPairs(inPsl) if b in bToC}
+
+def _checkMapped(inPsl, mapPsl, outPsl):
+    expect = _composePairs(inPsl, mapPsl)
+    if len(expect) == 0:
+        assert outPsl is None
+    else:
+        assert (outPsl.qName, outPsl.tName) == (inPsl.qName, mapPsl.tName)
+        assert outPsl.match == len(expect)
+        assert _alignedPairs(outPsl) == expect
+        # must be a valid PSL that will parse
+        assert Psl.fromRow(outPsl.toRow()) == outPsl
+
+@pytest.mark.parametrize("inStrand", ('+', '-', '++', '-+', '+-', '--'))
+@pytest.mark.parametrize("mapStrand", ('+', '-', '++', '+-', '--'))
+def testPslMapPsl(inStrand, mapStrand):
+    rng = random.Random(inStrand + mapStrand)
+    for i in range(20):
+        inPsl = _randomPsl(rng, "A", 1000, "B", 1200, inStrand)
+        mapPsl = _randomPsl(rng, "B", 1200, "C", 1100, mapStrand)
+        _checkMapped(inPsl, mapPsl, pslMapPsl(inPsl, mapPsl))
+
+def testPslMapPslMismatch():
+    with pytest.raises(PycbioDataError, match="does not match"):
+        pslMapPsl(_pslPosMRna, _pslNegMrna)
+
+def testPslMapPsls():
+    rng = random.Random(4)
+    mapPsls = [_randomPsl(rng, f"B{i}", 1200, f"C{i}", 1100, rng.choice('+-')) for i in range(5)]
+    mapPsls.append(_randomPsl(rng, "B0", 1200, "C9", 1500, '+'))
+    inPsls = [_randomPsl(rng, f"A{i}", 1000, f"B{rng.randint(0, 6)}", 1200, rng.choice('+-'))
+              for i in range(200)]
+    expect = [pslMapPsl(inPsl, mapPsl) for inPsl in inPsls
+              for mapPsl in mapPsls if mapPsl.qName == inPsl.tName]
+    expect = [psl for psl in expect if psl is not None]
+    assert len(expect) > 0
+    assert list(pslMapPsls(inPsls, mapPsls)) == expect
+    assert list(pslMapPsls(inPsls, mapPsls, workers=2, chunkSize=7)) == expect
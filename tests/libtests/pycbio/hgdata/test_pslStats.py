@@ -3,7 +3,7 @@ import sys
 if __name__ == '__main__':
     sys.path.insert(0, "../../../../lib")
 import pycbio.sys.testingSupport as ts
-from pycbio.hgdata.pslStats import PslStats, PslStatsType
+from pycbio.hgdata.pslStats import PslStats, PslStatsType, pslStatsLoadColumns
 
 def testPslAlignStats(request):
     pslStats = PslStats(ts.get_test_input_file(request, "align.pslstats"))
@@ -28,3 +28,14 @@ def testPslOverallStats(request):
     overall = pslStats[0]
     assert overall.queryCnt == 13
     assert overall.minQSize == 664
+
+def testPslAlignStatsColumns(request):
+    inFile = ts.get_test_input_file(request, "align.pslstats")
+    pslStats = PslStats(inFile)
+    cols = pslStatsLoadColumns(inFile)
+    assert list(cols.keys()) == pslStats.columns
+    assert list(cols["ident"]) == [ps.ident for ps in pslStats]
+    assert cols["qName"] == [ps.qName for ps in pslStats]
+    cols = pslStatsLoadColumns(inFile, select=("qCover", "qSize"))
+    assert list(cols.keys()) == ["qCover", "qSize"]
+    assert list(cols["qSize"]) == [ps.qSize for ps in pslStats]
@@ -1,8 +1,10 @@
 # Copyright 2006-2026 Mark Diekhans
 import sys
+import random
+import pytest
 if __name__ == '__main__':
     sys.path.insert(0, "../../../../lib")
-from pycbio.hgdata.rangeFinder import RangeFinder, calcBin, getOverlappingBins
+from pycbio.hgdata.rangeFinder import RangeFinder, RangeFinderEngine, calcBin, getOverlappingBins
 from collections import namedtuple
 
 # test data and query types
@@ -68,8 +70,12 @@ def dataMergeFunc(values):
     value = ",".join(sorted(vals))
     return Data(seqIds[0], start, end, strand, value)
 
-def mkRangeFinder(data, useStrand):
-    rf = RangeFinder()
+@pytest.fixture(params=[RangeFinderEngine.bins, RangeFinderEngine.nclist], ids=str)
+def engine(request):
+    return request.param
+
+def mkRangeFinder(data, useStrand, engine=RangeFinderEngine.bins):
+    rf = RangeFinder(engine=engine)
     for row in data:
         if useStrand:
             rf.add(row.seqId, row.start, row.end, row.value, row.strand)
@@ -103,29 +109,29 @@ def doQueries(rf, queries, useStrand):
         else:
             doNoStrandQuery(rf, query)
 
-def testOverlapStrand():
+def testOverlapStrand(engine):
     "stranded queries of have-strand RangeFinder"
-    rf = mkRangeFinder(data1, True)
+    rf = mkRangeFinder(data1, True, engine)
     doQueries(rf, queries1, True)
 
-def testOverlapStrandNoStrand():
+def testOverlapStrandNoStrand(engine):
     "stranded queries of no-strand RangeFinder"
-    rf = mkRangeFinder(data1, False)
+    rf = mkRangeFinder(data1, False, engine)
     doQueries(rf, queries1, True)
 
-def testOverlapNoStrand():
+def testOverlapNoStrand(engine):
     "no-stranded queries of no-strand RangeFinder"
-    rf = mkRangeFinder(data1, False)
+    rf = mkRangeFinder(data1, False, engine)
     doQueries(rf, queries1, False)
 
-def testOverlapNoStrandStrand():
+def testOverlapNoStrandStrand(engine):
     "no-stranded queries of have-strand RangeFinder"
-    rf = mkRangeFinder(data1, True)
+    rf = mkRangeFinder(data1, True, engine)
     doQueries(rf, queries1, False)
 
-def testExactRange():
+def testExactRange(engine):
     "exact range matches"
-    rf = mkRangeFinder(data2, True)
+    rf = mkRangeFinder(data2, True, engine)
     doQueries(rf, queries2, True)
     doQueries(rf, queries2, False)
 
@@ -135,18 +141,18 @@ def testValues():
     vals = sorted(rf.values())
     assert ['val1.1', 'val1.2', 'val1.3', 'val1.4', 'val1.5', 'val1.6'] == vals
 
-def testRemoveNoStrand():
+def testRemoveNoStrand(engine):
     "exact range matches"
-    rf = mkRangeFinder(data1, False)
+    rf = mkRangeFinder(data1, False, engine)
     ent = data1[1]  # val1.2
     rf.remove(ent.seqId, ent.start, ent.end, ent.value)
     left = sorted(rf.values())
     expect = ['val1.1', 'val1.3', 'val1.4', 'val1.5', 'val1.6']
     assert left == expect
 
-def testRemoveStrand():
+def testRemoveStrand(engine):
     "exact range matches"
-    rf = mkRangeFinder(data1, False)
+    rf = mkRangeFinder(data1, False, engine)
     ent = data1[1]  # val1.2
     rf.remove(ent.seqId, ent.start, ent.end, ent.value, ent.strand)
     left = sorted(rf.values())
@@ -175,8 +181,8 @@ def testGetSeqRangeNoStrand():
     assert rf.getSeqRange("chr55") == (None, None)
     assert rf.getSeqRange("chr55", '-') == (None, None)
 
-def mkRangeFinderMerge(data, useStrand):
-    rf = RangeFinder(mergeFunc=dataMergeFunc)
+def mkRangeFinderMerge(data, useStrand, engine=RangeFinderEngine.bins):
+    rf = RangeFinder(mergeFunc=dataMergeFunc, engine=engine)
     for row in data:
         if useStrand:
             rf.addMerge(row.seqId, row.start, row.end, row, row.strand)
@@ -184,8 +190,8 @@ def mkRangeFinderMerge(data, useStrand):
             rf.addMerge(row.seqId, row.start, row.end, row)
     return rf
 
-def testMergerStrand1():
-    rf = mkRangeFinderMerge(data1, True)
+def testMergerStrand1(engine):
+    rf = mkRangeFinderMerge(data1, True, engine)
     values = sorted(rf.values())
     assert values == [
         Data(seqId='chr12', start=100, end=500, strand='-', value='val1.3'),
@@ -195,8 +201,8 @@ def testMergerStrand1():
         Data(seqId='chr32', start=1000000000, end=2000000000, strand='+', value='val1.5')
     ]
 
-def testMergerNoStrand1():
-    rf = mkRangeFinderMerge(data1, False)
+def testMergerNoStrand1(engine):
+    rf = mkRangeFinderMerge(data1, False, engine)
     values = sorted(rf.values())
     assert values == [
         Data(seqId='chr12', start=100, end=10000, strand='+,-', value='val1.2,val1.3,val1.4'),
@@ -204,8 +210,8 @@ def testMergerNoStrand1():
         Data(seqId='chr32', start=100000, end=2000000000, strand='+,-', value='val1.5,val1.6')
     ]
 
-def testMergerStrand3():
-    rf = mkRangeFinderMerge(data3, True)
+def testMergerStrand3(engine):
+    rf = mkRangeFinderMerge(data3, True, engine)
     values = sorted(rf.values())
     assert values == [
         Data(seqId='chr12', start=100, end=500, strand='-', value='val1.3'),
@@ -214,8 +220,8 @@ def testMergerStrand3():
         Data(seqId='chr12', start=1000000000, end=2000000000, strand='+', value='val1.5')
     ]
 
-def testMergerNoStrand3():
-    rf = mkRangeFinderMerge(data3, False)
+def testMergerNoStrand3(engine):
+    rf = mkRangeFinderMerge(data3, False, engine)
     values = sorted(rf.values())
     assert values == [
         Data(seqId='chr12', start=100, end=10000, strand='+,-', value='val1.1,val1.2,val1.3,val1.4'),
@@ -266,9 +272,67 @@ def testOverlappingEntries():
     assert entries[0].start == 100
     assert entries[0].end == 1000
 
-def testOverlappingEntriesNoStrand():
+def testOverlappingEntriesNoStrand(engine):
     """Test RangeFinder.overlappingEntries without strand"""
-    rf = mkRangeFinder(data1, False)
+    rf = mkRangeFinder(data1, False, engine)
     entries = list(rf.overlappingEntries("chr12", 100, 200, None))
     values = sorted([e.value for e in entries])
     assert values == ["val1.2", "val1.3", "val1.4"]
+
+def testEnginesRandom(engine):
+    "compare engines on dense random data with many nested and long entries"
+    rng = random.Random(42)
+    rfBins = RangeFinder()
+    rfTest = RangeFinder(engine=engine)
+    for i in range(2000):
+        start = rng.randint(0, 100000)
+        end = start + rng.choice((0, 1, rng.randint(1, 500), rng.randint(1, 50000)))
+        strand = rng.choice(('+', '-'))
+        rfBins.add("chr1", start, end, i, strand)
+        rfTest.add("chr1", start, end, i, strand)
+    for i in range(0, 2000, 7):
+        # remove some, forcing a rebuild
+        ent = next(rfBins.overlappingEntries("chr1", 0, 200000))
+        rfBins.remove("chr1", ent.start, ent.end, ent.value)
+        rfTest.remove("chr1", ent.start, ent.end, ent.value)
+    for i in range(500):
+        start = rng.randint(0, 110000)
+        end = start + rng.randint(1, 2000)
+        strand = rng.choice(('+', '-', None))
+        assert (sorted(rfTest.overlapping("chr1", start, end, strand))
+                == sorted(rfBins.overlapping("chr1", start, end, strand)))
+
+def _batchExpected(rf, queries, withStrand):
+    expect = []
+    for iQuery, query in enumerate(queries):
+        strand = query.strand if withStrand else None
+        for entry in sorted(rf.overlappingEntries(query.seqId, query.start, query.end, strand)):
+            expect.append((iQuery, entry))
+    return expect
+
+def _batchQuery(rf, queries, withStrand):
+    strands = [q.strand for q in queries] if withStrand else None
+    queryIdxs, entries = rf.overlappingBatch([q.seqId for q in queries], [q.start for q in queries],
+                                             [q.end for q in queries], strands)
+    assert len(queryIdxs) == len(entries)
+    return sorted(zip(queryIdxs, entries))
+
+def testOverlappingBatch(engine):
+    for useStrand in (True, False):
+        rf = mkRangeFinder(data1, useStrand, engine)
+        for withStrand in (True, False):
+            assert _batchQuery(rf, queries1, withStrand) == _batchExpected(rf, queries1, withStrand)
+
+def testOverlappingBatchRandom():
+    rng = random.Random(7)
+    rf = RangeFinder()
+    for i in range(3000):
+        start = rng.randint(0, 100000)
+        rf.add(rng.choice(("chr1", "chr2")), start, start + rng.choice((0, rng.randint(1, 500), rng.randint(1, 30000))), i, rng.choice("+-"))
+    queries = []
+    for i in range(1000):
+        start = rng.randint(0, 110000)
+        queries.append(Query(rng.choice(("chr1", "chr2", "chr3")), start, start + rng.choice((0, rng.randint(1, 3000))),
+                             rng.choice("+-"), None, None))
+    for withStrand in (True, False):
+        assert _batchQuery(rf, queries, withStrand) == _batchExpected(rf, queries, withStrand)
@@ -0,0 +1,68 @@
+# Copyright 2006-2026 Mark Diekhans
+import sys
+import random
+import pytest
+if __name__ == '__main__':
+    sys.path.insert(0, "../../../../lib")
+import pycbio.sys.testingSupport as ts
+from pycbio.hgdata.bed import Bed, BedBlock
+from pycbio.hgdata.coords import Coords
+from pycbio.hgdata.twoBit import write_two_bit
+from pycbio.hgdata.genome import genome_factory
+from pycbio.hgdata.spliceJunctions import (SJCategory, classify_junc, classify_introns, bed_introns,
+                                           get_junc)
+
+def _write_genome(request):
+    rng = random.Random(8)
+    two_bit = ts.get_test_output_file(request, ".2bit")
+    write_two_bit(two_bit, [(chrom, "".join(rng.choice("ACGTacgt") for _ in range(20000)))
+                            for chrom in ("chr1", "chr2", "chr3")])
+    return two_bit
+
+def _random_introns(count):
+    rng = random.Random(9)
+    introns = []
+    for _ in range(count):
+        start = rng.randint(0, 19000)
+        introns.append((rng.choice(("chr1", "chr2", "chr3")), start, start + rng.randint(10, 999), rng.choice("+-")))
+    return introns + introns[0:count // 4]
+
+def test_classify_junc():
+    assert classify_junc("GT/AG", 100) == SJCategory.STD
+    assert classify_junc("CT/AC", 100) == SJCategory.STD_RC
+    assert classify_junc("GC/AG", 100) == SJCategory.RARE
+    assert classify_junc("AT/AC", 100) == SJCategory.U12
+    assert classify_junc("AA/AA", 100) == SJCategory.UNKNOWN
+    assert classify_junc("GT/AG", 10) == SJCategory.GAP
+
+def test_bed_introns():
+    bed = Bed("chr1", 100, 1000, "t1", strand="-",
+              blocks=[BedBlock(100, 200), BedBlock(300, 400), BedBlock(900, 1000)])
+    assert list(bed_introns(bed)) == [("chr1", 200, 300, "-"), ("chr1", 400, 900, "-")]
+
+@pytest.mark.parametrize("threads", (1, 3))
+def test_classify_introns(request, threads):
+    two_bit = _write_genome(request)
+    genome = genome_factory(two_bit)
+    introns = _random_introns(500)
+    intron_cats = classify_introns(two_bit if threads > 1 else genome, introns, threads=threads)
+    assert len(intron_cats) == len(set(introns))
+    assert intron_cats == sorted(intron_cats, key=lambda ic: (ic.coords.name, ic.coords.start, ic.coords.end, ic.strand))
+    for intron_cat in intron_cats:
+        coords = intron_cat.coords
+        junc = get_junc(genome, coords, intron_cat.strand)
+        assert intron_cat.junc == junc
+        assert intron_cat.cat == classify_junc(junc, len(coords))
+
+def test_classify_threads_requires_file(request):
+    genome = genome_factory(_write_genome(request))
+    with pytest.raises(ValueError, match="requires a genome file"):
+        classify_introns(genome, [("chr1", 10, 100, "+")], threads=2)
+
+def test_classify_known(request):
+    two_bit = ts.get_test_output_file(request, ".2bit")
+    write_two_bit(two_bit, [("chr1", 20 * "A" + "GT" + 40 * "C" + "AG" + 20 * "A")])
+    intron_cats = classify_introns(two_bit, [("chr1", 20, 64, "+"), ("chr1", 20, 64, "-")])
+    assert [(ic.coords, ic.strand, ic.junc, ic.cat) for ic in intron_cats] == [
+        (Coords("chr1", 20, 64), "+", "GT/AG", SJCategory.STD),
+        (Coords("chr1", 20, 64), "-", "CT/AC", SJCategory.STD_RC)]
@@ -0,0 +1,65 @@
+# Copyright 2006-2026 Mark Diekhans
+import sys
+import random
+import pytest
+if __name__ == '__main__':
+    sys.path.insert(0, "../../../../lib")
+import pycbio.sys.testingSupport as ts
+from pycbio.hgdata.twoBit import TwoBitReader, TwoBitError, write_two_bit
+
+def _random_seqs(count):
+    rng = random.Random(17)
+    seqs = []
+    for i in range(count):
+        parts = []
+        while sum(len(p) for p in parts) < 3000:
+            parts.append(rng.choice("ACGTacgtNn") * rng.randint(1, 40))
+        seqs.append((f"seq{i}", "".join(parts)))
+    return seqs
+
+def _write_random(request, count=5):
+    seqs = _random_seqs(count)
+    two_bit = ts.get_test_output_file(request, ".2bit")
+    write_two_bit(two_bit, seqs)
+    return two_bit, seqs
+
+def test_read(request):
+    two_bit, seqs = _write_random(request)
+    rng = random.Random(3)
+    with TwoBitReader(two_bit) as tbr:
+        assert tbr.get_seq_ids() == [name for name, _ in seqs]
+        for name, seq in seqs:
+            assert tbr.get_seq_length(name) == len(seq)
+            assert tbr.get_seq(name) == seq
+            for _ in range(100):
+                start = rng.randint(0, len(seq))
+                end = rng.randint(start, len(seq))
+                assert tbr.get_seq(name, start, end) == seq[start:end]
+
+def test_masking(request):
+    two_bit = ts.get_test_output_file(request, ".2bit")
+    write_two_bit(two_bit, [("s1", "ACGTacgtNNnnACG")])
+    with TwoBitReader(two_bit) as tbr:
+        assert tbr.get_seq("s1") == "ACGTacgtNNnnACG"
+        assert tbr.get_seq("s1", 3, 11) == "TacgtNNn"
+        assert tbr.get_seq("s1", 3, 11, mask=False) == "TACGTNNN"
+        assert tbr.get_seq("s1", 5, 5) == ""
+
+def test_errors(request):
+    two_bit, seqs = _write_random(request, 1)
+    with TwoBitReader(two_bit) as tbr:
+        with pytest.raises(TwoBitError, match="sequence not found"):
+            tbr.get_seq("chrX")
+        with pytest.raises(TwoBitError, match="invalid range"):
+            tbr.get_seq("seq0", 0, len(seqs[0][1]) + 1)
+    with pytest.raises(TwoBitError, match="not a two-bit file"):
+        TwoBitReader(ts.get_test_input_file(request, "ncbi.fa"))
+
+def test_twobitreader_compat(request):
+    twobitreader = pytest.importorskip("twobitreader")
+    two_bit, seqs = _write_random(request)
+    tbf = twobitreader.TwoBitFile(two_bit)
+    with TwoBitReader(two_bit) as tbr:
+        for name, seq in seqs:
+            assert tbr.get_seq(name) == str(tbf[name])
+            assert tbr.get_seq(name, 7, 1001) == tbf[name][7:1001]
@@ -0,0 +1,56 @@
+# Copyright 2006-2026 Mark Diekhans
+import sys
+import gzip
+import pytest
+if __name__ == '__main__':
+    sys.path.insert(0, "../../../../lib")
+import pycbio.sys.testingSupport as ts
+from pycbio.sys import bgzf
+
+def _testData():
+    return "".join([f"line {i}\t{i * i}\n" for i in range(20000)]).encode()
+
+def testWriteRead(request):
+    data = _testData()
+    outf = ts.get_test_output_file(request, ".gz")
+    bgzf.writeFile(outf, data)
+    assert bgzf.isBgzf(outf)
+    with gzip.open(outf, "rb") as fh:
+        assert fh.read() == data
+    with open(outf, "rb") as fh:
+        groups = list(bgzf.readBlockGroups(fh, 50000))
+    assert len(groups) > 1
+    assert b"".join([bgzf.decompressBlocks(g) for g in groups]) == data
+
+def testNotBgzf(request):
+    outf = ts.get_test_output_file(request, ".gz")
+    with gzip.open(outf, "wb") as fh:
+        fh.write(_testData())
+    assert not bgzf.isBgzf(outf)
+    with open(outf, "rb") as fh:
+        with pytest.raises(bgzf.BgzfError, match="invalid BGZF block header"):
+            bgzf.readBlock(fh)
+
+def testReaderSeek(request):
+    lines = [f"line {i}\t{'x' * (i % 300)}\n".encode() for i in range(20000)]
+    outf = ts.get_test_output_file(request, ".bgz")
+    bgzf.writeFile(outf, b"".join(lines))
+    index = []
+    with bgzf.BgzfReader(outf) as rdr:
+        while True:
+            voff = rdr.tell()
+            line = rdr.readline()
+            if len(line) == 0:
+                break
+            index.append(voff)
+        assert rdr.read() == b""
+        assert len(set(bgzf.splitVirtualOffset(v)[0] for v in index)) > 10
+        for i in (19999, 0, 7777, 7778, 5):
+            rdr.seek(index[i])
+            assert rdr.readline() == lines[i]
+        rdr.seek(index[100])
+        assert rdr.read(sum(len(line) for line in lines[100:3000])) == b"".join(lines[100:3000])
+        rdr.seek(index[0])
+        assert list(rdr) == lines
+        with pytest.raises(bgzf.BgzfError, match="invalid virtual offset"):
+            rdr.seek(bgzf.makeVirtualOffset(0, 0xffff))
@@ -0,0 +1,63 @@
+# Copyright 2006-2026 Mark Diekhans
+import sys
+import os
+import random
+import functools
+import pytest
+if __name__ == '__main__':
+    sys.path.insert(0, "../../../../lib")
+from pycbio import PycbioException
+from pycbio.sys.externalSort import externalSort
+from pycbio.hgdata.bed import Bed
+
+
+def _recToRow(rec):
+    return [rec[0], rec[1]]
+
+def _rowToRec(row):
+    return (row[0], int(row[1]))
+
+def _recKey(rec):
+    return rec[1]
+
+def _randomRecs(num):
+    rng = random.Random(42)
+    return [(f"r{i}", rng.randint(0, num // 4)) for i in range(num)]
+
+def _sort(recs, tmp_path, **kwargs):
+    return list(externalSort(iter(recs), _recKey, _recToRow, _rowToRec, tmpDir=tmp_path, **kwargs))
+
+def testInMemory(tmp_path):
+    recs = _randomRecs(100)
+    assert _sort(recs, tmp_path) == sorted(recs, key=_recKey)
+    assert os.listdir(tmp_path) == []
+
+def testEmpty(tmp_path):
+    assert _sort([], tmp_path, maxRecords=2) == []
+
+@pytest.mark.parametrize("maxRecords,maxMerge", [(1, 64), (7, 64), (100, 64), (10, 3), (1, 2)])
+def testRuns(tmp_path, maxRecords, maxMerge):
+    # stable, so ties stay in input order
+    recs = _randomRecs(250)
+    assert _sort(recs, tmp_path, maxRecords=maxRecords, maxMerge=maxMerge) == sorted(recs, key=_recKey)
+    assert os.listdir(tmp_path) == []
+
+def testClosedEarly(tmp_path):
+    recs = _randomRecs(100)
+    sortedRecs = externalSort(iter(recs), _recKey, _recToRow, _rowToRec, maxRecords=10, tmpDir=tmp_path)
+    next(sortedRecs)
+    assert len(os.listdir(tmp_path)) == 1
+    sortedRecs.close()
+    assert os.listdir(tmp_path) == []
+
+def testBeds(tmp_path):
+    beds = [Bed("chr2", 10, 50, "a", strand="+", extraCols=["x"]),
+            Bed("chr1", 30, 40, "b", strand="-", extraCols=["y"]),
+            Bed("chr1", 5, 100, "c", strand="+", extraCols=["z"])]
+    sortedBeds = list(externalSort(iter(beds), lambda b: (b.chrom, b.start), Bed.toRow,
+                                   functools.partial(Bed.parse, numStdCols=6), maxRecords=1, tmpDir=tmp_path))
+    assert [str(b) for b in sortedBeds] == [str(beds[2]), str(beds[1]), str(beds[0])]
+
+def testBadMaxRecords(tmp_path):
+    with pytest.raises(PycbioException, match="maxRecords"):
+        _sort([], tmp_path, maxRecords=0)
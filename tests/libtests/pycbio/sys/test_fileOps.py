@@ -5,6 +5,7 @@ import sys
 import time
 import shutil
 import re
+import pytest
 from pathlib import Path
 if __name__ == '__main__':
     sys.path.insert(0, "../../../../lib")
@@ -59,6 +60,22 @@ def testOpengzReadBz2(request):
         shutil.copyfileobj(inFh, outFh)
     ts.diff_test_files(inf, outf)
 
+@pytest.mark.parametrize("ext,compress", ((".gz", "gzip"), (".bz2", "bzip2")))
+@pytest.mark.parametrize("inProcessMax", (0, None))
+def testOpengzReadInProcess(request, ext, compress, inProcessMax):
+    inf = ts.get_test_input_file(request, "simple1.txt")
+    infComp = ts.get_test_output_file(request, ".out" + ext)
+    pipettor.run((compress, "-c", inf), stdout=infComp)
+    with fileOps.opengz(infComp, inProcessMax=inProcessMax) as inFh:
+        assert isinstance(inFh, pipettor.Popen) == (inProcessMax == 0)
+        lines = inFh.readlines()
+    with open(inf) as inFh:
+        assert lines == inFh.readlines()
+    with fileOps.opengz(infComp, "rb", inProcessMax=inProcessMax) as inFh:
+        data = inFh.read()
+    with open(inf, "rb") as inFh:
+        assert data == inFh.read()
+
 def testOpengzWriteBz2(request):
     inf = ts.get_test_input_file(request, "simple1.txt")
     outf = ts.get_test_output_file(request, ".out")
@@ -0,0 +1,103 @@
+# Copyright 2006-2026 Mark Diekhans
+import sys
+import random
+import pytest
+if __name__ == '__main__':
+    sys.path.insert(0, "../../../../lib")
+from pycbio.sys.intervalSkipList import IntervalSkipList, Entry
+
+def _bruteOverlapping(entries, start, end):
+    return sorted(e for e in entries if (e.start < end) and (e.end > start))
+
+def _bruteStabbing(entries, pos):
+    return sorted(e for e in entries if e.start <= pos < e.end)
+
+def _countMarkers(isl, entry):
+    "count edge and node markers for entry by walking the list"
+    edgeCnt = nodeCnt = 0
+    x = isl.head
+    while x is not None:
+        edgeCnt += sum(1 for markers in x.markers for ival in markers if ival.entry is entry)
+        nodeCnt += sum(1 for ival in x.eqMarkers if ival.entry is entry)
+        x = x.forward[0]
+    return edgeCnt, nodeCnt
+
+def testBasic():
+    isl = IntervalSkipList(seed=1)
+    e1 = isl.add(10, 20, "e1")
+    e2 = isl.add(15, 16, "e2")
+    e3 = isl.add(19, 40, "e3")
+    assert len(isl) == 3
+    assert sorted(isl.stabbing(15)) == [e1, e2]
+    assert sorted(isl.stabbing(20)) == [e3]
+    assert isl.stabbing(9) == []
+    assert sorted(isl.overlapping(0, 11)) == [e1]
+    assert sorted(isl.overlapping(16, 19)) == [e1]
+    assert sorted(isl.overlapping(16, 20)) == [e1, e3]
+    assert isl.overlapping(40, 50) == []
+    assert isl.overlapping(15, 15) == []
+    isl.remove(e1)
+    assert sorted(isl.overlapping(0, 100)) == [e2, e3]
+    assert sorted(isl.entries()) == [e2, e3]
+
+def testDuplicates():
+    isl = IntervalSkipList(seed=1)
+    e = Entry(5, 10, "dup")
+    isl.insert(e)
+    isl.insert(e)
+    assert isl.stabbing(7) == [e, e]
+    isl.remove(e)
+    assert isl.stabbing(7) == [e]
+    isl.remove(e)
+    assert isl.stabbing(7) == []
+    with pytest.raises(ValueError):
+        isl.remove(e)
+
+def testInvalid():
+    isl = IntervalSkipList()
+    with pytest.raises(ValueError):
+        isl.add(10, 10, "empty")
+
+def testRandom():
+    "interleaved random inserts, removes and queries checked against brute force"
+    rng = random.Random(3)
+    isl = IntervalSkipList(maxLevel=12, seed=3)
+    entries = []
+    for i in range(3000):
+        op = rng.random()
+        if (op < 0.5) or (len(entries) == 0):
+            start = rng.randint(0, 5000)
+            entries.append(isl.add(start, start + rng.choice((1, rng.randint(1, 50), rng.randint(1, 2000))), i))
+        elif op < 0.75:
+            isl.remove(entries.pop(rng.randrange(len(entries))))
+        else:
+            start = rng.randint(0, 7000)
+            end = start + rng.randint(1, 300)
+            assert sorted(isl.overlapping(start, end)) == _bruteOverlapping(entries, start, end)
+            assert sorted(isl.stabbing(start)) == _bruteStabbing(entries, start)
+    assert len(isl) == len(entries)
+    for entry in list(entries):
+        isl.remove(entry)
+    assert len(isl) == 0
+    assert isl.head.forward[0] is None
+
+def testNestedMarkersBounded():
+    "markers for an interval stay O(log n) as nodes are inserted in it and removed"
+    isl = IntervalSkipList(seed=5)
+    outer = isl.add(0, 1000000, "outer")
+    inner = [isl.add(10 * i, 10 * i + 5, i) for i in range(1, 10001)]
+    edgeCnt, nodeCnt = _countMarkers(isl, outer)
+    assert edgeCnt <= 100
+    assert nodeCnt == edgeCnt + 1
+    assert sorted(isl.stabbing(50001)) == [outer, inner[4999]]
+    for entry in inner[::2]:
+        isl.remove(entry)
+    edgeCnt, nodeCnt = _countMarkers(isl, outer)
+    assert edgeCnt <= 100
+    assert sorted(isl.stabbing(49991)) == [outer]
+    assert sorted(isl.stabbing(60001)) == [outer, inner[5999]]
+    for entry in inner[1::2]:
+        isl.remove(entry)
+    assert _countMarkers(isl, outer) == (1, 2)
+    isl.remove(outer)
+    assert isl.head.forward[0] is None
@@ -0,0 +1,86 @@
+# Copyright 2006-2026 Mark Diekhans
+import sys
+import os
+if __name__ == '__main__':
+    sys.path.insert(0, "../../../../lib")
+from pycbio.sys.parseCache import ParseCache
+
+
+class _CountingParser:
+    "parse a file into a list of lines, counting the calls"
+    def __init__(self):
+        self.calls = 0
+
+    def __call__(self, path):
+        self.calls += 1
+        with open(path) as fh:
+            return fh.read().splitlines()
+
+def _mkFile(path, lines):
+    with open(path, "w") as fh:
+        fh.write("\n".join(lines) + "\n")
+    return str(path)
+
+def testLoadCached(tmp_path):
+    inFile = _mkFile(tmp_path / "in.txt", ["one", "two"])
+    cache = ParseCache(tmp_path / "cache")
+    parser = _CountingParser()
+    assert cache.load(inFile, parser, kind="lines") == ["one", "two"]
+    assert cache.load(inFile, parser, kind="lines") == ["one", "two"]
+    assert parser.calls == 1
+    # different kind is a different entry
+    assert cache.load(inFile, parser, kind="lines2") == ["one", "two"]
+    assert parser.calls == 2
+
+def testChangedFile(tmp_path):
+    inFile = _mkFile(tmp_path / "in.txt", ["one", "two"])
+    cache = ParseCache(tmp_path / "cache")
+    parser = _CountingParser()
+    cache.load(inFile, parser, kind="lines")
+    _mkFile(inFile, ["one", "two", "three"])
+    assert cache.load(inFile, parser, kind="lines") == ["one", "two", "three"]
+    assert parser.calls == 2
+
+def testEncodeDecode(tmp_path):
+    inFile = _mkFile(tmp_path / "in.txt", ["one", "two"])
+    cache = ParseCache(tmp_path / "cache")
+    parser = _CountingParser()
+
+    def load():
+        return cache.load(inFile, parser, kind="lines", encode=lambda lines: "\n".join(lines),
+                          decode=lambda data: data.split("\n"))
+    assert load() == ["one", "two"]
+    assert load() == ["one", "two"]
+    assert parser.calls == 1
+
+def testCorruptEntry(tmp_path):
+    inFile = _mkFile(tmp_path / "in.txt", ["one", "two"])
+    cache = ParseCache(tmp_path / "cache")
+    parser = _CountingParser()
+    cache.load(inFile, parser, kind="lines")
+    for entry in os.listdir(cache.cacheDir):
+        with open(os.path.join(cache.cacheDir, entry), "wb") as fh:
+            fh.write(b"junk")
+    assert cache.load(inFile, parser, kind="lines") == ["one", "two"]
+    assert parser.calls == 2
+
+def testPrune(tmp_path):
+    cache = ParseCache(tmp_path / "cache")
+    parser = _CountingParser()
+    inFiles = [_mkFile(tmp_path / f"in{i}.txt", [str(i) * 1000]) for i in range(4)]
+    for inFile in inFiles:
+        cache.load(inFile, parser, kind="lines")
+    assert len(os.listdir(cache.cacheDir)) == 4
+    # make first entry the most recently used, then prune to two entries
+    entrySize = cache.size() // 4
+    cache.load(inFiles[0], parser, kind="lines")
+    os.utime(cache._entryPath(inFiles[0], "lines"), ns=(2 ** 62, 2 ** 62))
+    cache.maxSize = 2 * entrySize
+    cache.prune()
+    assert cache.size() == 2 * entrySize
+    assert parser.calls == 4
+    cache.load(inFiles[0], parser, kind="lines")
+    cache.load(inFiles[3], parser, kind="lines")
+    assert parser.calls == 4
+    cache.clear()
+    assert cache.size() == 0
@@ -2,7 +2,8 @@
 import sys
 if __name__ == '__main__':
     sys.path.insert(0, "../../../../lib")
-from pycbio.tsv import TabFile, TabFileReader
+from pycbio.tsv import TabFile, TabFileReader, TabFileParallelReader
+from pycbio.sys import bgzf
 import pycbio.sys.testingSupport as ts
 import pipettor
 
@@ -118,3 +119,52 @@ def testReaderAllOptions(request):
     assert len(rows) == 2
     assert isinstance(rows[0], TypeRow)
     assert rows[0].col0 == "a"
+
+###
+# parallel reader tests
+###
+def _writeTestLines(outf, numLines):
+    "write lines with varying widths, so they span BGZF blocks"
+    lines = "".join([f"{i}\t{'x' * (i % 97)}\tval{i}\t{i % 7}\n" for i in range(numLines)])
+    with open(outf, "w") as fh:
+        fh.write(lines)
+    return lines
+
+def _expectRows(lines):
+    return [line.split('\t') for line in lines.split('\n')[0:-1]]
+
+def testParallelReader(request):
+    outf = ts.get_test_output_file(request, ".tsv")
+    lines = _writeTestLines(outf, 5000)
+    rows = list(TabFileParallelReader(outf, workers=2, chunkSize=300))
+    assert rows == _expectRows(lines)
+
+def testParallelReaderGzip(request):
+    outf = ts.get_test_output_file(request, ".tsv")
+    lines = _writeTestLines(outf, 2000)
+    pipettor.run(["gzip", "-c", outf], stdout=outf + ".gz")
+    rows = list(TabFileParallelReader(outf + ".gz", rowClass=TypeRow, workers=2, chunkSize=300))
+    assert [[r.col0, r.col1, r.col2, r.col3] for r in rows] == _expectRows(lines)
+
+def testParallelReaderBgzf(request):
+    outf = ts.get_test_output_file(request, ".tsv.gz")
+    lines = "# comment\n\n" + "".join([f"{i}\t{'x' * (i % 97)}\tval{i}\n" for i in range(10000)])
+    bgzf.writeFile(outf, lines.encode())
+    rows = list(TabFileParallelReader(outf, hashAreComments=True, skipBlankLines=True, workers=2, chunkSize=100))
+    assert rows == _expectRows(lines)[2:]
+
+def testParallelReaderBgzfNoNewline(request):
+    outf = ts.get_test_output_file(request, ".tsv.gz")
+    bgzf.writeFile(outf, b"a\tb\nc\td")
+    assert list(TabFileParallelReader(outf, workers=2)) == [["a", "b"], ["c", "d"]]
+
+def testParallelReaderBgzfSplitUtf8(request):
+    # multi-byte character split between BGZF blocks
+    outf = ts.get_test_output_file(request, ".tsv.gz")
+    lines = "".join([f"{i}\tcafé{i}\n" for i in range(11)])
+    data = lines.encode()
+    iSplit = data.find("é".encode(), len(data) // 2) + 1
+    with open(outf, "wb") as fh:
+        fh.write(bgzf.compressBlock(data[0:iSplit]) + bgzf.compressBlock(data[iSplit:]) + bgzf.EOF_BLOCK)
+    assert list(TabFileReader(outf)) == _expectRows(lines)
+    assert list(TabFileParallelReader(outf, workers=2, chunkSize=1)) == _expectRows(lines)
@@ -2,14 +2,16 @@
 # -*- coding: utf-8 -*-
 import sys
 import math
+from array import array
 from pathlib import Path
 from csv import excel_tab, excel
 import pickle
+import pytest
 import pipettor
 if __name__ == '__main__':
     sys.path.insert(0, "../../../../lib")
 from collections import namedtuple
-from pycbio.tsv import TsvReader, tsvRowToDict, printf_basic_dialect
+from pycbio.tsv import TsvReader, TsvRow, TsvError, tsvRowToDict, tsvSlotRowClass, tsvLoadColumns, printf_basic_dialect
 import pycbio.sys.testingSupport as ts
 from pycbio.hgdata.autoSql import intArrayType
 
@@ -105,6 +107,87 @@ def testColTypeDefault(request):
     for i in range(len(tStarts)):
         assert r.tStarts[i] == tStarts[i]
 
+def testFastColType(request):
+    typeMap = {"intCol": int, "floatCol": float, "onOffCol": (_onOffParse, _onOffFmt)}
+    rows = [r for r in TsvReader(ts.get_test_input_file(request, "types.tsv"), typeMap=typeMap, fast=True)]
+    assert not hasattr(rows[0], "__dict__")
+    _doCheckColTypes(rows)
+    _doCheckColTypes(pickle.loads(pickle.dumps(rows)))
+    rows[0]["intCol"] = 12
+    rows[0][0] = "name0"
+    assert str(rows[0]) == "name0\t12\t10.01\ton"
+
+def testFastLoad(request):
+    inTsv = ts.get_test_input_file(request, "mrna1.tsv")
+    rows = [r for r in TsvReader(inTsv)]
+    fastRows = [r for r in TsvReader(inTsv, fast=True)]
+    assert [tsvRowToDict(r) for r in fastRows] == [tsvRowToDict(r) for r in rows]
+    assert [r.getRow() for r in fastRows] == [r.getRow() for r in rows]
+    assert fastRows[0].get(1000, "pastend") == "pastend"
+    assert "qName" in fastRows[0]
+
+def testFastNoNewAttrs(request):
+    inTsv = ts.get_test_input_file(request, "mrna1.tsv")
+    row = next(iter(TsvReader(inTsv)))
+    row.extra = 1
+    assert row.extra == 1
+    fastRow = next(iter(TsvReader(inTsv, fast=True)))
+    fastRow.qName = "fred"
+    assert fastRow.qName == "fred"
+    with pytest.raises(AttributeError):
+        fastRow.extra = 1
+
+def testFastConvertError(request):
+    outTsv = ts.get_test_output_file(request, ".tsv")
+    with open(outTsv, "w") as fh:
+        fh.write("strCol\tintCol\nname1\t10\nname2\tfred\n")
+    with pytest.raises(TsvError) as exinfo:
+        list(TsvReader(outTsv, typeMap={"intCol": int}, fast=True))
+    assert 'Error converting TSV column 1 (intCol) to object, value "fred"' in str(exinfo.value.__cause__.__cause__)
+
+def testSlotRowClass():
+    assert tsvSlotRowClass(["a", "b"]) is tsvSlotRowClass(("a", "b"))
+    assert tsvSlotRowClass(["a", "class"]) is None
+    assert tsvSlotRowClass(["a", "b c"]) is None
+    assert tsvSlotRowClass(["a", "_b"]) is None
+
+def testFastNonIdentCols(request):
+    rows = [r for r in TsvReader(ts.get_test_input_file(request, 'typesColNameMap.tsv'), fast=True)]
+    assert type(rows[0]) is TsvRow
+    assert rows[0]["int col"] == "10"
+
+def testReadColumns(request):
+    typeMap = {"intCol": int, "floatCol": float, "onOffCol": (_onOffParse, _onOffFmt)}
+    inTsv = ts.get_test_input_file(request, "types.tsv")
+    rows = [r for r in TsvReader(inTsv, typeMap=typeMap)]
+    cols = TsvReader(inTsv, typeMap=typeMap).readColumns(chunkSize=3)
+    assert list(cols.keys()) == ["strCol", "intCol", "floatCol", "onOffCol"]
+    assert isinstance(cols["intCol"], array) and (cols["intCol"].typecode == 'q')
+    assert isinstance(cols["floatCol"], array) and (cols["floatCol"].typecode == 'd')
+    for col in cols.keys():
+        assert list(cols[col]) == [r[col] for r in rows]
+
+def testLoadColumnsSelect(request):
+    cols = tsvLoadColumns(ts.get_test_input_file(request, "mrna1.tsv"), {"tStart": int, "qName": str},
+                          select=["tStart", "qName"])
+    assert list(cols.keys()) == ["tStart", "qName"]
+    assert len(cols["tStart"]) == 10
+    assert cols["qName"][0] == "BC032353"
+    with pytest.raises(TsvError, match="Error reading TSV columns") as exinfo:
+        tsvLoadColumns(ts.get_test_input_file(request, "mrna1.tsv"), select=["tStart", "fred"])
+    assert "selected column not in TSV: fred" in str(exinfo.value.__cause__)
+
+def testLoadColumnsConvertError(request):
+    outTsv = ts.get_test_output_file(request, ".tsv")
+    with open(outTsv, "w") as fh:
+        fh.write("strCol\tintCol\nname1\t10\nname2\tfred\n")
+    with pytest.raises(TsvError) as exinfo:
+        tsvLoadColumns(outTsv, {"intCol": int})
+    assert 'Error converting TSV column 1 (intCol) to object, value "fred"' in str(exinfo.value.__cause__)
+    with pytest.raises(TsvError) as exinfo:
+        tsvLoadColumns(outTsv, {"intCol": int}, select=["strCol"], columns=["strCol"])
+    assert "row has 2 columns, expected exactly 1" in str(exinfo.value.__cause__)
+
 def testColNameMap(request):
     typeMap = {"int_col": int, "float_col": float, "onOff_col": (_onOffParse, _onOffFmt)}
 
@@ -106,6 +106,54 @@ def testWriteNoneValues(request):
         wr.writeRows(rows)
     ts.diff_results_expected(request, ".tsv")
 
+def _rowsAsWritten(outFile):
+    with open(outFile) as fh:
+        return fh.read()
+
+def testWriteRowsMixed(request):
+    """writeRows with rows of different kinds, in small batches, matches writeRow"""
+    Row = namedtuple("Row", _columns)
+    rows = [["name1", 10, 10.01, True],
+            {"strCol": "name2", "intCol": None, "floatCol": 20.22, "onOffCol": False},
+            Row("name3", 30, 30.555, False),
+            ("name4", 40, None, True, "extra")]
+    rowOut = ts.get_test_output_file(request, ".row.tsv")
+    with TsvWriter(rowOut, columns=_columns, typeMap=_typeMap) as wr:
+        for row in rows:
+            wr.writeRow(row)
+    rowsOut = ts.get_test_output_file(request, ".rows.tsv")
+    with TsvWriter(rowsOut, columns=_columns, typeMap=_typeMap) as wr:
+        wr.writeRows(rows, batchSize=2)
+    assert _rowsAsWritten(rowsOut) == _rowsAsWritten(rowOut)
+
+def testWriteRowsSingleColumn(request):
+    outFile = ts.get_test_output_file(request, ".tsv")
+    Row = namedtuple("Row", ("intCol",))
+    with TsvWriter(outFile, columns=["intCol"], typeMap={"intCol": int}) as wr:
+        wr.writeRows([Row(1), Row(None)])
+        wr.writeRows([{"intCol": 3}])
+    # csv quotes a single empty column
+    assert _rowsAsWritten(outFile) == "intCol\n1\n\"\"\n3\n"
+
+def testWriteRowsShort(request):
+    with TsvWriter(ts.get_test_output_file(request, ".tsv"), columns=_columns) as wr:
+        with pytest.raises(TsvError, match="row has 2 columns, expected 4"):
+            wr.writeRows([["name1", 10]])
+
+def testWriteRowsBackground(request):
+    rows = [[f"name{i}", i, i / 10, (i % 2) == 0] for i in range(5000)]
+    outFile = ts.get_test_output_file(request, ".tsv.gz")
+    with TsvWriter(outFile, columns=_columns, typeMap=_typeMap) as wr:
+        wr.writeRows(rows, batchSize=100, background=True)
+    readRows = [r for r in TsvReader(outFile, typeMap=_typeMap)]
+    assert [[r.strCol, r.intCol, r.floatCol, r.onOffCol] for r in readRows] == rows
+
+def testWriteRowsBackgroundError(request):
+    with open(ts.get_test_output_file(request, ".tsv"), "w") as fh:
+        wr = TsvWriter(None, columns=_columns, outFh=fh)
+    with pytest.raises(ValueError, match="closed file"):
+        wr.writeRows([["name1", 10, 10.01, True]] * 1000, batchSize=10, background=True)
+
 def testWriteColumns(request):
     """write rows using keyword arguments, with some missing columns"""
     outFile = ts.get_test_output_file(request, ".tsv")